@@ -0,0 +1,193 @@
+# assets.py
+# Pipeline de imagens (build) + helpers de template.
+#
+#     flask --app varzea_trainer_flask build-assets
+#
+# Gera, para cada imagem de IMAGENS, variantes AVIF/WebP/JPEG progressivo em
+# várias larguras dentro de static/dist/, com hash do conteúdo no nome e um
+# manifest.json. Os templates usam asset_background()/asset_srcset(), que
+# caem no PNG original se o manifest ainda não existir. Os arquivos de
+# static/dist são servidos em /assets/ com cache "immutable" de 1 ano.
+#
+# Requer Pillow só na hora do build (pip install Pillow).
+import hashlib
+import io
+import json
+import os
+
+import click
+from flask import send_from_directory, url_for
+from markupsafe import Markup
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(APP_DIR, "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST = os.path.join(DIST_DIR, "manifest.json")
+
+IMAGENS = ["capa.png", "inicial.png"]
+LARGURAS = [480, 960, 1440, 1920]
+# Ordem de preferência no image-set/srcset (o último é o fallback)
+FORMATOS = [
+    ("avif", "image/avif", {"quality": 50}),
+    ("webp", "image/webp", {"quality": 75, "method": 6}),
+    ("jpg", "image/jpeg", {"quality": 78, "progressive": True, "optimize": True}),
+]
+UM_ANO = 365 * 24 * 3600
+
+_cache = {"mtime": None, "manifest": {}}
+
+
+# ------------------- BUILD -------------------
+
+def _salvar(img, formato, opcoes):
+    buf = io.BytesIO()
+    pil_formato = {"jpg": "JPEG", "webp": "WEBP", "avif": "AVIF"}[formato]
+    if formato == "jpg" and img.mode != "RGB":
+        img = img.convert("RGB")
+    img.save(buf, pil_formato, **opcoes)
+    return buf.getvalue()
+
+
+def construir(imagens=IMAGENS, larguras=LARGURAS, verbose=True):
+    """Gera as variantes e o manifest. Retorna o manifest."""
+    try:
+        from PIL import Image, features
+    except ImportError:
+        raise click.ClickException("Pillow não instalado: pip install Pillow")
+
+    os.makedirs(DIST_DIR, exist_ok=True)
+    manifest = {}
+    gerados = {"manifest.json"}
+
+    for nome in imagens:
+        origem = Image.open(os.path.join(STATIC_DIR, nome))
+        origem.load()
+        if origem.mode not in ("RGB", "RGBA"):
+            origem = origem.convert("RGBA" if "A" in origem.getbands() else "RGB")
+        base = os.path.splitext(nome)[0]
+        entrada = {"largura": origem.width, "altura": origem.height, "variantes": []}
+
+        # Sempre inclui uma variante na largura original se ela for menor que todas
+        alvos = sorted({min(w, origem.width) for w in larguras})
+        for largura in alvos:
+            altura = round(origem.height * largura / origem.width)
+            img = origem if largura == origem.width else origem.resize((largura, altura), Image.LANCZOS)
+
+            for formato, mime, opcoes in FORMATOS:
+                if formato == "avif" and not features.check("avif"):
+                    continue
+                dados = _salvar(img, formato, opcoes)
+                digest = hashlib.sha256(dados).hexdigest()[:10]
+                arquivo = f"{base}-{largura}.{digest}.{formato}"
+                with open(os.path.join(DIST_DIR, arquivo), "wb") as f:
+                    f.write(dados)
+                gerados.add(arquivo)
+                entrada["variantes"].append({
+                    "arquivo": arquivo, "largura": largura, "formato": formato,
+                    "mime": mime, "bytes": len(dados),
+                })
+
+        manifest[nome] = entrada
+        if verbose:
+            original = os.path.getsize(os.path.join(STATIC_DIR, nome))
+            menor = min(v["bytes"] for v in entrada["variantes"] if v["largura"] == alvos[-1])
+            print(f"🖼️ {nome}: {original / 1024:.0f} KB -> {menor / 1024:.0f} KB "
+                  f"({len(entrada['variantes'])} variantes)")
+
+    # Remove variantes antigas (hash diferente)
+    for arquivo in os.listdir(DIST_DIR):
+        if arquivo not in gerados:
+            os.remove(os.path.join(DIST_DIR, arquivo))
+
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    _cache["mtime"] = None
+    return manifest
+
+
+# ------------------- TEMPLATES -------------------
+
+def carregar_manifest():
+    """Manifest em memória; recarrega se o arquivo mudar."""
+    try:
+        mtime = os.path.getmtime(MANIFEST)
+    except OSError:
+        return {}
+    if mtime != _cache["mtime"]:
+        with open(MANIFEST) as f:
+            _cache["manifest"] = json.load(f)
+        _cache["mtime"] = mtime
+    return _cache["manifest"]
+
+
+def _variantes(nome, formato=None):
+    entrada = carregar_manifest().get(nome)
+    if not entrada:
+        return []
+    return [v for v in entrada["variantes"] if formato in (None, v["formato"])]
+
+
+def asset_url(nome, largura=None, formato="jpg"):
+    """URL de uma variante (a mais próxima de `largura`) ou do original."""
+    variantes = _variantes(nome, formato)
+    if not variantes:
+        return url_for("static", filename=nome)
+    if largura:
+        maiores = [v for v in variantes if v["largura"] >= largura]
+        v = min(maiores, key=lambda v: v["largura"]) if maiores else variantes[-1]
+    else:
+        v = max(variantes, key=lambda v: v["largura"])
+    return url_for("assets", filename=v["arquivo"])
+
+
+def asset_srcset(nome, formato="webp"):
+    """Valor de srcset ("url 480w, url 960w, ...") para <img>/<source>."""
+    return ", ".join(
+        f"{url_for('assets', filename=v['arquivo'])} {v['largura']}w"
+        for v in _variantes(nome, formato)
+    )
+
+
+def asset_background(seletor, nome):
+    """Regras CSS de fundo responsivo: image-set por formato e media query por largura."""
+    variantes = _variantes(nome)
+    if not variantes:
+        return Markup(f'{seletor} {{ background-image: url("{url_for("static", filename=nome)}"); }}')
+
+    larguras = sorted({v["largura"] for v in variantes})
+    regras = []
+    for i, largura in enumerate(larguras):
+        da_largura = {v["formato"]: v for v in variantes if v["largura"] == largura}
+        fallback = url_for("assets", filename=da_largura["jpg"]["arquivo"])
+        conjunto = ", ".join(
+            f'url("{url_for("assets", filename=da_largura[fmt]["arquivo"])}") type("{mime}")'
+            for fmt, mime, _ in FORMATOS if fmt in da_largura
+        )
+        corpo = (f'{seletor} {{ background-image: url("{fallback}"); '
+                 f'background-image: image-set({conjunto}); }}')
+        # Menor largura = regra padrão (mobile first); as maiores entram por media query
+        if i == 0:
+            regras.append(corpo)
+        else:
+            regras.append(f"@media (min-width: {larguras[i - 1] + 1}px) {{ {corpo} }}")
+    return Markup("\n".join(regras))
+
+
+def servir(filename):
+    resp = send_from_directory(DIST_DIR, filename, max_age=UM_ANO)
+    resp.headers["Cache-Control"] = f"public, max-age={UM_ANO}, immutable"
+    return resp
+
+
+def init_app(app):
+    app.add_url_rule("/assets/<path:filename>", "assets", servir)
+    app.jinja_env.globals.update(
+        asset_url=asset_url,
+        asset_srcset=asset_srcset,
+        asset_background=asset_background,
+    )
+
+    @app.cli.command("build-assets")
+    def build_assets_command():
+        """Gera variantes AVIF/WebP/JPEG das imagens de fundo + manifest."""
+        construir()
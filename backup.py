@@ -0,0 +1,570 @@
+# backup.py
+# Backup a quente, verificação e salvamento de banco corrompido.
+#
+#     flask --app varzea_trainer_flask backup [--pasta backups] [--manter 7]
+#     flask --app varzea_trainer_flask check-db
+#     flask --app varzea_trainer_flask salvage corrompido.db novo.db
+#
+# Backup: API de backup incremental do SQLite (PASSO páginas por vez, com
+# pausa entre os passos), então o app continua lendo e gravando durante a
+# cópia. Se as escritas do app fizerem a cópia recomeçar mais de
+# MAX_REINICIOS vezes, ela é feita num passo só (snapshot do WAL). A cópia
+# vai para um .tmp, passa pelo PRAGMA quick_check e só então ganha o nome
+# final; os BACKUP_MANTER mais novos ficam, o resto é apagado.
+#
+# Salvamento: lê o arquivo corrompido direto do disco, página por página,
+# seguindo a árvore B de cada tabela listada no sqlite_master. Página ou
+# célula ilegível é contada e pulada; o resto vai para um banco novo com o
+# schema original e depois passa pelas migrações (schema atual). Páginas de
+# dados que nenhuma tabela alcança vão para lost_and_found.
+# O arquivo corrompido nunca é movido nem alterado. Se houver um -wal ao
+# lado, banco e WAL são copiados para uma pasta temporária e o checkpoint
+# roda na cópia (transações que ainda não tinham ido para o arquivo não se
+# perdem); se o checkpoint falhar, o relatório avisa. As tabelas derivadas
+# (user_progress, weight_trend, streaks, caches) não são confiadas à cópia:
+# são refeitas a partir das tabelas base recuperadas.
+import glob
+import itertools
+import mmap
+import os
+import re
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+
+import click
+
+import db
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PASTA = os.environ.get("BACKUP_DIR", os.path.join(APP_DIR, "backups"))
+MANTER = int(os.environ.get("BACKUP_MANTER", 7))
+PASSO = int(os.environ.get("BACKUP_PASSO", 256))       # páginas por passo
+PAUSA = float(os.environ.get("BACKUP_PAUSA", 0.005))   # segundos entre passos
+MAX_REINICIOS = 3                                      # depois disso, passo único
+LOTE = 5000                                            # linhas por executemany
+
+_PREFIXO = "varzea-"
+
+
+# ------------------- BACKUP -------------------
+
+class _Reiniciou(Exception):
+    pass
+
+
+def verificar(caminho):
+    """PRAGMA quick_check -> lista de problemas (vazia = ok)."""
+    conn = sqlite3.connect(f"file:{caminho}?mode=ro", uri=True)
+    try:
+        resultado = [row[0] for row in conn.execute("PRAGMA quick_check")]
+    except sqlite3.DatabaseError as e:
+        return [str(e)]
+    finally:
+        conn.close()
+    return [] if resultado == ["ok"] else resultado
+
+
+def copiar(origem, destino, passo=PASSO, pausa=PAUSA):
+    """Backup consistente de `origem` (em uso) para `destino` -> estatísticas."""
+    inicio = time.perf_counter()
+    tmp = destino + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    src = sqlite3.connect(origem, timeout=db.BUSY_TIMEOUT_MS / 1000)
+    dst = sqlite3.connect(tmp)
+    reinicios = [0, None]   # [nº, páginas restantes no passo anterior]
+
+    def progresso(status, restante, total):
+        # Escrita de outra conexão no meio da cópia faz o SQLite recomeçar
+        if reinicios[1] is not None and restante > reinicios[1]:
+            reinicios[0] += 1
+            if reinicios[0] > MAX_REINICIOS:
+                raise _Reiniciou()
+        reinicios[1] = restante
+
+    try:
+        try:
+            src.backup(dst, pages=passo, progress=progresso, sleep=pausa)
+            modo = "incremental"
+        except _Reiniciou:
+            # Escrita contínua: copia num passo só. Em WAL isso lê um snapshot
+            # sem bloquear quem grava (só o checkpoint espera o fim da cópia).
+            src.backup(dst, pages=-1)
+            modo = "passo único"
+        # A cópia herda o modo WAL da origem; backup é arquivo único
+        dst.execute("PRAGMA journal_mode=DELETE")
+        paginas = dst.execute("PRAGMA page_count").fetchone()[0]
+        tamanho = paginas * dst.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        dst.close()
+        src.close()
+
+    problemas = verificar(tmp)
+    if problemas:
+        os.remove(tmp)
+        raise sqlite3.DatabaseError("backup reprovado no quick_check: " + "; ".join(problemas)[:300])
+    os.replace(tmp, destino)
+    segundos = time.perf_counter() - inicio
+    return {"destino": destino, "paginas": paginas, "bytes": tamanho, "segundos": segundos,
+            "modo": modo, "reinicios": reinicios[0]}
+
+
+def rotacionar(pasta=PASTA, manter=MANTER):
+    """Apaga os backups mais antigos, deixando `manter`. Retorna os apagados."""
+    arquivos = sorted(glob.glob(os.path.join(pasta, _PREFIXO + "*.db")))
+    velhos = arquivos[:-manter] if manter > 0 else arquivos
+    for caminho in velhos:
+        os.remove(caminho)
+    return velhos
+
+
+def fazer_backup(origem, pasta=PASTA, manter=MANTER):
+    os.makedirs(pasta, exist_ok=True)
+    nome = _PREFIXO + time.strftime("%Y%m%d-%H%M%S") + ".db"
+    stats = copiar(origem, os.path.join(pasta, nome))
+    stats["apagados"] = rotacionar(pasta, manter)
+    return stats
+
+
+# ------------------- LEITURA DE PÁGINAS -------------------
+# Formato: https://www.sqlite.org/fileformat2.html
+
+class ArquivoCorrompido(Exception):
+    pass
+
+
+def _varint(buf, i):
+    v = 0
+    for j in range(8):
+        b = buf[i + j]
+        v = (v << 7) | (b & 0x7F)
+        if b < 0x80:
+            return v, i + j + 1
+    return (v << 8) | buf[i + 8], i + 9
+
+
+_INTEIROS = {1: 1, 2: 2, 3: 3, 4: 4, 5: 6, 6: 8}
+_DOUBLE = struct.Struct(">d").unpack_from
+
+
+def _registro(payload, codificacao):
+    """Registro (cabeçalho + valores) -> lista de valores Python."""
+    tamanho, i = _varint(payload, 0)
+    if tamanho > len(payload):
+        raise ValueError("cabeçalho maior que o registro")
+    cabecalho = payload[i:tamanho]
+    if not cabecalho or max(cabecalho) < 0x80:
+        tipos = cabecalho          # caso comum: todo tipo serial cabe em 1 byte
+    else:
+        tipos = []
+        while i < tamanho:
+            t, i = _varint(payload, i)
+            tipos.append(t)
+
+    valores, pos = [], tamanho
+    for t in tipos:
+        if t >= 12:
+            n = (t - 12) >> 1
+            bruto = payload[pos:pos + n]
+            pos += n
+            valores.append(bruto.decode(codificacao, "replace") if t & 1 else bruto)
+        elif t == 0:
+            valores.append(None)
+        elif t in _INTEIROS:
+            n = _INTEIROS[t]
+            valores.append(int.from_bytes(payload[pos:pos + n], "big", signed=True))
+            pos += n
+        elif t == 7:
+            valores.append(_DOUBLE(payload, pos)[0])
+            pos += 8
+        elif t in (8, 9):
+            valores.append(t - 8)
+        else:
+            raise ValueError(f"tipo serial reservado {t}")
+    if pos > len(payload):
+        raise ValueError("registro truncado")
+    return valores
+
+
+class Paginas:
+    """Leitor de páginas de um arquivo SQLite, sem passar pelo SQLite."""
+
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, "rb")
+        self.bytes = os.fstat(self._arquivo.fileno()).st_size
+        if self.bytes < 100:
+            raise ArquivoCorrompido("arquivo menor que o cabeçalho")
+        self._dados = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        cab = self._dados[:100]
+        if not cab.startswith(b"SQLite format 3\x00"):
+            raise ArquivoCorrompido("cabeçalho SQLite ausente")
+        tamanho = int.from_bytes(cab[16:18], "big")
+        self.tamanho = 65536 if tamanho == 1 else tamanho
+        if self.tamanho < 512 or self.tamanho & (self.tamanho - 1):
+            raise ArquivoCorrompido(f"tamanho de página inválido: {self.tamanho}")
+        self.util = self.tamanho - cab[20]
+        self.total = self.bytes // self.tamanho
+        self.codificacao = {2: "utf-16-le", 3: "utf-16-be"}.get(int.from_bytes(cab[56:60], "big"), "utf-8")
+        self.visitadas = set()
+
+    def fechar(self):
+        self._dados.close()
+        self._arquivo.close()
+
+    def pagina(self, n):
+        if not 1 <= n <= self.total:
+            raise ValueError(f"página {n} fora do arquivo")
+        inicio = (n - 1) * self.tamanho
+        return self._dados[inicio:inicio + self.tamanho]
+
+    def _payload(self, pag, i, tamanho, indice=False):
+        """Conteúdo da célula, seguindo as páginas de overflow se preciso."""
+        x = (self.util - 12) * 64 // 255 - 23 if indice else self.util - 35
+        if tamanho <= x:
+            return pag[i:i + tamanho]
+        m = (self.util - 12) * 32 // 255 - 23
+        local = m + (tamanho - m) % (self.util - 4)
+        if local > x:
+            local = m
+        partes = [pag[i:i + local]]
+        falta = tamanho - local
+        proxima = int.from_bytes(pag[i + local:i + local + 4], "big")
+        while falta > 0:
+            if proxima in self.visitadas:
+                raise ValueError("ciclo de overflow")
+            self.visitadas.add(proxima)
+            over = self.pagina(proxima)
+            pedaco = over[4:4 + min(falta, self.util - 4)]
+            partes.append(pedaco)
+            falta -= len(pedaco)
+            proxima = int.from_bytes(over[:4], "big")
+        return b"".join(partes)
+
+    def _celulas(self, pag, h, tipo, stats):
+        """Registros da página: folha de tabela (0x0D) ou página de índice
+        (0x02/0x0A, tabelas WITHOUT ROWID — interiores também têm registros)."""
+        ncel = int.from_bytes(pag[h + 3:h + 5], "big")
+        inicio = h + (12 if tipo == 0x02 else 8)
+        for k in range(ncel):
+            try:
+                i = int.from_bytes(pag[inicio + 2 * k:inicio + 2 * k + 2], "big")
+                if tipo == 0x02:
+                    i += 4   # ponteiro para o filho
+                tamanho, i = _varint(pag, i)
+                rowid = None
+                if tipo == 0x0D:
+                    rowid, i = _varint(pag, i)
+                    if rowid >= 1 << 63:
+                        rowid -= 1 << 64
+                payload = self._payload(pag, i, tamanho, indice=tipo != 0x0D)
+                valores = _registro(payload, self.codificacao)
+            except (ValueError, IndexError, struct.error):
+                stats["celulas_ruins"] += 1
+                continue
+            yield rowid, valores
+
+    def linhas(self, raiz, stats):
+        """(rowid, valores) de toda a árvore B que começa em `raiz` (rowid é
+        None em tabela WITHOUT ROWID)."""
+        pilha = [raiz]
+        while pilha:
+            n = pilha.pop()
+            if n in self.visitadas:
+                continue
+            try:
+                pag = self.pagina(n)
+                self.visitadas.add(n)
+                h = 100 if n == 1 else 0
+                tipo = pag[h]
+                if tipo in (0x02, 0x05):
+                    ncel = int.from_bytes(pag[h + 3:h + 5], "big")
+                    filhos = []
+                    for k in range(ncel):
+                        i = int.from_bytes(pag[h + 12 + 2 * k:h + 14 + 2 * k], "big")
+                        filhos.append(int.from_bytes(pag[i:i + 4], "big"))
+                    filhos.append(int.from_bytes(pag[h + 8:h + 12], "big"))
+                    pilha.extend(reversed(filhos))   # mantém a ordem de rowid
+                elif tipo not in (0x0A, 0x0D):
+                    raise ValueError(f"página {n} não é de árvore B ({tipo:#x})")
+            except (ValueError, IndexError):
+                stats["paginas_ruins"] += 1
+                continue
+            stats["paginas"] += 1
+            if tipo != 0x05:
+                yield from self._celulas(pag, h, tipo, stats)
+
+    def orfas(self, stats):
+        """Folhas de tabela que nenhuma árvore alcançou -> (página, rowid, valores)."""
+        for n in range(1, self.total + 1):
+            if n in self.visitadas:
+                continue
+            pag = self.pagina(n)
+            h = 100 if n == 1 else 0
+            if pag[h] != 0x0D:
+                continue
+            stats["paginas"] += 1
+            for rowid, valores in self._celulas(pag, h, 0x0D, stats):
+                yield n, rowid, valores
+
+
+# ------------------- SALVAMENTO -------------------
+
+_SEM_ROWID = re.compile(r"\)\s*WITHOUT\s+ROWID\s*;?\s*$", re.IGNORECASE)
+
+
+def _novas_stats():
+    return {"linhas": 0, "gravadas": 0, "paginas": 0, "paginas_ruins": 0, "celulas_ruins": 0}
+
+
+def _esquema(paginas):
+    """Linhas do sqlite_master (página 1) -> [(type, name, tbl_name, rootpage, sql)]."""
+    stats = _novas_stats()
+    itens = [tuple((v + [None] * 5)[:5]) for _, v in paginas.linhas(1, stats)]
+    return itens, stats
+
+
+def _gravar(novo, tabela, linhas, stats, sem_rowid=False):
+    cols = [(row[1], row[2].upper(), row[5]) for row in novo.execute(f'PRAGMA table_info("{tabela}")')]
+    pks = [i for i, (_, _, pk) in enumerate(cols) if pk]
+    alias = None
+    if sem_rowid:
+        # WITHOUT ROWID grava a chave primária primeiro, depois o resto
+        pks.sort(key=lambda i: cols[i][2])
+        cols = [cols[i] for i in pks] + [c for i, c in enumerate(cols) if i not in pks]
+    elif len(pks) == 1 and cols[pks[0]][1] == "INTEGER":
+        # INTEGER PRIMARY KEY é o próprio rowid: no registro ele vem NULL
+        alias = pks[0]
+    nomes = ", ".join(f'"{c[0]}"' for c in cols)
+    sql = f'INSERT OR IGNORE INTO "{tabela}" ({nomes}) VALUES ({", ".join("?" * len(cols))})'
+
+    def ajustar():
+        for rowid, valores in linhas:
+            stats["linhas"] += 1
+            valores = (valores + [None] * len(cols))[:len(cols)]
+            if alias is not None and valores[alias] is None:
+                valores[alias] = rowid
+            yield valores
+
+    gerador = ajustar()
+    while True:
+        lote = list(itertools.islice(gerador, LOTE))
+        if not lote:
+            break
+        antes = novo.total_changes
+        novo.executemany(sql, lote)
+        stats["gravadas"] += novo.total_changes - antes
+
+
+def _aplicar_wal(corrompido, pasta, avisos):
+    """Caminho a ler: uma cópia com o -wal já aplicado, ou o próprio arquivo."""
+    wal = corrompido + "-wal"
+    if not os.path.exists(wal) or os.path.getsize(wal) == 0:
+        return corrompido
+    copia = os.path.join(pasta, os.path.basename(corrompido))
+    shutil.copyfile(corrompido, copia)
+    shutil.copyfile(wal, copia + "-wal")
+    try:
+        conn = sqlite3.connect(copia)
+        try:
+            ocupado, paginas_wal, copiadas = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        finally:
+            conn.close()
+        if ocupado or copiadas < paginas_wal:
+            avisos.append(f"WAL aplicado pela metade ({copiadas} de {paginas_wal} páginas)")
+        return copia
+    except sqlite3.DatabaseError as e:
+        avisos.append(f"WAL não aplicado ({e}): o que só estava em {wal} ficou de fora")
+        return corrompido
+
+
+def _refazer_derivadas(destino):
+    """Contadores, tendência, sequências e caches a partir das tabelas base
+    recuperadas (a cópia deles pode contar linhas que se perderam)."""
+    import progresso
+    import ranking
+    import tendencia
+
+    conn = db.connect(destino)
+    try:
+        progresso.reconstruir(conn)
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM weight_trend")
+        pesados = [r[0] for r in conn.execute(
+            "SELECT DISTINCT user_id FROM weight_log WHERE user_id IS NOT NULL")]
+        for user_id in pesados:
+            tendencia.recalcular(conn, user_id)
+        # checkin_dias fica (guarda os dias de ciclos já reiniciados) e
+        # ganha os dias dos check-ins recuperados
+        conn.execute("DELETE FROM streaks")
+        conn.execute("DELETE FROM streak_contagem")
+        jogadores = [r[0] for r in conn.execute("""
+            SELECT user_id FROM checkins WHERE user_id IS NOT NULL
+            UNION SELECT user_id FROM checkin_dias
+        """)]
+        for user_id in jogadores:
+            ranking.recalcular(conn, user_id)
+        # ultimo_programa também fica e anda até o programa recuperado
+        conn.execute("""
+            INSERT INTO ultimo_programa (user_id, em)
+            SELECT user_id, MAX(created_at) FROM program_progress
+            WHERE user_id IS NOT NULL AND created_at IS NOT NULL
+            GROUP BY user_id
+            ON CONFLICT(user_id) DO UPDATE SET em = MAX(em, excluded.em)
+        """)
+        conn.execute("DELETE FROM perfil_cache")
+        conn.execute("DELETE FROM equipe_cache")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return len(pesados), len(jogadores)
+
+
+def salvar(corrompido, destino, verbose=True):
+    """Recupera o que der de `corrompido` em `destino` (novo) -> {tabela: stats}."""
+    if os.path.exists(destino):
+        raise FileExistsError(f"{destino} já existe")
+    inicio = time.perf_counter()
+    pasta = tempfile.mkdtemp(prefix="salvage-")
+    avisos = []
+    try:
+        paginas = Paginas(_aplicar_wal(corrompido, pasta, avisos))
+    except Exception:
+        shutil.rmtree(pasta, ignore_errors=True)
+        raise
+    relatorio = {}
+    try:
+        itens, relatorio["sqlite_master"] = _esquema(paginas)
+        relatorio["sqlite_master"]["avisos"] = avisos
+        tabelas = [(nome, raiz, sql) for tipo, nome, _, raiz, sql in itens
+                   if tipo == "table" and sql and isinstance(raiz, int)
+                   and not nome.startswith("sqlite_")]
+        outros = [(nome, sql) for tipo, nome, _, _, sql in itens
+                  if tipo in ("index", "trigger", "view") and sql]
+        sequencias = [raiz for tipo, nome, _, raiz, _ in itens
+                      if tipo == "table" and nome == "sqlite_sequence"]
+
+        novo = sqlite3.connect(destino, isolation_level=None)
+        novo.execute("PRAGMA journal_mode=OFF")
+        novo.execute("PRAGMA synchronous=OFF")
+        novo.execute("BEGIN")
+        for nome, raiz, sql in tabelas:
+            stats = relatorio[nome] = _novas_stats()
+            try:
+                novo.execute(sql)
+            except sqlite3.DatabaseError as e:
+                stats["erro"] = str(e)
+                continue
+            sem_rowid = bool(_SEM_ROWID.search(sql))
+            _gravar(novo, nome, paginas.linhas(raiz, stats), stats, sem_rowid)
+
+        # As inserções já criaram o sqlite_sequence; só sobe o contador se o
+        # original estava à frente (linhas apagadas não reaproveitam id)
+        for raiz in sequencias:
+            stats = relatorio["sqlite_sequence"] = _novas_stats()
+            for _, valores in paginas.linhas(raiz, stats):
+                stats["linhas"] += 1
+                nome, seq = (valores + [None, None])[:2]
+                if not isinstance(nome, str) or not isinstance(seq, int):
+                    stats["celulas_ruins"] += 1
+                    continue
+                try:
+                    atual = novo.execute("SELECT seq FROM sqlite_sequence WHERE name=?", (nome,)).fetchone()
+                    if atual is None:
+                        novo.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (nome, seq))
+                    elif seq > atual[0]:
+                        novo.execute("UPDATE sqlite_sequence SET seq=? WHERE name=?", (seq, nome))
+                    stats["gravadas"] += 1
+                except sqlite3.DatabaseError as e:
+                    stats["erro"] = str(e)
+
+        stats = relatorio["lost_and_found"] = _novas_stats()
+        orfas = list(paginas.orfas(stats))
+        if orfas:
+            largura = max(len(v) for _, _, v in orfas)
+            colunas = ", ".join(f"c{i}" for i in range(largura))
+            novo.execute(f"CREATE TABLE lost_and_found (pagina INTEGER, id INTEGER, {colunas})")
+            novo.executemany(
+                f"INSERT INTO lost_and_found VALUES ({', '.join('?' * (largura + 2))})",
+                ([n, rowid] + v + [None] * (largura - len(v)) for n, rowid, v in orfas))
+            stats["linhas"] = stats["gravadas"] = len(orfas)
+
+        # Índices/triggers depois dos dados (UNIQUE quebrado não derruba o resto)
+        for nome, sql in outros:
+            try:
+                novo.execute(sql)
+            except sqlite3.DatabaseError as e:
+                relatorio.setdefault("sqlite_master", _novas_stats()).setdefault("avisos", []).append(f"{nome}: {e}")
+        novo.execute("COMMIT")
+        novo.close()
+    finally:
+        tamanho = paginas.bytes
+        paginas.fechar()
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    # Schema antigo -> atual (as migrações sabem converter bancos velhos)
+    import migrations
+    derivadas = None
+    try:
+        migrations.upgrade(destino, verbose=False)
+        derivadas = _refazer_derivadas(destino)
+    except sqlite3.DatabaseError as e:
+        relatorio["sqlite_master"].setdefault("avisos", []).append(f"migrações/derivadas: {e}")
+
+    segundos = time.perf_counter() - inicio
+    if verbose:
+        for nome, s in relatorio.items():
+            marca = "⚠️" if s["paginas_ruins"] or s["celulas_ruins"] or "erro" in s else "✅"
+            print(f"{marca} {nome:22} {s['gravadas']:8} linhas  {s['paginas']:6} páginas"
+                  f"  ({s['paginas_ruins']} páginas e {s['celulas_ruins']} células ilegíveis)"
+                  + (f"  erro: {s['erro']}" if "erro" in s else ""))
+            for aviso in s.get("avisos", []):
+                print(f"   ⚠️ {aviso}")
+        if derivadas:
+            print(f"🔁 user_progress, weight_trend ({derivadas[0]} jogadores), streaks "
+                  f"({derivadas[1]} jogadores) refeitos; perfil_cache e equipe_cache limpos")
+        print(f"📦 {tamanho / 1e6:.1f} MB em {segundos:.2f} s ({tamanho / 1e6 / max(segundos, 1e-9):.1f} MB/s) -> {destino}")
+    return relatorio
+
+
+def init_app(app):
+    @app.cli.command("backup")
+    @click.option("--pasta", default=PASTA, show_default=True)
+    @click.option("--manter", default=MANTER, show_default=True, help="Quantos backups guardar.")
+    def backup_command(pasta, manter):
+        """Backup a quente do banco (o app pode continuar no ar)."""
+        stats = fazer_backup(app.config["DATABASE"], pasta, manter)
+        mb = stats["bytes"] / 1e6
+        print(f"✅ {stats['destino']}: {mb:.1f} MB em {stats['segundos']:.2f} s "
+              f"({mb / max(stats['segundos'], 1e-9):.1f} MB/s, {stats['modo']}, "
+              f"{stats['reinicios']} reinícios), quick_check ok")
+        for caminho in stats["apagados"]:
+            print(f"🗑️ {caminho}")
+
+    @app.cli.command("check-db")
+    def check_db_command():
+        """PRAGMA quick_check no banco configurado."""
+        problemas = verificar(app.config["DATABASE"])
+        for p in "\n".join(problemas).splitlines()[:20]:
+            print("❌", p)
+        if problemas:
+            print("Use: flask --app varzea_trainer_flask salvage <banco> <novo.db>")
+            sys.exit(1)
+        print("✅ quick_check ok")
+
+    @app.cli.command("salvage")
+    @click.argument("corrompido")
+    @click.argument("destino")
+    def salvage_command(corrompido, destino):
+        """Recupera as linhas legíveis de um banco corrompido num banco novo."""
+        try:
+            salvar(corrompido, destino)
+        except (ArquivoCorrompido, FileExistsError) as e:
+            print("❌", e)
+            sys.exit(1)
@@ -0,0 +1,411 @@
+# balanca.py
+# Importação do histórico de peso exportado por balanças e relógios (CSV).
+#
+#     flask --app varzea_trainer_flask import-weights email@x.com balanca.csv [--fuso America/Sao_Paulo] [--unidade lb] [--mes-primeiro]
+#
+# Na web: POST /peso/importar (tela do gráfico) responde na hora com o id da
+# importação, que roda numa thread em segundo plano; o andamento fica na
+# tabela importacoes e sai em /api/peso/importacoes/<id>.
+#
+# O arquivo é lido linha a linha (csv.reader direto do disco) e gravado em
+# lotes de LOTE linhas, cada lote na sua transação: o lock de escrita fica
+# alguns milissegundos com a importação e volta para o app entre os lotes.
+#
+# Formatos aceitos (Withings, Fitbit, Garmin, Mi Fit/Zepp, Renpho...):
+# - separador , ; tab ou | (detectado pelo cabeçalho; "sep=;" do Excel também)
+# - coluna de data/hora ("Date", "Data", "Timestamp"...) ou data + hora
+#   separadas; ISO 8601 com ou sem fuso, dd/mm/aaaa (ou mm/dd com
+#   --mes-primeiro), epoch em segundos ou milissegundos
+# - peso em kg, lb ou st: unidade no nome da coluna ("Weight (lb)"), numa
+#   coluna "Unit" ou no próprio valor ("176.4 lbs"); vírgula decimal ok
+# Horário com fuso (ou epoch) é convertido para o fuso do jogador e gravado
+# como hora local, igual ao peso_diario. Linha sem peso é pulada; peso fora
+# de PESO_MIN..PESO_MAX ou data ilegível é recusada (e contada no resumo).
+# Repetidos (mesmo jogador e mesmo horário, no banco ou no próprio arquivo)
+# são ignorados, então importar o mesmo arquivo de novo não duplica nada.
+import codecs
+import csv
+import itertools
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import click
+
+import db
+import exportacao
+import regional
+import tendencia
+
+LOTE = int(os.environ.get("BALANCA_LOTE", 2000))    # linhas por transação
+PAUSA = 0.002                                       # segundos entre lotes
+PESO_MIN, PESO_MAX = 20.0, 350.0                    # kg
+MAX_ERROS = 5                                       # exemplos de linha recusada no resumo
+PARADA = 600     # importação sem andamento há mais que isso morreu com o worker
+FUSO = regional.FUSO
+
+UNIDADES = {"kg": 1.0, "kgs": 1.0, "g": 0.001, "lb": 0.45359237, "lbs": 0.45359237,
+            "st": 6.35029318}
+
+# Nomes de coluna (minúsculos, sem a unidade)
+COLUNAS_DATA = {"date", "data", "datetime", "date time", "data/hora", "data e hora",
+                "timestamp", "time of measurement", "measurement time", "start time", "dia"}
+COLUNAS_HORA = {"time", "hora", "horário", "horario"}
+COLUNAS_PESO = {"weight", "peso", "body weight", "bodyweight", "peso corporal", "massa"}
+COLUNAS_UNIDADE = {"unit", "units", "unidade", "weight unit"}
+
+_UNIDADE_NO_NOME = re.compile(r"[\s_(\[]+(kgs?|lbs?|st|g)[)\]]?$")
+_VALOR = re.compile(r"^([-+]?[\d.,\s]*\d)\s*([a-zA-Z]*)\.?$")
+
+_DATAS_DIA = ("%d/%m/%Y", "%d.%m.%Y", "%d-%m-%Y", "%d/%m/%y")
+_DATAS_MES = ("%m/%d/%Y", "%m-%d-%Y", "%m/%d/%y")
+_DATAS_FIXAS = ("%Y/%m/%d", "%Y.%m.%d", "%b %d, %Y", "%B %d, %Y", "%d %b %Y")
+_HORAS = ("", " %H:%M", " %H:%M:%S", " %I:%M %p", " %I:%M:%S %p", ", %H:%M", ", %I:%M %p")
+
+_vez = threading.Semaphore(1)   # uma importação gravando por processo
+
+
+class EmAndamento(Exception):
+    """O jogador já tem uma importação na fila ou rodando."""
+
+    def __init__(self, importacao_id):
+        super().__init__(f"importação {importacao_id} em andamento")
+        self.id = importacao_id
+
+
+# ------------------- NORMALIZAÇÃO -------------------
+
+def peso_kg(valor, unidade="kg"):
+    """'80,5' / '177.4 lbs' -> kg (2 casas). A unidade do valor vence a padrão."""
+    m = _VALOR.match(valor.strip())
+    if not m:
+        raise ValueError("peso inválido")
+    sufixo = m.group(2).lower()
+    if sufixo and sufixo not in UNIDADES:
+        raise ValueError(f"unidade desconhecida: {sufixo}")
+    kg = regional.numero(m.group(1)) * UNIDADES[sufixo or unidade]
+    if not PESO_MIN <= kg <= PESO_MAX:
+        raise ValueError(f"peso fora da faixa ({PESO_MIN:.0f}–{PESO_MAX:.0f} kg)")
+    return round(kg, 2)
+
+
+class Datas:
+    """Texto de data/hora -> 'AAAA-MM-DD HH:MM:SS' na hora local do jogador.
+
+    Guarda o último formato que funcionou: num arquivo exportado todas as
+    linhas têm o mesmo, então quase sempre é um strptime só por linha.
+    """
+
+    def __init__(self, tz, dia_primeiro=True):
+        self.tz = tz
+        datas = (_DATAS_DIA if dia_primeiro else _DATAS_MES) + _DATAS_FIXAS
+        self.formatos = [d + h for d in datas for h in _HORAS]
+        self.ultimo = None
+
+    def _ler(self, t):
+        if t.isdigit() and len(t) >= 9:
+            segundos = int(t) / 1000 if len(t) >= 12 else int(t)
+            return datetime.fromtimestamp(segundos, self.tz)
+        if self.ultimo:
+            try:
+                return datetime.strptime(t, self.ultimo)
+            except ValueError:
+                pass
+        try:
+            return datetime.fromisoformat(t)
+        except ValueError:
+            pass
+        for formato in self.formatos:
+            try:
+                quando = datetime.strptime(t, formato)
+            except ValueError:
+                continue
+            self.ultimo = formato
+            return quando
+        raise ValueError(f"data inválida: {t[:40]!r}")
+
+    def __call__(self, texto):
+        quando = self._ler(texto.strip())
+        if quando.tzinfo is not None:
+            quando = quando.astimezone(self.tz).replace(tzinfo=None)
+        return quando.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ------------------- LEITURA -------------------
+
+def abrir(caminho):
+    """Abre o CSV como texto: UTF-8 (com ou sem BOM) ou, se não for, Windows-1252."""
+    with open(caminho, "rb") as f:
+        amostra = f.read(64 * 1024)
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(amostra, final=False)
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError:
+        encoding = "cp1252"   # export do Excel em português
+    return open(caminho, encoding=encoding, newline="")
+
+
+def _nome(coluna):
+    """'Weight (lb)' -> ('weight', 'lb'); 'Peso' -> ('peso', None)."""
+    nome = coluna.strip().strip('"').lower()
+    m = _UNIDADE_NO_NOME.search(nome)
+    if m and nome[:m.start()].strip():
+        return nome[:m.start()].strip(), m.group(1)
+    return nome, None
+
+
+def colunas(cabecalho):
+    """Índices de (data, hora, peso, unidade) e a unidade do nome da coluna de peso."""
+    data = hora = peso = unidade = None
+    unidade_nome = None
+    for i, coluna in enumerate(cabecalho):
+        nome, un = _nome(coluna)
+        if nome in COLUNAS_DATA and data is None:
+            data = i
+        elif nome in COLUNAS_HORA and hora is None:
+            hora = i
+        elif nome in COLUNAS_PESO and peso is None:
+            peso, unidade_nome = i, un
+        elif nome in COLUNAS_UNIDADE and unidade is None:
+            unidade = i
+    if data is None:
+        # Sem coluna de data, "Time" é o horário completo
+        data, hora = hora, None
+    if data is None or peso is None:
+        raise ValueError("o CSV precisa de uma coluna de data (Date/Data/Timestamp) "
+                         "e uma de peso (Weight/Peso)")
+    return data, hora, peso, unidade, unidade_nome
+
+
+def _separador(linha):
+    return max(",;\t|", key=linha.count)
+
+
+def ler(arquivo, tz=None, unidade="auto", dia_primeiro=True):
+    """(nº da linha, log_date, kg, motivo) de cada linha com peso.
+
+    motivo é None nas válidas; nas recusadas, log_date/kg são None.
+    ValueError logo de cara se o cabeçalho não tiver data e peso.
+    """
+    primeira = next((l for l in arquivo if l.strip()), "")
+    separador = _separador(primeira)
+    if primeira.lower().startswith("sep="):
+        separador = primeira[4:5] or separador
+        primeira = next((l for l in arquivo if l.strip()), "")
+    leitor = csv.reader(itertools.chain([primeira], arquivo), delimiter=separador)
+    i_data, i_hora, i_peso, i_unidade, unidade_nome = colunas(next(leitor, []))
+
+    padrao = unidade_nome or (unidade if unidade in UNIDADES else "kg")
+    datas = Datas(tz or timezone.utc, dia_primeiro)
+    for n, linha in enumerate(leitor, 2):
+        valor = linha[i_peso].strip() if i_peso < len(linha) else ""
+        if not valor or valor == "-":
+            continue
+        try:
+            texto = linha[i_data]
+            if i_hora is not None and i_hora < len(linha) and linha[i_hora].strip():
+                texto = f"{texto.strip()} {linha[i_hora].strip()}"
+            un = padrao
+            if i_unidade is not None and i_unidade < len(linha) and linha[i_unidade].strip():
+                un = linha[i_unidade].strip().lower()
+                if un not in UNIDADES:
+                    raise ValueError(f"unidade desconhecida: {un}")
+            yield n, datas(texto), peso_kg(valor, un), None
+        except (ValueError, IndexError, OverflowError, OSError) as e:
+            yield n, None, None, str(e) or "linha incompleta"
+
+
+# ------------------- GRAVAÇÃO -------------------
+
+def importar(conn, user_id, linhas, lote=LOTE, progresso=None):
+    """Grava as linhas de `ler` em lotes, uma transação por lote.
+
+    progresso(conn, resumo) roda dentro da transação de cada lote (o
+    andamento salvo nunca passa do que foi gravado). Retorna o resumo:
+    lidas, gravadas, repetidas, rejeitadas, erros (exemplos) e o maior
+    tempo de um lote segurando o lock de escrita.
+    """
+    sql = exportacao.sql_insercao(exportacao.POR_NOME["weight_log"])
+    resumo = {"lidas": 0, "gravadas": 0, "repetidas": 0, "rejeitadas": 0,
+              "erros": [], "maior_lote_ms": 0.0}
+    pendentes = []
+
+    def gravar():
+        inicio = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            novos = conn.executemany(sql, pendentes).rowcount
+            resumo["gravadas"] += novos
+            resumo["repetidas"] += len(pendentes) - novos
+            if progresso:
+                progresso(conn, resumo)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        ms = (time.perf_counter() - inicio) * 1000
+        resumo["maior_lote_ms"] = max(resumo["maior_lote_ms"], round(ms, 1))
+        pendentes.clear()
+        time.sleep(PAUSA)   # deixa as requisições pegarem o lock
+
+    for n, log_date, kg, motivo in linhas:
+        resumo["lidas"] += 1
+        if motivo:
+            resumo["rejeitadas"] += 1
+            if len(resumo["erros"]) < MAX_ERROS:
+                resumo["erros"].append(f"linha {n}: {motivo}")
+            continue
+        # Parâmetros na ordem do sql_insercao: user_id, weight_kg, log_date
+        pendentes.append((user_id, kg, log_date))
+        if len(pendentes) >= lote:
+            gravar()
+    if pendentes:
+        gravar()
+    if resumo["gravadas"]:
+        # Histórico antigo chega fora de ordem: a tendência é refeita uma vez no fim
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tendencia.recalcular(conn, user_id)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return resumo
+
+
+# ------------------- SEGUNDO PLANO -------------------
+
+def _salvar_andamento(importacao_id):
+    def salvar(conn, resumo):
+        conn.execute("""
+            UPDATE importacoes SET lidas=?, gravadas=?, repetidas=?, rejeitadas=?, atualizado_em=?
+            WHERE id=?
+        """, (resumo["lidas"], resumo["gravadas"], resumo["repetidas"], resumo["rejeitadas"],
+              time.time(), importacao_id))
+    return salvar
+
+
+def _rodar(caminho_db, importacao_id, user_id, caminho, tz, unidade, dia_primeiro):
+    with _vez:
+        conn = db.connect(caminho_db)
+        try:
+            conn.execute("UPDATE importacoes SET status='rodando', atualizado_em=? WHERE id=?",
+                         (time.time(), importacao_id))
+            conn.commit()
+            with abrir(caminho) as arquivo:
+                resumo = importar(conn, user_id, ler(arquivo, tz, unidade, dia_primeiro),
+                                  progresso=_salvar_andamento(importacao_id))
+            _salvar_andamento(importacao_id)(conn, resumo)
+            conn.execute("""
+                UPDATE importacoes SET status='ok', erros=?, finished_at=CURRENT_TIMESTAMP
+                WHERE id=?
+            """, ("\n".join(resumo["erros"]) or None, importacao_id))
+            conn.commit()
+            print(f"⚖️ Importação {importacao_id}: {resumo['gravadas']} pesos novos de "
+                  f"{resumo['lidas']} ({resumo['repetidas']} repetidos, {resumo['rejeitadas']} recusados)")
+        except Exception as e:
+            conn.rollback()
+            print(f"Erro na importação {importacao_id}:", e)
+            conn.execute("""
+                UPDATE importacoes SET status='erro', erros=?, finished_at=CURRENT_TIMESTAMP
+                WHERE id=?
+            """, (str(e)[:500], importacao_id))
+            conn.commit()
+        finally:
+            conn.close()
+            os.remove(caminho)
+
+
+def iniciar(app, user_id, arquivo, nome_fuso=FUSO, unidade="auto", dia_primeiro=True):
+    """Salva o upload em disco, confere o cabeçalho e põe a importação na fila.
+
+    Retorna o id. ValueError se o arquivo/fuso não servir, EmAndamento se o
+    jogador já tiver uma importação rodando.
+    """
+    tz = regional.fuso(nome_fuso)
+    conn = db.get_db()
+    ativa = conn.execute("""
+        SELECT id FROM importacoes
+        WHERE user_id=? AND status IN ('fila', 'rodando') AND atualizado_em > ?
+        ORDER BY id DESC LIMIT 1
+    """, (user_id, time.time() - PARADA)).fetchone()
+    if ativa:
+        raise EmAndamento(ativa[0])
+
+    fd, caminho = tempfile.mkstemp(prefix="varzea_peso_", suffix=".csv")
+    os.close(fd)
+    try:
+        arquivo.save(caminho)
+        # Cabeçalho errado volta na hora, não depois na fila
+        with abrir(caminho) as f:
+            next(ler(f, tz, unidade, dia_primeiro), None)
+        importacao_id = conn.execute("""
+            INSERT INTO importacoes (user_id, arquivo, atualizado_em) VALUES (?, ?, ?)
+            RETURNING id
+        """, (user_id, (arquivo.filename or "")[:200], time.time())).fetchone()[0]
+        conn.commit()
+    except Exception:
+        os.remove(caminho)
+        raise
+
+    # Thread não-daemon: na reciclagem do worker o Python espera ela terminar
+    threading.Thread(
+        target=_rodar, name=f"importacao-{importacao_id}",
+        args=(app.config["DATABASE"], importacao_id, user_id, caminho, tz, unidade, dia_primeiro),
+    ).start()
+    return importacao_id
+
+
+def status(conn, user_id, importacao_id):
+    """Andamento da importação do jogador (None se não existir ou for de outro)."""
+    row = conn.execute("""
+        SELECT id, arquivo, status, lidas, gravadas, repetidas, rejeitadas, erros,
+               atualizado_em, created_at, finished_at
+        FROM importacoes WHERE id=? AND user_id=?
+    """, (importacao_id, user_id)).fetchone()
+    if row is None:
+        return None
+    info = dict(row)
+    info["erros"] = info["erros"].split("\n") if info["erros"] else []
+    atualizado = info.pop("atualizado_em") or 0
+    if info["status"] in ("fila", "rodando") and atualizado < time.time() - PARADA:
+        info.update(status="erro", erros=["importação interrompida (reinício do servidor) — envie de novo"])
+    return info
+
+
+def init_app(app):
+    @app.cli.command("import-weights")
+    @click.argument("email")
+    @click.argument("arquivo", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--fuso", "nome_fuso", default=FUSO, show_default=True,
+                  help="Fuso do jogador (horários com fuso/epoch são convertidos para ele).")
+    @click.option("--unidade", type=click.Choice(["auto"] + list(UNIDADES)), default="auto",
+                  show_default=True, help="Unidade quando o arquivo não diz (auto = kg).")
+    @click.option("--mes-primeiro", is_flag=True, help="Datas no formato mm/dd/aaaa (EUA).")
+    def import_weights_command(email, arquivo, nome_fuso, unidade, mes_primeiro):
+        """Importa o histórico de peso de um CSV de balança/relógio para o jogador."""
+        db.preparar()
+        conn = db.connect(app.config["DATABASE"])
+        try:
+            row = conn.execute("SELECT id FROM users WHERE email=?", (email,)).fetchone()
+            if not row:
+                print(f"❌ Usuário {email} não encontrado.")
+                sys.exit(1)
+            inicio = time.perf_counter()
+            with abrir(arquivo) as f:
+                resumo = importar(conn, row[0], ler(f, regional.fuso(nome_fuso), unidade, not mes_primeiro))
+        except ValueError as e:
+            print("❌", e)
+            sys.exit(1)
+        finally:
+            conn.close()
+        segundos = time.perf_counter() - inicio
+        print(f"✅ {resumo['gravadas']} pesos novos de {resumo['lidas']} linhas em {segundos:.2f}s "
+              f"({resumo['repetidas']} repetidos, {resumo['rejeitadas']} recusados; "
+              f"maior lote {resumo['maior_lote_ms']:.0f} ms)")
+        for erro in resumo["erros"]:
+            print("  ⚠️", erro)
@@ -0,0 +1,63 @@
+# cache_paginas.py
+# Cache de páginas que não dependem do usuário (dieta, recuperação, pré-jogo...).
+#
+# A view roda uma vez por processo: o HTML fica em memória já comprimido
+# (gzip), com ETag forte. Pedidos com If-None-Match igual recebem 304 sem
+# corpo; os demais recebem os bytes prontos. Em modo debug a página é
+# refeita quando o template muda (mtime, via loader do Jinja).
+#
+#     @app.route("/dieta")
+#     @cache_paginas.estatica("dieta.html")
+#     def dieta(): ...
+import gzip
+import hashlib
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+_paginas = {}
+
+
+def _montar(view, template, args, kwargs):
+    # uptodate() do loader diz se o arquivo do template mudou desde agora
+    _, _, uptodate = current_app.jinja_loader.get_source(current_app.jinja_env, template)
+    corpo = view(*args, **kwargs).encode()
+    etag = hashlib.sha256(corpo).hexdigest()[:20]
+    return {
+        "identity": (corpo, etag),
+        "gzip": (gzip.compress(corpo, 9), etag + "-gz"),
+        "uptodate": uptodate,
+    }
+
+
+def estatica(template):
+    """Decorator: guarda a saída da view (que não pode depender do usuário)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            chave = (request.endpoint, tuple(sorted(kwargs.items())))
+            pagina = _paginas.get(chave)
+            if pagina is None or (current_app.debug and not pagina["uptodate"]()):
+                pagina = _paginas[chave] = _montar(view, template, args, kwargs)
+
+            codificacao = "gzip" if "gzip" in request.accept_encodings else "identity"
+            corpo, etag = pagina[codificacao]
+
+            if request.if_none_match.contains(etag):
+                resp = make_response("", 304)
+            else:
+                resp = make_response(corpo)
+                resp.content_type = "text/html; charset=utf-8"
+                if codificacao == "gzip":
+                    resp.content_encoding = "gzip"
+            resp.set_etag(etag)
+            # Navegador sempre revalida (página atrás de login), mas com 304 barato
+            resp.headers["Cache-Control"] = "private, no-cache"
+            resp.vary.add("Accept-Encoding")
+            return resp
+        return wrapper
+    return decorator
+
+
+def limpar():
+    _paginas.clear()
@@ -0,0 +1,341 @@
+# carga.py
+# Teste de carga: quantos jogadores simultâneos uma instância aguenta.
+#
+#     flask --app varzea_trainer_flask load-test --vus 16 --duracao 30
+#     flask --app varzea_trainer_flask load-test --gunicorn --json carga.json
+#     flask --app varzea_trainer_flask load-test --url http://127.0.0.1:5000
+#
+# Cada usuário virtual (thread) se cadastra, faz login e depois repete
+# jornadas sorteadas por peso (JORNADAS) até acabar o tempo. Sem --url/
+# --gunicorn roda dentro do processo com o test client do Flask; com
+# --gunicorn sobe um gunicorn local (gunicorn.conf.py) num banco temporário.
+# Tudo offline: o banco é sempre temporário e o SMTP é o local.
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+
+import click
+
+import db
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MEDIDAS = ("barriga", "peito", "braco_dir", "braco_esq",
+           "coxa_dir", "coxa_esq", "pant_dir", "pant_esq")
+
+
+# ------------------- JORNADAS -------------------
+# Cada passo: (rótulo da rota, método, caminho, dados do form)
+
+def _treino_amador(vu):
+    dia = random.randint(1, 13)
+    return [
+        ("GET /dashboard", "get", "/dashboard", None),
+        ("GET /treino/<id>", "get", f"/treino/{dia}", None),
+        ("POST /treino/<id>", "post", f"/treino/{dia}", {"treino_id": str(dia)}),
+    ]
+
+
+def _treino_semi_pro(vu):
+    dia = random.randint(1, 21)
+    return [
+        ("GET /treino_semi_pro", "get", f"/treino_semi_pro?treino_id={dia}", None),
+        ("POST /treino_semi_pro", "post", f"/treino_semi_pro?treino_id={dia}", {"treino_id": str(dia)}),
+    ]
+
+
+def _peso(vu):
+    return [
+        ("POST /peso_diario", "post", "/peso_diario", {"peso_diario": f"{random.uniform(70, 90):.1f}"}),
+        ("GET /peso_grafico", "get", "/peso_grafico", None),
+        ("GET /api/peso", "get", "/api/peso?pontos=200", None),
+    ]
+
+
+def _perfil(vu):
+    return [
+        ("GET /perfil", "get", "/perfil", None),
+        ("POST /perfil", "post", "/perfil", {"idade": "25", "altura": "1,75", "peso": "82"}),
+    ]
+
+
+def _medidas(vu):
+    return [
+        ("POST /medidas", "post", "/medidas", {k: f"{random.uniform(30, 40):.1f}" for k in MEDIDAS}),
+        ("GET /comparativo", "get", "/comparativo", None),
+    ]
+
+
+def _login(vu):
+    return [
+        ("GET /logout", "get", "/logout", None),
+        ("POST /login", "post", "/login", {"email": vu.email, "password": vu.senha}),
+    ]
+
+
+def _navegacao(vu):
+    return [
+        ("GET /dashboard", "get", "/dashboard", None),
+        ("GET /dieta", "get", "/dieta", None),
+        ("GET /meus_checkins", "get", "/meus_checkins", None),
+    ]
+
+
+# nome -> (peso, jornada)
+JORNADAS = {
+    "treino_amador": (25, _treino_amador),
+    "treino_semi_pro": (20, _treino_semi_pro),
+    "peso": (15, _peso),
+    "perfil": (15, _perfil),
+    "medidas": (10, _medidas),
+    "navegacao": (10, _navegacao),
+    "login": (5, _login),
+}
+
+
+# ------------------- CLIENTES -------------------
+
+class _ClienteFlask:
+    """Test client do Flask (um por usuário virtual, com os próprios cookies)."""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def pedir(self, metodo, caminho, dados):
+        return getattr(self._client, metodo)(caminho, data=dados).status_code
+
+    def fechar(self):
+        db.close_all()
+
+
+class _ClienteHTTP:
+    """HTTP/1.1 keep-alive contra um servidor de verdade; guarda o cookie de sessão."""
+
+    def __init__(self, url):
+        partes = urllib.parse.urlsplit(url)
+        self._host, self._porta = partes.hostname, partes.port or 80
+        self._conn = None
+        self._cookie = None
+
+    def pedir(self, metodo, caminho, dados):
+        headers = {}
+        corpo = None
+        if dados is not None:
+            corpo = urllib.parse.urlencode(dados)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self._cookie:
+            headers["Cookie"] = self._cookie
+        for tentativa in (1, 2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self._host, self._porta, timeout=60)
+            try:
+                self._conn.request(metodo.upper(), caminho, body=corpo, headers=headers)
+                resp = self._conn.getresponse()
+                resp.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # Keep-alive fechado pelo servidor (ex.: worker reciclado): reconecta uma vez
+                self._conn.close()
+                self._conn = None
+                if tentativa == 2:
+                    raise
+        cookie = resp.getheader("Set-Cookie")
+        if cookie:
+            self._cookie = cookie.split(";", 1)[0]
+        return resp.status
+
+    def fechar(self):
+        if self._conn is not None:
+            self._conn.close()
+
+
+# ------------------- EXECUÇÃO -------------------
+
+class _Resultados:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencias = defaultdict(list)                       # rota -> [segundos]
+        self.status = defaultdict(lambda: defaultdict(int))      # rota -> {status: n}
+
+    def registrar(self, rota, status, segundos):
+        with self.lock:
+            self.latencias[rota].append(segundos)
+            self.status[rota][status] += 1
+
+
+class _UsuarioVirtual(threading.Thread):
+    def __init__(self, n, cliente, resultados, fim, jornadas):
+        super().__init__(name=f"vu-{n}", daemon=True)
+        self.email = f"carga{n}-{os.getpid()}@teste.com"
+        self.senha = "carga123"
+        self.cliente = cliente
+        self.resultados = resultados
+        self.fim = fim
+        self.nomes = list(jornadas)
+        self.pesos = [jornadas[j][0] for j in self.nomes]
+        self.jornadas = jornadas
+
+    def _passo(self, rota, metodo, caminho, dados):
+        inicio = time.perf_counter()
+        try:
+            status = self.cliente.pedir(metodo, caminho, dados)
+        except Exception:
+            status = "erro"
+        self.resultados.registrar(rota, status, time.perf_counter() - inicio)
+
+    def run(self):
+        try:
+            self._passo("POST /register", "post", "/register",
+                        {"name": "Carga", "email": self.email, "password": self.senha})
+            self._passo("POST /login", "post", "/login",
+                        {"email": self.email, "password": self.senha})
+            while time.monotonic() < self.fim:
+                nome = random.choices(self.nomes, self.pesos)[0]
+                for passo in self.jornadas[nome][1](self):
+                    self._passo(*passo)
+        finally:
+            self.cliente.fechar()
+
+
+def _percentil(ordenados, p):
+    # Nearest-rank
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))]
+
+
+def _resumo(latencias, status, duracao):
+    ordenados = sorted(latencias)
+    erros = sum(n for s, n in status.items() if s == "erro" or s >= 500)
+    return {
+        "requisicoes": len(ordenados),
+        "req_s": round(len(ordenados) / duracao, 1),
+        "p50_ms": round(_percentil(ordenados, 50) * 1000, 1),
+        "p95_ms": round(_percentil(ordenados, 95) * 1000, 1),
+        "p99_ms": round(_percentil(ordenados, 99) * 1000, 1),
+        "erros": erros,
+        "status": {str(s): n for s, n in sorted(status.items(), key=str)},
+    }
+
+
+def rodar(fabrica_cliente, vus, duracao, jornadas=JORNADAS):
+    """Roda `vus` usuários virtuais por `duracao` segundos. Retorna o relatório (dict)."""
+    resultados = _Resultados()
+    fim = time.monotonic() + duracao
+    inicio = time.monotonic()
+    threads = [_UsuarioVirtual(n, fabrica_cliente(), resultados, fim, jornadas)
+               for n in range(vus)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    decorrido = time.monotonic() - inicio
+
+    todas, status_total = [], defaultdict(int)
+    rotas = {}
+    for rota in sorted(resultados.latencias):
+        todas += resultados.latencias[rota]
+        for s, n in resultados.status[rota].items():
+            status_total[s] += n
+        rotas[rota] = _resumo(resultados.latencias[rota], resultados.status[rota], decorrido)
+    return {
+        "vus": vus,
+        "duracao_s": round(decorrido, 1),
+        "total": _resumo(todas, status_total, decorrido),
+        "rotas": rotas,
+    }
+
+
+def tabela(relatorio):
+    """Relatório em texto, uma linha por rota."""
+    linhas = [f"{'rota':<26} {'req':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'erros':>6}"]
+    itens = list(relatorio["rotas"].items()) + [("TOTAL", relatorio["total"])]
+    for rota, r in itens:
+        linhas.append(
+            f"{rota:<26} {r['requisicoes']:>7} {r['req_s']:>8.1f} {r['p50_ms']:>6.1f}ms "
+            f"{r['p95_ms']:>6.1f}ms {r['p99_ms']:>6.1f}ms {r['erros']:>6}"
+        )
+    return "\n".join(linhas)
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _subir_gunicorn(banco, perfil):
+    porta = _porta_livre()
+    env = dict(os.environ, VARZEA_DB=banco, PORT=str(porta), SMTP_LOCAL="1",
+               MAIL_OUTBOX_WORKER="off")
+    if perfil:
+        env["GUNICORN_PROFILE"] = perfil
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:app"],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{porta}"
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        if proc.poll() is not None:
+            raise click.ClickException("gunicorn encerrou antes de subir")
+        try:
+            if _ClienteHTTP(url).pedir("get", "/login", None) == 200:
+                return proc, url
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise click.ClickException("gunicorn não respondeu em 30s")
+
+
+def init_app(app):
+    @app.cli.command("load-test")
+    @click.option("--vus", default=8, show_default=True, help="Usuários virtuais simultâneos.")
+    @click.option("--duracao", default=20.0, show_default=True, help="Segundos de carga.")
+    @click.option("--url", default=None, help="Servidor já rodando (ex.: http://127.0.0.1:5000).")
+    @click.option("--gunicorn", "usar_gunicorn", is_flag=True, help="Sobe um gunicorn local num banco temporário.")
+    @click.option("--perfil", default=None, help="GUNICORN_PROFILE do gunicorn local (sync/gthread/gevent).")
+    @click.option("--json", "saida_json", default=None, help="Grava o relatório JSON neste arquivo ('-' = stdout).")
+    def load_test_command(vus, duracao, url, usar_gunicorn, perfil, saida_json):
+        """Jornadas de jogadores simultâneos; vazão e p50/p95/p99 por rota."""
+        fd, banco = tempfile.mkstemp(prefix="varzea_carga_", suffix=".db")
+        os.close(fd)
+        os.remove(banco)  # o app cria e migra na 1ª conexão
+        original = app.config["DATABASE"]
+        proc = None
+        try:
+            if usar_gunicorn:
+                proc, url = _subir_gunicorn(banco, perfil)
+            if url:
+                modo = f"http {url}"
+                relatorio = rodar(lambda: _ClienteHTTP(url), vus, duracao)
+            else:
+                modo = "test client"
+                app.config.update(DATABASE=banco, MAIL_OUTBOX_WORKER="off")
+                relatorio = rodar(lambda: _ClienteFlask(app), vus, duracao)
+        finally:
+            app.config["DATABASE"] = original
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=30)
+            for sufixo in ("", "-wal", "-shm"):
+                if os.path.exists(banco + sufixo):
+                    os.remove(banco + sufixo)
+
+        relatorio["modo"] = modo
+        if saida_json == "-":
+            print(json.dumps(relatorio, indent=1))
+            return
+        if saida_json:
+            with open(saida_json, "w") as f:
+                json.dump(relatorio, f, indent=1)
+        print(f"🏋️ {vus} usuários virtuais, {relatorio['duracao_s']}s ({modo})")
+        print(tabela(relatorio))
@@ -0,0 +1,84 @@
+# catalogo.py
+# Catálogo dos planos de treino, carregado de catalogo_treinos.json.
+#
+# Cada dia vira um Treino imutável (namedtuple, sem __dict__) e fica num
+# índice (programa, dia) -> Treino. Totais saem do próprio arquivo; novo
+# plano ou dia novo = editar o JSON, sem mexer no Python. O arquivo é lido
+# na primeira consulta.
+#
+# Formato (versão 1):
+#     {"versao": 1, "programas": [
+#         {"nome": "amador", "tipo": "checkin",
+#          "dias": [{"titulo": "...", "descricao": "...", "exercicios": ["..."]}]}
+#     ]}
+# tipo "checkin": progresso na tabela checkins (amador, semi_pro);
+# tipo "ciclo": programa específico em program_progress (ver programas.py).
+import json
+import os
+from collections import namedtuple
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO = os.environ.get("VARZEA_CATALOGO", os.path.join(APP_DIR, "catalogo_treinos.json"))
+VERSOES_SUPORTADAS = (1,)
+
+Treino = namedtuple("Treino", "programa id titulo descricao exercicios")
+
+_indice = {}      # (programa, dia) -> Treino
+_programas = {}   # programa -> (tipo, (Treino, ...))
+
+
+def carregar(caminho=ARQUIVO):
+    """Lê o arquivo e substitui o catálogo em memória."""
+    with open(caminho, encoding="utf-8") as f:
+        dados = json.load(f)
+
+    versao = dados.get("versao")
+    if versao not in VERSOES_SUPORTADAS:
+        raise ValueError(f"{caminho}: versão de catálogo não suportada ({versao!r})")
+
+    indice, programas = {}, {}
+    for prog in dados["programas"]:
+        nome = prog["nome"]
+        if nome in programas:
+            raise ValueError(f"{caminho}: programa repetido ({nome})")
+        dias = tuple(
+            Treino(nome, i, d["titulo"], d.get("descricao", ""), tuple(d["exercicios"]))
+            for i, d in enumerate(prog["dias"], start=1)
+        )
+        if not dias:
+            raise ValueError(f"{caminho}: programa sem dias ({nome})")
+        programas[nome] = (prog.get("tipo", "ciclo"), dias)
+        indice.update(((nome, t.id), t) for t in dias)
+
+    _indice.clear()
+    _indice.update(indice)
+    _programas.clear()
+    _programas.update(programas)
+
+
+def _garantir():
+    # Carrega na primeira consulta, não na importação
+    if not _programas:
+        carregar()
+
+
+def treino(programa, dia):
+    """Treino do dia (1..total) ou None."""
+    _garantir()
+    return _indice.get((programa, dia))
+
+
+def treinos(programa):
+    _garantir()
+    return _programas[programa][1]
+
+
+def total(programa):
+    _garantir()
+    return len(_programas[programa][1])
+
+
+def programas(tipo=None):
+    """Nomes dos programas (na ordem do arquivo), opcionalmente de um tipo."""
+    _garantir()
+    return [nome for nome, (t, _) in _programas.items() if tipo in (None, t)]
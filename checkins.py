@@ -0,0 +1,53 @@
+# checkins.py
+# Histórico de check-ins paginado por cursor (keyset) em (created_at, id).
+#
+# Cada página é um SEARCH em idx_checkins_user_created (user_id, created_at):
+# o id é o rowid, que o SQLite já guarda no fim de toda entrada de índice,
+# então a ordem (created_at DESC, id DESC) sai pronta do índice. Custo e
+# memória por página não dependem de quantos check-ins o jogador tem.
+#
+# O cursor é opaco para o cliente: base64 de "created_at|id" do último item.
+import base64
+import binascii
+
+POR_PAGINA = 50
+POR_PAGINA_MAX = 200
+
+
+def codificar_cursor(created_at, id_):
+    return base64.urlsafe_b64encode(f"{created_at}|{id_}".encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    """Cursor -> (created_at, id). ValueError se for inválido."""
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id_ = bruto.rsplit("|", 1)
+        return created_at, int(id_)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("cursor inválido")
+
+
+def pagina(conn, user_id, cursor=None, limite=POR_PAGINA):
+    """Uma página de check-ins (mais novos primeiro) e o cursor da próxima (ou None)."""
+    limite = max(1, min(int(limite), POR_PAGINA_MAX))
+    if cursor:
+        created_at, id_ = decodificar_cursor(cursor)
+        rows = conn.execute("""
+            SELECT id, treino, created_at FROM checkins
+            WHERE user_id=? AND (created_at, id) < (?, ?)
+            ORDER BY created_at DESC, id DESC LIMIT ?
+        """, (user_id, created_at, id_, limite + 1)).fetchall()
+    else:
+        rows = conn.execute("""
+            SELECT id, treino, created_at FROM checkins
+            WHERE user_id=?
+            ORDER BY created_at DESC, id DESC LIMIT ?
+        """, (user_id, limite + 1)).fetchall()
+
+    # Buscou um a mais só para saber se existe próxima página
+    proximo = None
+    if len(rows) > limite:
+        rows = rows[:limite]
+        proximo = codificar_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return rows, proximo
@@ -0,0 +1,226 @@
+# db.py
+# Camada de conexão SQLite do app.
+#
+# Cada thread (ou worker do gunicorn) mantém UMA conexão reaproveitada entre
+# requisições, já configurada com WAL, busy_timeout, cache e mmap. No teardown
+# a conexão só é "devolvida": qualquer transação pendente é desfeita, mas o
+# arquivo continua aberto para a próxima requisição.
+#
+# Nada aqui abre o banco na importação: a função `preparar` do init_app
+# (migrações) roda na primeira conexão de cada processo.
+import os
+import sqlite3
+import threading
+import time
+
+from flask import current_app, g
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Caminho único do banco — pode ser trocado via VARZEA_DB.
+# Use VARZEA_DB=":memory:" para benchmarks (banco em memória compartilhado).
+DEFAULT_DB_PATH = os.environ.get("VARZEA_DB", os.path.join(APP_DIR, "varzea.db"))
+
+MEMORY = ":memory:"
+_MEMORY_URI = "file:varzea_mem?mode=memory&cache=shared"
+
+# PRAGMAs aplicados uma única vez por conexão
+BUSY_TIMEOUT_MS = int(os.environ.get("VARZEA_DB_BUSY_TIMEOUT", 5000))
+CACHE_SIZE_KB = int(os.environ.get("VARZEA_DB_CACHE_KB", 16384))
+MMAP_SIZE = int(os.environ.get("VARZEA_DB_MMAP", 128 * 1024 * 1024))
+
+_local = threading.local()
+# Mantém o banco em memória vivo enquanto o processo existir
+_memory_anchor = None
+_memory_lock = threading.Lock()
+# (pid, caminho) já preparados neste processo
+_preparados = set()
+_preparar_lock = threading.Lock()
+
+
+# Observadores de SQL: fn(sql, segundos, novo) — métricas, log de lentas...
+# novo=False quando é só mais tempo de fetch do mesmo statement.
+_observadores = []
+
+
+def observar(fn):
+    """Registra um observador de SQL (vale para todas as conexões)."""
+    if fn not in _observadores:
+        _observadores.append(fn)
+    return fn
+
+
+def esquecer(fn):
+    """Remove um observador registrado com observar()."""
+    if fn in _observadores:
+        _observadores.remove(fn)
+
+
+def _notificar(sql, inicio, novo=True):
+    segundos = time.perf_counter() - inicio
+    for fn in _observadores:
+        fn(sql, segundos, novo)
+
+
+class Cursor(sqlite3.Cursor):
+    """Cursor que mede execute/fetch quando há observadores (iteração direta não é medida)."""
+
+    def execute(self, sql, parameters=()):
+        if not _observadores:
+            return super().execute(sql, parameters)
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._sql = sql
+            _notificar(sql, inicio)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not _observadores:
+            return super().executemany(sql, seq_of_parameters)
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._sql = sql
+            _notificar(sql, inicio)
+
+    def _fetch(self, metodo, *args):
+        if not _observadores:
+            return metodo(self, *args)
+        inicio = time.perf_counter()
+        try:
+            return metodo(self, *args)
+        finally:
+            _notificar(getattr(self, "_sql", None), inicio, novo=False)
+
+    def fetchone(self):
+        return self._fetch(sqlite3.Cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(sqlite3.Cursor.fetchmany, size or self.arraysize)
+
+    def fetchall(self):
+        return self._fetch(sqlite3.Cursor.fetchall)
+
+
+class Connection(sqlite3.Connection):
+    """Conexão cujos atalhos (execute/executemany) passam pelo Cursor medido."""
+
+    def cursor(self, factory=Cursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        if not _observadores:
+            return super().commit()
+        inicio = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            _notificar("COMMIT", inicio)
+
+
+def is_memory(path):
+    return path == MEMORY
+
+
+def connect(path=None):
+    """Abre uma conexão nova já configurada (fora do pool)."""
+    global _memory_anchor
+    path = path or DEFAULT_DB_PATH
+
+    if is_memory(path):
+        with _memory_lock:
+            if _memory_anchor is None:
+                _memory_anchor = sqlite3.connect(_MEMORY_URI, uri=True, check_same_thread=False)
+        conn = sqlite3.connect(_MEMORY_URI, uri=True, timeout=BUSY_TIMEOUT_MS / 1000,
+                               factory=Connection)
+    else:
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, factory=Connection)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def _db_path():
+    try:
+        return current_app.config.get("DATABASE", DEFAULT_DB_PATH)
+    except RuntimeError:
+        # Fora de contexto de app (scripts/CLI)
+        return DEFAULT_DB_PATH
+
+
+def preparar(path=None):
+    """Roda o `preparar` do init_app (migrações) se ainda não rodou neste processo."""
+    path = path or _db_path()
+    try:
+        fn = current_app.extensions.get("db_preparar")
+    except RuntimeError:
+        return
+    chave = (os.getpid(), path)
+    if fn is None or chave in _preparados:
+        return
+    with _preparar_lock:
+        if chave not in _preparados:
+            fn(path)
+            _preparados.add(chave)
+
+
+def get_db():
+    """Conexão reaproveitada da thread atual."""
+    path = _db_path()
+    pool = getattr(_local, "conns", None)
+
+    # Depois de um fork (gunicorn --preload) não reaproveita conexão do pai
+    if pool is None or getattr(_local, "pid", None) != os.getpid():
+        pool = _local.conns = {}
+        _local.pid = os.getpid()
+
+    conn = pool.get(path)
+    if conn is None:
+        preparar(path)
+        conn = pool[path] = connect(path)
+
+    try:
+        g._varzea_db = conn
+    except RuntimeError:
+        pass
+    return conn
+
+
+def release_db(exc=None):
+    """Devolve a conexão ao pool no fim da requisição."""
+    conn = g.pop("_varzea_db", None)
+    try:
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+    except sqlite3.ProgrammingError:
+        # Conexão já fechada por close_all()
+        pass
+
+
+def close_all():
+    """Fecha as conexões da thread atual (testes e shutdown)."""
+    pool = getattr(_local, "conns", None) or {}
+    for conn in pool.values():
+        conn.close()
+    pool.clear()
+
+
+def init_app(app, preparar=None):
+    """`preparar(caminho)` roda uma vez por processo, antes da 1ª conexão."""
+    app.config.setdefault("DATABASE", DEFAULT_DB_PATH)
+    app.extensions["db_preparar"] = preparar
+    app.teardown_appcontext(release_db)
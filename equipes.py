@@ -0,0 +1,289 @@
+# equipes.py
+# Modo clube: equipes com técnico, painel do elenco e plano indicado.
+#
+#     flask --app varzea_trainer_flask create-team "Unidos da Vila" tecnico@x.com
+#     flask --app varzea_trainer_flask team-add 1 a@x.com b@x.com [--tecnico]
+#
+# Na web (só o técnico da equipe): /equipe/<id> (painel), /api/equipe/<id>
+# (mesmos dados em JSON), e em lote pelo painel: convidar jogadores por
+# e-mail e indicar um plano (amador, semi_pro ou um programa específico).
+# Convite é só um convite: o jogador aceita (ou recusa) no próprio
+# dashboard, e até lá nada dele aparece no painel. A resposta ao técnico é
+# a mesma para qualquer e-mail — não diz quem tem cadastro. O team-add da
+# linha de comando (administração) inclui direto, já aceito.
+#
+# O painel sai de uma consulta só para o elenco inteiro: progresso de
+# user_progress (triggers), último peso de weight_trend e o último treino
+# de checkin_dias e ultimo_programa, que o reinício dos planos não apaga
+# (migrações 012 e 014), pelas chaves (user_id, ...) — nada de
+# rodar a lógica das telas do jogador para cada um. O resultado fica em
+# equipe_cache; os triggers da migração 011 apagam o painel quando algo de
+# um jogador da equipe muda, e a visita seguinte remonta (como perfil_cache).
+import json
+import sqlite3
+import sys
+from datetime import date
+
+import click
+
+import catalogo
+import db
+import ranking
+import regional
+
+PAPEIS = ("jogador", "tecnico")
+ATIVO_DIAS = 7   # treinou nos últimos N dias = ativo
+
+# ?1 = equipe, ?2 = usuário da sessão. Com painel salvo: 1 consulta.
+SQL_EQUIPE = """
+    SELECT t.nome,
+        (SELECT papel FROM team_members
+         WHERE team_id = ?1 AND user_id = ?2 AND aceito_em IS NOT NULL) AS papel,
+        c.dados
+    FROM teams t LEFT JOIN equipe_cache c ON c.team_id = t.id
+    WHERE t.id = ?1
+"""
+
+SQL_ELENCO = """
+    SELECT m.user_id, u.name, u.email, m.plano,
+        (SELECT json_group_object(p.plano, p.feitos) FROM user_progress p
+         WHERE p.user_id = m.user_id) AS feitos,
+        w.ultimo_kg, w.ultima AS pesou_em,
+        (SELECT MAX(dia) FROM checkin_dias d WHERE d.user_id = m.user_id) AS checkin_em,
+        (SELECT em FROM ultimo_programa g WHERE g.user_id = m.user_id) AS programa_em
+    FROM team_members m
+    JOIN users u ON u.id = m.user_id
+    LEFT JOIN weight_trend w ON w.user_id = m.user_id
+    WHERE m.team_id = ? AND m.papel = 'jogador' AND m.aceito_em IS NOT NULL
+    ORDER BY u.name COLLATE NOCASE
+"""
+
+
+class SemAcesso(Exception):
+    """Usuário não é técnico da equipe."""
+
+
+def planos():
+    """[(nome, total de dias)] de todos os planos do catálogo, na ordem do arquivo."""
+    return [(nome, catalogo.total(nome)) for nome in catalogo.programas()]
+
+
+def rotulos():
+    """{plano: nome para exibir} ("semi_pro" -> "Semi-pro")."""
+    return {nome: nome.replace("_", "-").capitalize() for nome in catalogo.programas()}
+
+
+def _dia_programa(em):
+    # ultimo_programa guarda o horário UTC; o painel compara dias locais
+    try:
+        return ranking.dia_local(em) if em else None
+    except ValueError:
+        return None
+
+
+def montar(conn, team_id):
+    """Lista do elenco (dicts prontos para JSON) a partir de SQL_ELENCO.
+    treinou_em = último dia (local, 'AAAA-MM-DD') com check-in ou programa."""
+    totais = dict(planos())
+    jogadores = []
+    for r in conn.execute(SQL_ELENCO, (team_id,)):
+        feitos = json.loads(r["feitos"]) if r["feitos"] else {}
+        treinou = max(filter(None, (r["checkin_em"], _dia_programa(r["programa_em"]))), default=None)
+        jogadores.append({
+            "user_id": r["user_id"], "nome": r["name"], "email": r["email"],
+            "plano": r["plano"],
+            "progresso": {nome: {"feitos": feitos.get(nome, 0), "total": total,
+                                 "pct": int(feitos.get(nome, 0) / total * 100) if total else 0}
+                          for nome, total in totais.items()},
+            "ultimo_kg": r["ultimo_kg"], "pesou_em": r["pesou_em"] or None,
+            "treinou_em": treinou,
+        })
+    return jogadores
+
+
+def painel(conn, team_id, user_id):
+    """{"nome", "jogadores"} da equipe. None se a equipe não existe; SemAcesso
+    se o usuário não for técnico dela. Com painel salvo: 1 consulta."""
+    row = conn.execute(SQL_EQUIPE, (team_id, user_id)).fetchone()
+    if row is None:
+        return None
+    if row["papel"] != "tecnico":
+        raise SemAcesso(team_id)
+    if row["dados"] is not None:
+        return {"nome": row["nome"], "jogadores": json.loads(row["dados"])}
+
+    # Transação de leitura: se alguém gravar no meio, a gravação do painel
+    # falha (BUSY_SNAPSHOT) e o painel velho não fica salvo
+    conn.execute("BEGIN")
+    try:
+        jogadores = montar(conn, team_id)
+        try:
+            conn.execute("INSERT OR REPLACE INTO equipe_cache (team_id, dados) VALUES (?, ?)",
+                         (team_id, json.dumps(jogadores, ensure_ascii=False)))
+            conn.commit()
+        except sqlite3.OperationalError:
+            conn.rollback()   # os dados valem para esta visita; a próxima remonta
+    except Exception:
+        conn.rollback()
+        raise
+    return {"nome": row["nome"], "jogadores": jogadores}
+
+
+def resumo(jogadores, hoje=None):
+    """Totais da equipe e dias desde o último treino de cada jogador (calculados
+    na hora, pelo dia local — o painel salvo guarda só as datas)."""
+    hoje = hoje or regional.hoje()
+    ativos = 0
+    for j in jogadores:
+        j["dias_sem_treino"] = None
+        if j["treinou_em"]:
+            try:
+                j["dias_sem_treino"] = (hoje - date.fromisoformat(j["treinou_em"][:10])).days
+            except ValueError:
+                pass
+        if j["dias_sem_treino"] is not None and j["dias_sem_treino"] < ATIVO_DIAS:
+            ativos += 1
+    n = len(jogadores)
+    medias = {nome: round(sum(j["progresso"][nome]["pct"] for j in jogadores) / n) if n else 0
+              for nome, _ in planos()}
+    return {"jogadores": n, "ativos": ativos, "media_pct": medias}
+
+
+def papel(conn, team_id, user_id):
+    """'jogador', 'tecnico' ou None (fora da equipe ou convite não aceito)."""
+    row = conn.execute("""
+        SELECT papel FROM team_members
+        WHERE team_id=? AND user_id=? AND aceito_em IS NOT NULL
+    """, (team_id, user_id)).fetchone()
+    return row[0] if row else None
+
+
+def do_usuario(conn, user_id):
+    """[(team_id, nome, papel, plano, convite)] das equipes do usuário
+    (convite = 1 enquanto ele não aceitou)."""
+    return conn.execute("""
+        SELECT t.id, t.nome, m.papel, m.plano, m.aceito_em IS NULL AS convite
+        FROM team_members m JOIN teams t ON t.id = m.team_id
+        WHERE m.user_id = ?
+        ORDER BY t.nome
+    """, (user_id,)).fetchall()
+
+
+# ------------------- EM LOTE -------------------
+
+def criar(conn, nome, tecnico_id):
+    """Cria a equipe com o técnico. Retorna o id."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        team_id = conn.execute("INSERT INTO teams (nome) VALUES (?)", (nome,)).lastrowid
+        conn.execute("""
+            INSERT INTO team_members (team_id, user_id, papel, aceito_em)
+            VALUES (?, ?, 'tecnico', CURRENT_TIMESTAMP)
+        """, (team_id, tecnico_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return team_id
+
+
+def incluir(conn, team_id, emails, papel="jogador", convite=False):
+    """Inclui os usuários dos e-mails (uma consulta para todos) — com
+    convite=True, como convite pendente até o jogador aceitar. Quem já está
+    na equipe fica como está. Retorna (incluídos, e-mails sem cadastro):
+    só para a linha de comando, a web não repassa nenhum dos dois."""
+    if papel not in PAPEIS:
+        raise ValueError(f"papel inválido: {papel}")
+    lista = json.dumps(sorted({e.strip().lower() for e in emails if e.strip()}))
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        incluidos = conn.execute("""
+            INSERT INTO team_members (team_id, user_id, papel, aceito_em)
+            SELECT ?, u.id, ?, CASE WHEN ? THEN NULL ELSE CURRENT_TIMESTAMP END
+            FROM json_each(?) JOIN users u ON u.email = json_each.value
+            WHERE true
+            ON CONFLICT(team_id, user_id) DO NOTHING
+        """, (team_id, papel, convite, lista)).rowcount
+        faltam = [r[0] for r in conn.execute("""
+            SELECT value FROM json_each(?)
+            WHERE NOT EXISTS (SELECT 1 FROM users u WHERE u.email = json_each.value)
+        """, (lista,))]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return incluidos, faltam
+
+
+def indicar_plano(conn, team_id, plano, user_ids=None):
+    """Indica `plano` (None = nenhum) para os jogadores `user_ids` da equipe
+    (todos, se None) num UPDATE só. Retorna quantos mudaram."""
+    if plano is not None and plano not in catalogo.programas():
+        raise ValueError(f"plano inválido: {plano}")
+    filtro, args = "", [plano, team_id, plano]
+    if user_ids is not None:
+        filtro = "AND user_id IN (SELECT value FROM json_each(?))"
+        args.append(json.dumps([int(u) for u in user_ids]))
+    alterados = conn.execute(f"""
+        UPDATE team_members SET plano = ?
+        WHERE team_id = ? AND papel = 'jogador' AND aceito_em IS NOT NULL
+            AND plano IS NOT ? {filtro}
+    """, args).rowcount
+    conn.commit()
+    return alterados
+
+
+def responder(conn, team_id, user_id, aceitar):
+    """Aceita ou recusa (apaga) o convite pendente do usuário. Retorna False
+    se não havia convite."""
+    if aceitar:
+        sql = """
+            UPDATE team_members SET aceito_em = CURRENT_TIMESTAMP
+            WHERE team_id = ? AND user_id = ? AND aceito_em IS NULL
+        """
+    else:
+        sql = "DELETE FROM team_members WHERE team_id = ? AND user_id = ? AND aceito_em IS NULL"
+    mudou = conn.execute(sql, (team_id, user_id)).rowcount
+    conn.commit()
+    return bool(mudou)
+
+
+def init_app(app):
+    def usuario(conn, email):
+        row = conn.execute("SELECT id FROM users WHERE email=?", (email.strip().lower(),)).fetchone()
+        if not row:
+            print(f"❌ Usuário {email} não encontrado.")
+            sys.exit(1)
+        return row[0]
+
+    @app.cli.command("create-team")
+    @click.argument("nome")
+    @click.argument("tecnico")
+    def create_team_command(nome, tecnico):
+        """Cria uma equipe com TECNICO (e-mail) como técnico."""
+        db.preparar()
+        conn = db.connect(app.config["DATABASE"])
+        try:
+            team_id = criar(conn, nome, usuario(conn, tecnico))
+        finally:
+            conn.close()
+        print(f"✅ Equipe {nome} criada (id {team_id}). Painel: /equipe/{team_id}")
+
+    @app.cli.command("team-add")
+    @click.argument("team_id", type=int)
+    @click.argument("emails", nargs=-1, required=True)
+    @click.option("--tecnico", is_flag=True, help="Inclui como técnico (não como jogador).")
+    def team_add_command(team_id, emails, tecnico):
+        """Inclui usuários (por e-mail) na equipe."""
+        db.preparar()
+        conn = db.connect(app.config["DATABASE"])
+        try:
+            if not conn.execute("SELECT 1 FROM teams WHERE id=?", (team_id,)).fetchone():
+                print(f"❌ Equipe {team_id} não encontrada.")
+                sys.exit(1)
+            incluidos, faltam = incluir(conn, team_id, emails, "tecnico" if tecnico else "jogador")
+        finally:
+            conn.close()
+        print(f"✅ {incluidos} incluídos.")
+        for email in faltam:
+            print(f"⚠️ {email} não tem cadastro.")
@@ -0,0 +1,151 @@
+# evolucao.py
+# Comparativo de medidas com o histórico inteiro (body_measures).
+#
+# A tela /comparativo e /api/comparativo?de=AAAA-MM-DD&ate=AAAA-MM-DD usam
+# o mesmo resumo. Para cada medida, no período:
+# - primeira e última medição (cada campo tem as suas: quem não mediu o
+#   braço num dia não zera a conta), diferença e variação em %;
+# - ritmo em unidade/semana (reta de mínimos quadrados sobre todas as
+#   medições do período, não só as duas pontas);
+# - assimetria direito/esquerdo (braço, coxa, panturrilha) na última
+#   medição com os dois lados e como ela mudou desde a primeira.
+# Campo vazio, NULL ou texto que não é número (linhas antigas) conta como
+# "não medido". Uma leitura pelo índice (user_id, created_at) e uma passada
+# em Python pelas linhas, que separa os valores medidos numa coluna por
+# medida (id da linha, datas e valores); as somas da reta saem de
+# sum()/map() sobre essas colunas. Sem NumPy (não está nas dependências):
+# dez anos de medições semanais (~520 linhas) ficam em poucos ms.
+from datetime import date, timedelta
+from operator import mul
+
+import exportacao
+
+CAMPOS = {
+    "peso": "Peso",
+    "braco": "Braço",
+    "perna": "Perna",
+    "cintura": "Cintura",
+    "quadril": "Quadril",
+    "barriga": "Barriga",
+    "peito": "Peito",
+    "braco_dir": "Braço Direito",
+    "braco_esq": "Braço Esquerdo",
+    "coxa_dir": "Coxa Direita",
+    "coxa_esq": "Coxa Esquerda",
+    "pant_dir": "Panturrilha Direita",
+    "pant_esq": "Panturrilha Esquerda",
+}
+UNIDADES = {"peso": "kg"}   # o resto é cm
+PARES = (("braco", "Braço"), ("coxa", "Coxa"), ("pant", "Panturrilha"))
+MIN_DIAS = 1   # período mínimo entre medições para calcular o ritmo
+
+_MEDIDAS = exportacao.MEDIDAS
+
+
+def _data(valor):
+    """'AAAA-MM-DD' -> date (None se vazio/inválido)."""
+    try:
+        return date.fromisoformat(valor) if valor else None
+    except ValueError:
+        return None
+
+
+_NUMEROS = (int, float)
+
+
+class _Coluna:
+    """Medições de um campo: ids das linhas, t (dias), valores e datas, na ordem do tempo."""
+
+    __slots__ = ("ids", "t", "valores", "datas")
+
+    def __init__(self):
+        self.ids, self.t, self.valores, self.datas = [], [], [], []
+
+    def por_semana(self):
+        """Inclinação da reta de mínimos quadrados, por semana (None sem período)."""
+        n, y = len(self.t), self.valores
+        if n < 2 or self.t[-1] - self.t[0] < MIN_DIAS:
+            return None
+        t0 = self.t[0]
+        t = [x - t0 for x in self.t]   # perto de zero: sem perder precisão no quadrado
+        st, sy = sum(t), sum(y)
+        variancia = n * sum(map(mul, t, t)) - st * st
+        if variancia <= 0:
+            return None
+        return (n * sum(map(mul, t, y)) - st * sy) / variancia * 7
+
+
+def _percentual(de, para):
+    return round((para - de) / de * 100, 1) if de else None
+
+
+def resumo(conn, user_id, de=None, ate=None):
+    """Comparativo do jogador no período [de, ate] (datas 'AAAA-MM-DD', opcionais)."""
+    filtros, args = ["user_id = ?"], [user_id]
+    de, ate = _data(de), _data(ate)
+    if de:
+        filtros.append("created_at >= ?")
+        args.append(de.isoformat())
+    if ate:
+        filtros.append("created_at < ?")
+        args.append((ate + timedelta(days=1)).isoformat())
+
+    colunas = [_Coluna() for _ in _MEDIDAS]
+    total, primeira_em, ultima_em = 0, None, None
+    for linha in conn.execute(f"""
+        SELECT id, julianday(created_at), created_at, {", ".join(_MEDIDAS)}
+        FROM body_measures
+        WHERE {" AND ".join(filtros)}
+        ORDER BY created_at, id
+    """, args):
+        id_, dia, quando = linha[0], linha[1], linha[2]
+        if dia is None:
+            continue   # sem data (ou data que o SQLite não entende)
+        for coluna, valor in zip(colunas, linha[3:]):
+            if type(valor) in _NUMEROS:   # NULL e "" de formulários antigos ficam de fora
+                coluna.ids.append(id_)
+                coluna.t.append(dia)
+                coluna.valores.append(valor)
+                coluna.datas.append(quando)
+        total += 1
+        primeira_em = primeira_em or quando
+        ultima_em = quando
+    campos = dict(zip(_MEDIDAS, colunas))
+
+    resultado = {"total": total, "de": primeira_em, "ate": ultima_em,
+                 "campos": [], "assimetria": []}
+    for c, col in campos.items():
+        if not col.valores:
+            continue
+        primeira, ultima = col.valores[0], col.valores[-1]
+        ritmo = col.por_semana()
+        resultado["campos"].append({
+            "campo": c, "nome": CAMPOS[c], "unidade": UNIDADES.get(c, "cm"),
+            "n": len(col.valores),
+            "primeira": primeira, "primeira_em": col.datas[0],
+            "ultima": ultima, "ultima_em": col.datas[-1],
+            "diferenca": round(ultima - primeira, 1),
+            "percentual": _percentual(primeira, ultima),
+            "por_semana": round(ritmo, 2) if ritmo is not None else None,
+        })
+
+    # Assimetria: só as medições (linhas) com os dois lados medidos — pelo
+    # id, não pela data: duas medições no mesmo segundo não viram uma
+    for p, nome in PARES:
+        direito, esquerdo = campos[p + "_dir"], campos[p + "_esq"]
+        lado_esq = dict(zip(esquerdo.ids, esquerdo.valores))
+        pares = [(quando, d, lado_esq[id_])
+                 for id_, quando, d in zip(direito.ids, direito.datas, direito.valores)
+                 if id_ in lado_esq]
+        if not pares:
+            continue
+        (_, d0, e0), (quando, d, e) = pares[0], pares[-1]
+        media = (d + e) / 2
+        resultado["assimetria"].append({
+            "par": p, "nome": nome, "n": len(pares), "em": quando,
+            "diferenca": round(d - e, 1),
+            "percentual": round((d - e) / media * 100, 1) if media else None,
+            "inicial": round(d0 - e0, 1),
+            "variacao": round((d - e) - (d0 - e0), 1),
+        })
+    return resultado
@@ -0,0 +1,309 @@
+# exportacao.py
+# Exportação e importação dos dados de um jogador (troca de celular/clube).
+#
+#     flask --app varzea_trainer_flask export-user email@x.com [--formato csv] [-o dados.ndjson]
+#     flask --app varzea_trainer_flask import-user email@x.com dados.ndjson
+#
+# Na web: /exportar?formato=ndjson|csv (download) e /importar (upload de até
+# IMPORTAR_WEB_MB / IMPORTAR_WEB_REGISTROS; acima disso, import-user).
+#
+# Tudo em fluxo: a exportação lê com fetchmany(LOTE) e escreve pedaço por
+# pedaço (nada de lista com o histórico inteiro); a importação lê o arquivo
+# linha a linha e grava com executemany em lotes, numa transação só.
+# Duplicados são ignorados pela chave natural de cada tabela, então importar
+# o mesmo arquivo duas vezes não duplica nada.
+#
+# NDJSON: 1ª linha {"formato": "varzea", "versao": 1}, depois uma linha por
+# registro com "tabela" + colunas. CSV: coluna "tabela" + todas as colunas.
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+from collections import namedtuple
+
+import click
+
+import db
+import ranking
+import tendencia
+
+FORMATO = "varzea"
+VERSAO = 1
+LOTE = 1000
+# Upload pela web: a importação inteira é uma transação (lock de escrita),
+# então o arquivo é limitado — ~10 mil registros seguram o lock ~0,3 s.
+# Arquivo maior: import-user na linha de comando, sem limite.
+WEB_MB = float(os.environ.get("IMPORTAR_WEB_MB", 4))
+WEB_REGISTROS = int(os.environ.get("IMPORTAR_WEB_REGISTROS", 10000))
+
+# chave: colunas que identificam o registro (além do user_id)
+Tabela = namedtuple("Tabela", "nome colunas chave ordem")
+
+MEDIDAS = ("peso", "braco", "perna", "cintura", "quadril", "barriga", "peito",
+           "braco_dir", "braco_esq", "coxa_dir", "coxa_esq", "pant_dir", "pant_esq")
+
+TABELAS = (
+    Tabela("profile", ("age", "height_m", "weight_kg"), (), "id"),
+    Tabela("weight_log", ("weight_kg", "log_date"), ("log_date",), "log_date, id"),
+    Tabela("body_measures", MEDIDAS + ("created_at",), ("created_at",), "created_at, id"),
+    Tabela("checkins", ("treino", "plano", "created_at"), ("created_at", "treino", "plano"), "created_at, id"),
+    Tabela("program_progress", ("program", "day", "created_at"), ("program", "day"), "program, day"),
+)
+POR_NOME = {t.nome: t for t in TABELAS}
+
+INTEIROS = {"age", "day"}
+REAIS = {"height_m", "weight_kg"} | set(MEDIDAS)
+# Sem data não dá para reconhecer duplicado: o registro é recusado
+OBRIGATORIAS = {
+    "weight_log": ("weight_kg", "log_date"),
+    "body_measures": ("created_at",),
+    "checkins": ("treino", "created_at"),
+    "program_progress": ("program", "day"),
+}
+PADROES = {"checkins": {"plano": "avulso"}}
+
+COLUNAS_CSV = ["tabela"] + list(dict.fromkeys(c for t in TABELAS for c in t.colunas))
+
+
+# ------------------- EXPORTAÇÃO -------------------
+
+def registros(conn, user_id):
+    """(tabela, linha) de todas as tabelas do jogador, em lotes de LOTE."""
+    for t in TABELAS:
+        cur = conn.execute(
+            f"SELECT {', '.join(t.colunas)} FROM {t.nome} WHERE user_id=? ORDER BY {t.ordem}",
+            (user_id,))
+        while True:
+            lote = cur.fetchmany(LOTE)
+            if not lote:
+                break
+            for linha in lote:
+                yield t, tuple(linha)
+
+
+# Um encoder só (json.dumps monta outro a cada chamada)
+_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def ndjson(conn, user_id):
+    yield _json({"formato": FORMATO, "versao": VERSAO}) + "\n"
+    pedaco = []
+    for t, linha in registros(conn, user_id):
+        item = {"tabela": t.nome}
+        item.update(zip(t.colunas, linha))
+        pedaco.append(_json(item))
+        if len(pedaco) >= LOTE:
+            yield "\n".join(pedaco) + "\n"
+            pedaco = []
+    if pedaco:
+        yield "\n".join(pedaco) + "\n"
+
+
+def csv_(conn, user_id):
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, COLUNAS_CSV)
+    escritor.writeheader()
+    n = 0
+    for t, linha in registros(conn, user_id):
+        item = {"tabela": t.nome}
+        item.update(zip(t.colunas, linha))
+        escritor.writerow(item)
+        n += 1
+        if n % LOTE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+FORMATOS = {
+    "ndjson": (ndjson, "application/x-ndjson", "ndjson"),
+    "csv": (csv_, "text/csv; charset=utf-8", "csv"),
+}
+
+
+def _instantaneo(conn, pedacos):
+    # Uma transação de leitura: todas as tabelas do mesmo instante, mesmo
+    # com o jogador registrando treino no meio do download
+    abriu = not conn.in_transaction
+    if abriu:
+        conn.execute("BEGIN")
+    try:
+        yield from pedacos
+    finally:
+        if abriu:
+            conn.rollback()
+
+
+def exportar(conn, user_id, formato="ndjson"):
+    """Gerador de pedaços de texto. ValueError se o formato não existir."""
+    if formato not in FORMATOS:
+        raise ValueError(f"formato inválido: {formato}")
+    return _instantaneo(conn, FORMATOS[formato][0](conn, user_id))
+
+
+# ------------------- IMPORTAÇÃO -------------------
+
+def _inteiro(v):
+    return None if v is None or v == "" else int(v)
+
+
+def _real(v):
+    if v is None or v == "":
+        return None
+    return float(v.replace(",", ".")) if isinstance(v, str) else float(v)
+
+
+def _texto(v):
+    return None if v is None or v == "" else str(v)
+
+
+def _conversores(t):
+    """[(coluna, função, obrigatória, padrão)] na ordem de t.colunas."""
+    padroes = PADROES.get(t.nome, {})
+    return [(c, _inteiro if c in INTEIROS else _real if c in REAIS else _texto,
+             c in OBRIGATORIAS.get(t.nome, ()), padroes.get(c))
+            for c in t.colunas]
+
+
+def ler(arquivo):
+    """Linhas de um arquivo texto (NDJSON ou CSV, detectado) -> (nº, dict)."""
+    primeira = arquivo.readline()
+    if not primeira.lstrip().startswith("{"):
+        leitor = csv.reader(itertools.chain([primeira], arquivo))
+        cabecalho = next(leitor, [])
+        for n, linha in enumerate(leitor, 2):
+            yield n, dict(zip(cabecalho, linha))
+        return
+    for n, linha in enumerate(itertools.chain([primeira], arquivo), 1):
+        if not linha.strip():
+            continue
+        try:
+            yield n, json.loads(linha)
+        except ValueError:
+            raise ValueError(f"linha {n}: JSON inválido")
+
+
+def sql_insercao(t):
+    """INSERT com os parâmetros ?1 (user_id), ?2... (colunas, na ordem de t.colunas)."""
+    cols = ("user_id",) + t.colunas
+    n = {c: f"?{i}" for i, c in enumerate(cols, 1)}
+    valores = ", ".join(n[c] for c in cols)
+    if t.nome == "profile":
+        atualiza = ", ".join(f"{c}=COALESCE(excluded.{c}, {c})" for c in t.colunas)
+        mudou = " OR ".join(f"profile.{c} IS NOT COALESCE(excluded.{c}, profile.{c})" for c in t.colunas)
+        return (f"INSERT INTO profile ({', '.join(cols)}) VALUES ({valores}) "
+                f"ON CONFLICT(user_id) DO UPDATE SET {atualiza} WHERE {mudou}")
+    if t.nome == "program_progress":
+        return f"INSERT OR IGNORE INTO program_progress ({', '.join(cols)}) VALUES ({valores})"
+    # IS compara NULL com NULL; a busca usa o índice (user_id, data) da tabela
+    existe = " AND ".join(f"{c} IS {n[c]}" for c in t.chave)
+    return (f"INSERT INTO {t.nome} ({', '.join(cols)}) SELECT {valores} "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {t.nome} WHERE user_id=?1 AND {existe})")
+
+
+def importar(conn, user_id, linhas, limite=None):
+    """Grava as linhas (de `ler`) para o jogador numa transação só.
+
+    Retorna {tabela: {"lidas": n, "gravadas": n}}. ValueError (com o nº da
+    linha) se algum registro for inválido ou se houver mais de `limite`
+    registros — nesse caso nada é gravado.
+    """
+    resumo = {t.nome: {"lidas": 0, "gravadas": 0} for t in TABELAS}
+    resumo["ignoradas"] = 0
+    lotes = {t.nome: [] for t in TABELAS}
+    sqls = {t.nome: sql_insercao(t) for t in TABELAS}
+    conversores = {t.nome: _conversores(t) for t in TABELAS}
+
+    def gravar(nome):
+        # rowcount não conta o que os triggers (user_progress) gravam
+        resumo[nome]["gravadas"] += conn.executemany(sqls[nome], lotes[nome]).rowcount
+        lotes[nome].clear()
+
+    lidas = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for n, item in linhas:
+            nome = item.get("tabela")
+            if nome not in conversores:
+                resumo["ignoradas"] += 1   # cabeçalho ou tabela desconhecida
+                continue
+            registro = [user_id]
+            for coluna, converter, obrigatoria, padrao in conversores[nome]:
+                try:
+                    valor = converter(item.get(coluna))
+                except (TypeError, ValueError):
+                    raise ValueError(f"linha {n}: {coluna} inválido em {nome}")
+                if valor is None:
+                    if obrigatoria:
+                        raise ValueError(f"linha {n}: {nome} sem {coluna}")
+                    valor = padrao
+                registro.append(valor)
+            resumo[nome]["lidas"] += 1
+            lidas += 1
+            if limite is not None and lidas > limite:
+                raise ValueError(f"mais de {limite} registros — importe pela linha de comando")
+            lote = lotes[nome]
+            lote.append(registro)
+            if len(lote) >= LOTE:
+                gravar(nome)
+        for nome in lotes:
+            if lotes[nome]:
+                gravar(nome)
+        if resumo["weight_log"]["gravadas"]:
+            tendencia.recalcular(conn, user_id)
+        if resumo["checkins"]["gravadas"]:
+            ranking.recalcular(conn, user_id)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return resumo
+
+
+def _usuario(conn, email):
+    row = conn.execute("SELECT id FROM users WHERE email=?", (email,)).fetchone()
+    if not row:
+        print(f"❌ Usuário {email} não encontrado.")
+        sys.exit(1)
+    return row[0]
+
+
+def init_app(app):
+    @app.cli.command("export-user")
+    @click.argument("email")
+    @click.option("--formato", type=click.Choice(list(FORMATOS)), default="ndjson", show_default=True)
+    @click.option("-o", "--saida", type=click.File("w", encoding="utf-8"), default="-",
+                  help="Arquivo de saída (padrão: stdout).")
+    def export_user_command(email, formato, saida):
+        """Exporta peso, medidas, check-ins, perfil e programas de um jogador."""
+        # Mensagens das migrações não podem se misturar com o arquivo no stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            db.preparar()
+        conn = db.connect(app.config["DATABASE"])
+        try:
+            for pedaco in exportar(conn, _usuario(conn, email), formato):
+                saida.write(pedaco)
+        finally:
+            conn.close()
+
+    @app.cli.command("import-user")
+    @click.argument("email")
+    @click.argument("arquivo", type=click.File("r", encoding="utf-8-sig"))
+    def import_user_command(email, arquivo):
+        """Importa um arquivo do export-user (NDJSON ou CSV) para o jogador."""
+        db.preparar()
+        conn = db.connect(app.config["DATABASE"])
+        try:
+            resumo = importar(conn, _usuario(conn, email), ler(arquivo))
+        except ValueError as e:
+            print("❌", e, "— nada foi gravado.")
+            sys.exit(1)
+        finally:
+            conn.close()
+        for nome, r in resumo.items():
+            if nome != "ignoradas":
+                print(f"✅ {nome:17} {r['gravadas']:8} novos de {r['lidas']}")
@@ -0,0 +1,82 @@
+# gunicorn.conf.py
+# Modo produção: `gunicorn app:app` (o gunicorn lê este arquivo sozinho).
+#
+# Perfis (GUNICORN_PROFILE):
+#   sync    — 2 × CPU + 1 processos, 1 requisição por vez cada.
+#   gthread — CPU + 1 processos × GUNICORN_THREADS threads (padrão; bom com
+#             SQLite local e hash de senha no pool de processos).
+#   gevent  — CPU processos com até GUNICORN_CONNECTIONS conexões cada
+#             (pip install gevent). Só compensa com muita conexão ociosa.
+#
+# WEB_CONCURRENCY sobrescreve o nº de processos (o Render define PORT).
+# Comparativo de vazão dos perfis: README.txt.
+import gc
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+PERFIL = os.environ.get("GUNICORN_PROFILE", "gthread")
+CPUS = multiprocessing.cpu_count()
+
+if PERFIL == "gevent":
+    # Antes de qualquer import do app (preload): threading.local, locks e
+    # sockets passam a ser cooperativos
+    from gevent import monkey
+    monkey.patch_all()
+
+_PERFIS = {
+    "sync": {"worker_class": "sync", "workers": 2 * CPUS + 1, "threads": 1},
+    "gthread": {"worker_class": "gthread", "workers": CPUS + 1,
+                "threads": int(os.environ.get("GUNICORN_THREADS", 4))},
+    "gevent": {"worker_class": "gevent", "workers": CPUS, "threads": 1},
+}
+if PERFIL not in _PERFIS:
+    raise SystemExit(f"GUNICORN_PROFILE inválido: {PERFIL!r} (use {', '.join(_PERFIS)})")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+worker_class = _PERFIS[PERFIL]["worker_class"]
+workers = int(os.environ.get("WEB_CONCURRENCY", _PERFIS[PERFIL]["workers"]))
+threads = _PERFIS[PERFIL]["threads"]
+worker_connections = int(os.environ.get("GUNICORN_CONNECTIONS", 500))
+
+# App montado uma vez no master; os workers herdam (copy-on-write)
+preload_app = True
+
+# Reciclagem gradual: evita vazamento lento de memória sem derrubar todos juntos
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = max_requests // 10
+timeout = 30
+graceful_timeout = 30
+
+# Atrás do proxy do Render/Cordova: reaproveita a conexão entre requisições
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+accesslog = os.environ.get("GUNICORN_ACCESSLOG")  # "-" = stdout
+errorlog = "-"
+
+# /metrics soma os workers por arquivos neste diretório (metricas.py)
+if "METRICS_DIR" not in os.environ:
+    os.environ["METRICS_DIR"] = _METRICS_TMP = tempfile.mkdtemp(prefix="varzea_metrics_")
+else:
+    _METRICS_TMP = None
+
+
+def when_ready(server):
+    # Objetos do preload vão para a geração permanente: o GC dos workers não
+    # encosta neles e as páginas continuam compartilhadas
+    gc.freeze()
+    server.log.info("🚀 Perfil %s: %s workers × %s threads", PERFIL, workers, threads)
+
+
+def worker_exit(server, worker):
+    # Fecha o pool de hash de senha e grava as métricas finais do worker
+    import metricas
+    import senhas
+    senhas.encerrar()
+    metricas.gravar()
+
+
+def on_exit(server):
+    if _METRICS_TMP:
+        shutil.rmtree(_METRICS_TMP, ignore_errors=True)
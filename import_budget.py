@@ -0,0 +1,81 @@
+# import_budget.py
+# Confere o custo de `import varzea_trainer_flask` (python -X importtime).
+#
+#     flask --app varzea_trainer_flask check-import
+#
+# Mede, em processos novos, quanto o app acrescenta sobre o próprio Flask
+# (soma do tempo "self" dos módulos que `import flask` não carrega) e falha
+# se passar de IMPORT_BUDGET_MS, se algum módulo pesado entrar na
+# importação ou se o banco for criado só por importar o módulo.
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import click
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULO = "varzea_trainer_flask"
+BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", 15))
+RODADAS = 5
+
+# Só devem ser importados quando usados (create_app, pool de senhas, e-mail...)
+PROIBIDOS = (
+    "pytz", "multiprocessing", "concurrent.futures", "flask_mail",
+    "smtplib", "flask_login", "PIL",
+)
+
+
+def _importtime(codigo, env):
+    """Roda `codigo` com -X importtime -> {módulo: self em µs}."""
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=APP_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stderr
+    tempos = {}
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, _, nome = linha[len("import time:"):].split("|")
+        tempos[nome.strip()] = int(proprio)
+    return tempos
+
+
+def medir(rodadas=RODADAS):
+    """-> (ms acima do Flask (mediana), módulos proibidos carregados, criou o banco?)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        banco = os.path.join(tmp, "import.db")
+        # Com bytecode em cache (como no deploy), sem escrever .pyc no projeto
+        env = dict(os.environ, VARZEA_DB=banco, PYTHONPYCACHEPREFIX=os.path.join(tmp, "pyc"))
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        _importtime(f"import {MODULO}", env)  # aquece o cache
+        extras, carregados = [], set()
+        for _ in range(rodadas):
+            base = _importtime("import flask", env)
+            app = _importtime(f"import {MODULO}", env)
+            extras.append(sum(us for nome, us in app.items() if nome not in base) / 1000)
+            carregados |= set(app)
+        criou_banco = os.path.exists(banco)
+
+    proibidos = sorted(m for m in carregados if m in PROIBIDOS)
+    return statistics.median(extras), proibidos, criou_banco
+
+
+def init_app(app):
+    @app.cli.command("check-import")
+    @click.option("--budget", default=BUDGET_MS, show_default=True, help="Limite em ms.")
+    def check_import_command(budget):
+        """Falha se importar o app ficar caro ou tiver efeitos colaterais."""
+        ms, proibidos, criou_banco = medir()
+        print(f"import {MODULO}: {ms:.1f} ms além do Flask (limite {budget:.0f} ms)")
+        falhou = ms > budget
+        if proibidos:
+            print("❌ Importados cedo demais:", ", ".join(proibidos))
+            falhou = True
+        if criou_banco:
+            print("❌ Importar o módulo criou o banco de dados")
+            falhou = True
+        if falhou:
+            sys.exit(1)
+        print("✅ Importação dentro do orçamento.")
@@ -0,0 +1,214 @@
+# metricas.py
+# Métricas por rota em /metrics (formato texto do Prometheus).
+#
+# - varzea_http_requests_total{endpoint,method,status}
+# - varzea_http_request_duration_seconds{endpoint,method}   (histograma)
+# - varzea_db_statements_per_request{endpoint}               (histograma)
+# - varzea_db_time_seconds{endpoint}                         (histograma, tempo de SQL por requisição)
+# - varzea_erros_total{origem}                               (erros tratados com print)
+#
+# Cada processo soma em memória (com lock). Com METRICS_DIR definido (o
+# gunicorn.conf.py define), cada worker grava um snapshot <pid>.json a cada
+# METRICS_FLUSH segundos e no fim; /metrics soma os arquivos de todos os
+# workers — inclusive os já reciclados, para os contadores não voltarem.
+# METRICS_TOKEN (opcional) exige "Authorization: Bearer <token>".
+import atexit
+import json
+import os
+import threading
+import time
+
+from flask import Response, abort, g, has_request_context, request
+
+import db
+
+DIR = os.environ.get("METRICS_DIR")
+FLUSH = float(os.environ.get("METRICS_FLUSH", 5))
+
+BUCKETS_TEMPO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_SQL = (1, 2, 3, 5, 10, 20, 50, 100)
+
+AJUDA = {
+    "varzea_http_requests_total": ("counter", "Requisições por rota, método e status."),
+    "varzea_http_request_duration_seconds": ("histogram", "Duração da requisição (até o 1º byte em streams)."),
+    "varzea_db_statements_per_request": ("histogram", "Statements SQL executados por requisição."),
+    "varzea_db_time_seconds": ("histogram", "Tempo gasto em SQL por requisição."),
+    "varzea_erros_total": ("counter", "Erros tratados pelo app (antes só no print)."),
+}
+
+# "nome|rótulos" -> número (contador) ou [bucket..., +Inf, soma] (histograma)
+_dados = {}
+_lock = threading.Lock()
+_flush = {"pid": None}
+
+
+def _chave(nome, **rotulos):
+    return nome + "|" + ",".join(f'{k}="{v}"' for k, v in sorted(rotulos.items()))
+
+
+def contar(nome, valor=1, **rotulos):
+    chave = _chave(nome, **rotulos)
+    with _lock:
+        _dados[chave] = _dados.get(chave, 0) + valor
+
+
+def observar(nome, valor, buckets, **rotulos):
+    chave = _chave(nome, **rotulos)
+    with _lock:
+        h = _dados.get(chave)
+        if h is None:
+            h = _dados[chave] = [0] * (len(buckets) + 2)
+        for i, limite in enumerate(buckets):
+            if valor <= limite:
+                h[i] += 1
+        h[-2] += 1        # +Inf (= count)
+        h[-1] += valor    # soma
+
+
+def erro(origem):
+    """Conta um erro que o app trata (e só imprime)."""
+    contar("varzea_erros_total", origem=origem)
+
+
+# ------------------- INSTRUMENTAÇÃO -------------------
+
+def _sql(sql, segundos, novo):
+    if not has_request_context():
+        return
+    m = g.get("_metricas")
+    if m is None:
+        return
+    if novo:
+        m[1] += 1
+    m[2] += segundos
+
+
+def _antes():
+    _garantir_flush()
+    # [início, nº de statements, tempo de SQL]
+    g._metricas = [time.perf_counter(), 0, 0.0]
+
+
+def _depois(resp):
+    m = g.pop("_metricas", None)
+    if m is None or request.endpoint == "metricas":
+        return resp
+    endpoint = request.endpoint or "sem_rota"
+    observar("varzea_http_request_duration_seconds", time.perf_counter() - m[0],
+             BUCKETS_TEMPO, endpoint=endpoint, method=request.method)
+    contar("varzea_http_requests_total", endpoint=endpoint, method=request.method,
+           status=resp.status_code)
+    observar("varzea_db_statements_per_request", m[1], BUCKETS_SQL, endpoint=endpoint)
+    observar("varzea_db_time_seconds", m[2], BUCKETS_TEMPO, endpoint=endpoint)
+    return resp
+
+
+# ------------------- ARQUIVOS (vários workers) -------------------
+
+def _arquivo(pid=None):
+    return os.path.join(DIR, f"{pid or os.getpid()}.json")
+
+
+def gravar():
+    """Grava o snapshot deste processo em METRICS_DIR."""
+    if not DIR:
+        return
+    with _lock:
+        conteudo = json.dumps(_dados)
+    tmp = _arquivo() + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(conteudo)
+    os.replace(tmp, _arquivo())
+
+
+def _loop_flush():
+    while True:
+        time.sleep(FLUSH)
+        try:
+            gravar()
+        except OSError as e:
+            print("Metrics flush error:", e)
+
+
+def _garantir_flush():
+    # Uma thread por processo (depois do fork do gunicorn)
+    if not DIR or _flush["pid"] == os.getpid():
+        return
+    with _lock:
+        if _flush["pid"] == os.getpid():
+            return
+        _flush["pid"] = os.getpid()
+        # Worker novo começa do zero (o master pode ter contado algo no preload)
+        _dados.clear()
+    os.makedirs(DIR, exist_ok=True)
+    threading.Thread(target=_loop_flush, name="metricas", daemon=True).start()
+    atexit.register(gravar)
+
+
+def _somar(total, dados):
+    for chave, valor in dados.items():
+        atual = total.get(chave)
+        if atual is None:
+            total[chave] = list(valor) if isinstance(valor, list) else valor
+        elif isinstance(valor, list):
+            total[chave] = [a + b for a, b in zip(atual, valor)]
+        else:
+            total[chave] = atual + valor
+
+
+def coletar():
+    """Soma deste processo + snapshots dos outros workers."""
+    total = {}
+    if DIR and os.path.isdir(DIR):
+        proprio = os.path.basename(_arquivo())
+        for nome in os.listdir(DIR):
+            if not nome.endswith(".json") or nome == proprio:
+                continue
+            try:
+                with open(os.path.join(DIR, nome)) as f:
+                    _somar(total, json.load(f))
+            except (OSError, ValueError):
+                continue  # arquivo sendo trocado — entra no próximo scrape
+    with _lock:
+        _somar(total, _dados)
+    return total
+
+
+def texto(dados):
+    """Formato de exposição do Prometheus."""
+    por_nome = {}
+    for chave, valor in dados.items():
+        nome, rotulos = chave.split("|", 1)
+        por_nome.setdefault(nome, []).append((rotulos, valor))
+
+    linhas = []
+    for nome in sorted(por_nome):
+        tipo, ajuda = AJUDA.get(nome, ("untyped", ""))
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+        for rotulos, valor in sorted(por_nome[nome]):
+            if tipo != "histogram":
+                linhas.append(f"{nome}{{{rotulos}}} {valor}")
+                continue
+            buckets = BUCKETS_SQL if nome == "varzea_db_statements_per_request" else BUCKETS_TEMPO
+            sep = "," if rotulos else ""
+            for limite, n in zip(buckets, valor):
+                linhas.append(f'{nome}_bucket{{{rotulos}{sep}le="{limite}"}} {n}')
+            linhas.append(f'{nome}_bucket{{{rotulos}{sep}le="+Inf"}} {valor[-2]}')
+            linhas.append(f"{nome}_sum{{{rotulos}}} {valor[-1]:.6f}")
+            linhas.append(f"{nome}_count{{{rotulos}}} {valor[-2]}")
+    return "\n".join(linhas) + "\n"
+
+
+def metricas_view():
+    token = os.environ.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        abort(401)
+    return Response(texto(coletar()), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    db.observar(_sql)
+    app.before_request(_antes)
+    app.after_request(_depois)
+    app.add_url_rule("/metrics", "metricas", metricas_view)
@@ -0,0 +1,616 @@
+# migrations.py
+# Migrações versionadas do banco.
+#
+# Cada migração tem um número, um nome e uma função que recebe a conexão.
+# A versão aplicada fica na tabela schema_version; rodar de novo é seguro
+# (só aplica o que falta). Roda uma vez no boot do app ou pela linha de
+# comando:
+#
+#     python migrations.py [caminho_do_banco]
+#     flask --app varzea_trainer_flask migrate
+import sys
+
+import db
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    def deco(fn):
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return deco
+
+
+def columns(conn, table):
+    """Colunas atuais de uma tabela (vazio se ela não existir)."""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def rebuild_table(conn, table, create_sql):
+    """Recria a tabela com o schema novo, copiando as colunas em comum."""
+    old_cols = columns(conn, table)
+    conn.execute(f"DROP TABLE IF EXISTS {table}__new")
+    conn.execute(create_sql.replace(f"CREATE TABLE {table}", f"CREATE TABLE {table}__new", 1))
+    new_cols = columns(conn, f"{table}__new")
+    shared = [c for c in old_cols if c in new_cols]
+    if shared:
+        cols = ", ".join(shared)
+        conn.execute(f"INSERT INTO {table}__new ({cols}) SELECT {cols} FROM {table}")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}__new RENAME TO {table}")
+
+
+# ------------------- MIGRAÇÕES -------------------
+
+@migration(1, "base")
+def _base(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS profile (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER UNIQUE,
+            age INTEGER,
+            height_m REAL,
+            weight_kg REAL,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS checkin (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            plano TEXT NOT NULL,
+            data DATE NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS weight_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            weight_kg REAL NOT NULL,
+            log_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS body_measures (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            peso REAL,
+            braco REAL,
+            perna REAL,
+            cintura REAL,
+            quadril REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    """)
+    for tabela in ("treino_resistencia", "treino_velocidade", "treino_forca",
+                   "treino_explosao", "treino_mobilidade"):
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {tabela} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                dia INTEGER NOT NULL,
+                UNIQUE(user_id, dia)
+            )
+        """)
+
+
+CHECKINS_SQL = """
+    CREATE TABLE checkins (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        treino TEXT,
+        plano TEXT NOT NULL DEFAULT 'avulso',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )
+"""
+
+
+@migration(2, "checkins_unificado")
+def _checkins(conn):
+    # Bancos antigos têm a versão "curta" criada dentro das rotas
+    # (user_id, treino, plano) — sem id nem created_at.
+    cols = columns(conn, "checkins")
+    if not cols:
+        conn.execute(CHECKINS_SQL)
+    elif "id" not in cols or "created_at" not in cols:
+        if "plano" in cols:
+            conn.execute("UPDATE checkins SET plano='avulso' WHERE plano IS NULL")
+        rebuild_table(conn, "checkins", CHECKINS_SQL)
+
+
+@migration(3, "body_measures_medidas")
+def _body_measures(conn):
+    # Colunas que a tela de medidas realmente grava
+    cols = columns(conn, "body_measures")
+    for col in ("barriga", "peito", "braco_dir", "braco_esq",
+                "coxa_dir", "coxa_esq", "pant_dir", "pant_esq"):
+        if col not in cols:
+            conn.execute(f"ALTER TABLE body_measures ADD COLUMN {col} REAL")
+
+
+@migration(4, "program_progress")
+def _program_progress(conn):
+    # Uma tabela só para todos os treinos específicos
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS programs (
+            name TEXT PRIMARY KEY,
+            total_days INTEGER NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS program_progress (
+            user_id INTEGER NOT NULL,
+            program TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, program, day)
+        ) WITHOUT ROWID
+    """)
+    # Concluiu todos os dias -> reinicia o ciclo
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS program_progress_ciclo
+        AFTER INSERT ON program_progress
+        WHEN (SELECT COUNT(*) FROM program_progress
+              WHERE user_id = NEW.user_id AND program = NEW.program)
+             >= (SELECT total_days FROM programs WHERE name = NEW.program)
+        BEGIN
+            DELETE FROM program_progress
+            WHERE user_id = NEW.user_id AND program = NEW.program;
+        END
+    """)
+    for programa in ("resistencia", "velocidade", "forca", "explosao", "mobilidade"):
+        tabela = f"treino_{programa}"
+        if columns(conn, tabela):
+            conn.execute(f"""
+                INSERT OR IGNORE INTO program_progress (user_id, program, day)
+                SELECT user_id, ?, dia FROM {tabela}
+            """, (programa,))
+            conn.execute(f"DROP TABLE {tabela}")
+
+
+@migration(5, "indices")
+def _indices(conn):
+    # Índices para as consultas das rotas (ver query_plans.py)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_checkins_user_plano_treino
+        ON checkins (user_id, plano, treino)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_checkins_user_created
+        ON checkins (user_id, created_at)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_weight_log_user_date
+        ON weight_log (user_id, log_date)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_body_measures_user_created
+        ON body_measures (user_id, created_at)
+    """)
+
+
+# Contagem "de verdade", direto das tabelas de check-in
+USER_PROGRESS_REAL = """
+    SELECT user_id, plano, COUNT(*) AS feitos FROM checkins
+    WHERE user_id IS NOT NULL GROUP BY user_id, plano
+    UNION ALL
+    SELECT user_id, program, COUNT(*) FROM program_progress
+    GROUP BY user_id, program
+"""
+USER_PROGRESS_REBUILD = "INSERT INTO user_progress (user_id, plano, feitos)" + USER_PROGRESS_REAL
+
+
+@migration(6, "user_progress")
+def _user_progress(conn):
+    # Contadores por (usuário, plano) mantidos por triggers: o dashboard lê
+    # direto daqui em vez de fazer COUNT(*) em checkins a cada acesso.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_progress (
+            user_id INTEGER NOT NULL,
+            plano TEXT NOT NULL,
+            feitos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, plano)
+        ) WITHOUT ROWID
+    """)
+    for tabela, plano in (("checkins", "plano"), ("program_progress", "program")):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabela}_progresso_ins
+            AFTER INSERT ON {tabela} WHEN NEW.user_id IS NOT NULL
+            BEGIN
+                INSERT INTO user_progress (user_id, plano, feitos)
+                VALUES (NEW.user_id, NEW.{plano}, 1)
+                ON CONFLICT(user_id, plano) DO UPDATE SET feitos = feitos + 1;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabela}_progresso_del
+            AFTER DELETE ON {tabela} WHEN OLD.user_id IS NOT NULL
+            BEGIN
+                UPDATE user_progress SET feitos = MAX(feitos - 1, 0)
+                WHERE user_id = OLD.user_id AND plano = OLD.{plano};
+            END
+        """)
+    conn.execute("DELETE FROM user_progress")
+    conn.execute(USER_PROGRESS_REBUILD)
+
+
+@migration(7, "outbox")
+def _outbox(conn):
+    # Fila de e-mails enviada em segundo plano (outbox.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            to_email TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            html TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            claimed_at REAL,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_outbox_status_next
+        ON outbox (status, next_attempt_at)
+    """)
+
+
+@migration(8, "importacoes")
+def _importacoes(conn):
+    # Importações de histórico de peso (balanca.py) rodando em segundo plano
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS importacoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            arquivo TEXT,
+            status TEXT NOT NULL DEFAULT 'fila',
+            lidas INTEGER NOT NULL DEFAULT 0,
+            gravadas INTEGER NOT NULL DEFAULT 0,
+            repetidas INTEGER NOT NULL DEFAULT 0,
+            rejeitadas INTEGER NOT NULL DEFAULT 0,
+            erros TEXT,
+            atualizado_em REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_importacoes_user
+        ON importacoes (user_id, id)
+    """)
+
+
+@migration(9, "weight_trend")
+def _weight_trend(conn):
+    # Estado da tendência de peso por jogador (tendencia.py), atualizado a
+    # cada peso gravado. Quem já tem histórico é montado aqui, uma vez.
+    import tendencia
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS weight_trend (
+            user_id INTEGER PRIMARY KEY,
+            n INTEGER NOT NULL,
+            primeira TEXT NOT NULL,
+            ultima TEXT NOT NULL,
+            ultimo_kg REAL,
+            n7 INTEGER NOT NULL,
+            s7 REAL NOT NULL,
+            n30 INTEGER NOT NULL,
+            s30 REAL NOT NULL,
+            sw REAL NOT NULL,
+            st REAL NOT NULL,
+            sy REAL NOT NULL,
+            stt REAL NOT NULL,
+            sty REAL NOT NULL
+        )
+    """)
+    for (user_id,) in conn.execute("SELECT DISTINCT user_id FROM weight_log WHERE user_id IS NOT NULL").fetchall():
+        tendencia.recalcular(conn, user_id)
+
+
+@migration(10, "perfil_cache")
+def _perfil_cache(conn):
+    # Foto da tela de perfil (perfil_cache.py); os triggers apagam a foto do
+    # jogador quando qualquer dado mostrado nela muda
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS perfil_cache (
+            user_id INTEGER PRIMARY KEY,
+            dados TEXT NOT NULL
+        )
+    """)
+    for tabela in ("profile", "weight_log", "weight_trend", "body_measures"):
+        for evento, alvo in (("INSERT", "NEW.user_id"), ("DELETE", "OLD.user_id"),
+                             ("UPDATE", "OLD.user_id, NEW.user_id")):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {tabela}_perfil_cache_{evento.lower()}
+                AFTER {evento} ON {tabela}
+                BEGIN
+                    DELETE FROM perfil_cache WHERE user_id IN ({alvo});
+                END
+            """)
+
+
+@migration(11, "equipes")
+def _equipes(conn):
+    # Clubes/equipes com técnico (equipes.py). O painel do técnico fica em
+    # equipe_cache; os triggers apagam o painel das equipes do jogador quando
+    # o progresso, a tendência de peso, o cadastro ou o elenco mudam.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS teams (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS team_members (
+            team_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            papel TEXT NOT NULL DEFAULT 'jogador' CHECK (papel IN ('jogador', 'tecnico')),
+            plano TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (team_id, user_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_team_members_user
+        ON team_members (user_id)
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS equipe_cache (
+            team_id INTEGER PRIMARY KEY,
+            dados TEXT NOT NULL
+        )
+    """)
+    for evento, alvo in (("INSERT", "NEW.team_id"), ("DELETE", "OLD.team_id"),
+                         ("UPDATE", "OLD.team_id, NEW.team_id")):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS team_members_equipe_cache_{evento.lower()}
+            AFTER {evento} ON team_members
+            BEGIN
+                DELETE FROM equipe_cache WHERE team_id IN ({alvo});
+            END
+        """)
+    # checkins e program_progress chegam aqui pelos triggers de user_progress
+    for tabela, coluna in (("user_progress", "user_id"), ("weight_trend", "user_id"), ("users", "id")):
+        for evento, alvo in (("INSERT", f"NEW.{coluna}"), ("DELETE", f"OLD.{coluna}"),
+                             ("UPDATE", f"OLD.{coluna}, NEW.{coluna}")):
+            quando = evento
+            if tabela == "users":
+                if evento == "INSERT":
+                    continue   # usuário novo ainda não está em equipe nenhuma
+                if evento == "UPDATE":
+                    quando = "UPDATE OF name, email"   # não a cada troca de hash no login
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {tabela}_equipe_cache_{evento.lower()}
+                AFTER {quando} ON {tabela}
+                BEGIN
+                    DELETE FROM equipe_cache WHERE team_id IN (
+                        SELECT team_id FROM team_members WHERE user_id IN ({alvo})
+                    );
+                END
+            """)
+
+
+@migration(12, "sequencias")
+def _sequencias(conn):
+    # Sequência de dias seguidos com treino (ranking.py). checkin_dias guarda
+    # os dias (data local) e não é apagada no reinício dos planos; streaks
+    # tem a sequência atual/melhor de cada jogador, e streak_contagem quantos
+    # jogadores há em cada valor (mantida por trigger) — a posição no ranking
+    # é uma soma sobre os valores maiores, não uma contagem de jogadores.
+    import ranking
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS checkin_dias (
+            user_id INTEGER NOT NULL,
+            dia TEXT NOT NULL,
+            PRIMARY KEY (user_id, dia)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS streaks (
+            user_id INTEGER PRIMARY KEY,
+            atual INTEGER NOT NULL,
+            melhor INTEGER NOT NULL,
+            ultimo TEXT NOT NULL
+        )
+    """)
+    for coluna in ("atual", "melhor"):
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_streaks_{coluna}
+            ON streaks ({coluna} DESC, ultimo DESC)
+        """)
+    # Sequências que ainda podem quebrar (expiração diária)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_streaks_vivas
+        ON streaks (ultimo) WHERE atual > 0
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS streak_contagem (
+            tipo TEXT NOT NULL,
+            valor INTEGER NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (tipo, valor)
+        ) WITHOUT ROWID
+    """)
+
+    def somar(coluna, linha, delta):
+        if delta > 0:
+            return f"""
+                INSERT INTO streak_contagem (tipo, valor, n) VALUES ('{coluna}', {linha}.{coluna}, 1)
+                ON CONFLICT(tipo, valor) DO UPDATE SET n = n + 1;
+            """
+        return f"""
+            UPDATE streak_contagem SET n = n - 1 WHERE tipo = '{coluna}' AND valor = {linha}.{coluna};
+            DELETE FROM streak_contagem WHERE tipo = '{coluna}' AND valor = {linha}.{coluna} AND n <= 0;
+        """
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS streaks_contagem_ins
+        AFTER INSERT ON streaks
+        BEGIN
+            {somar("atual", "NEW", 1)}
+            {somar("melhor", "NEW", 1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS streaks_contagem_del
+        AFTER DELETE ON streaks
+        BEGIN
+            {somar("atual", "OLD", -1)}
+            {somar("melhor", "OLD", -1)}
+        END
+    """)
+    for coluna in ("atual", "melhor"):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS streaks_contagem_upd_{coluna}
+            AFTER UPDATE OF {coluna} ON streaks WHEN OLD.{coluna} != NEW.{coluna}
+            BEGIN
+                {somar(coluna, "OLD", -1)}
+                {somar(coluna, "NEW", 1)}
+            END
+        """)
+
+    # Quem já tem check-ins: dias e sequências montados aqui, uma vez
+    usuarios = conn.execute(
+        "SELECT DISTINCT user_id FROM checkins WHERE user_id IS NOT NULL"
+    ).fetchall()
+    for (user_id,) in usuarios:
+        ranking.recalcular(conn, user_id)
+
+
+@migration(13, "convites")
+def _convites(conn):
+    # Entrar numa equipe depende do jogador (equipes.py): aceito_em NULL é
+    # convite pendente, fora do painel do técnico. Técnicos ficam aceitos;
+    # jogadores incluídos antes disso pela web nunca consentiram — voltam a
+    # ser convite e aparecem para aceitar no dashboard.
+    if "aceito_em" not in columns(conn, "team_members"):
+        conn.execute("ALTER TABLE team_members ADD COLUMN aceito_em TIMESTAMP")
+    conn.execute("""
+        UPDATE team_members SET aceito_em = COALESCE(created_at, CURRENT_TIMESTAMP)
+        WHERE papel = 'tecnico' AND aceito_em IS NULL
+    """)
+
+
+@migration(14, "ultimo_programa")
+def _ultimo_programa(conn):
+    # Último dia de programa de cada jogador (painel da equipe). O reinício
+    # do ciclo apaga as linhas de program_progress, então o MAX(created_at)
+    # delas some justo no dia em que o jogador fecha o programa; esta tabela
+    # só anda para frente (como checkin_dias para os check-ins).
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ultimo_programa (
+            user_id INTEGER PRIMARY KEY,
+            em TIMESTAMP NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS program_progress_ultimo
+        AFTER INSERT ON program_progress
+        BEGIN
+            INSERT INTO ultimo_programa (user_id, em)
+            VALUES (NEW.user_id, COALESCE(NEW.created_at, CURRENT_TIMESTAMP))
+            ON CONFLICT(user_id) DO UPDATE SET em = MAX(em, excluded.em);
+        END
+    """)
+    conn.execute("""
+        INSERT INTO ultimo_programa (user_id, em)
+        SELECT user_id, MAX(created_at) FROM program_progress
+        WHERE user_id IS NOT NULL AND created_at IS NOT NULL
+        GROUP BY user_id
+        ON CONFLICT(user_id) DO UPDATE SET em = MAX(em, excluded.em)
+    """)
+    # Painel da equipe: novo dia de check-in (inclusive avulso, que não
+    # mexe em user_progress) ou de programa apaga o painel salvo
+    for tabela, evento in (("checkin_dias", "INSERT"), ("ultimo_programa", "INSERT"),
+                           ("ultimo_programa", "UPDATE")):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabela}_equipe_cache_{evento.lower()}
+            AFTER {evento} ON {tabela}
+            BEGIN
+                DELETE FROM equipe_cache WHERE team_id IN (
+                    SELECT team_id FROM team_members WHERE user_id = NEW.user_id
+                );
+            END
+        """)
+
+
+# ------------------- MOTOR -------------------
+
+def current_version(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn, verbose=True):
+    """Aplica as migrações pendentes. Retorna a lista de versões aplicadas."""
+    applied = []
+    for version, name, fn in MIGRATIONS:
+        # BEGIN IMMEDIATE segura o lock de escrita: se vários workers sobem
+        # juntos, só um aplica e os outros enxergam a versão nova.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version <= current_version(conn):
+                conn.rollback()
+                continue
+            if verbose:
+                print(f"🔧 Aplicando migração {version:03d}_{name}...")
+            fn(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                (version, name)
+            )
+            conn.commit()
+            applied.append(version)
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
+
+
+def upgrade(path=None, verbose=True):
+    conn = db.connect(path)
+    try:
+        applied = migrate(conn, verbose=verbose)
+        if verbose:
+            print(f"✅ Banco na versão {current_version(conn)}"
+                  + (f" ({len(applied)} migrações aplicadas)" if applied else ""))
+        return applied
+    finally:
+        conn.close()
+
+
+def init_app(app):
+    @app.cli.command("migrate")
+    def migrate_command():
+        """Aplica as migrações pendentes no banco configurado."""
+        upgrade(app.config["DATABASE"])
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:] or [None]:
+        upgrade(path)
@@ -0,0 +1,217 @@
+# outbox.py
+# Fila persistente de e-mails (tabela outbox) com envio em segundo plano.
+#
+# A rota só grava a mensagem e volta na hora; uma thread por worker (ou um
+# processo separado: `flask mail-worker`) reserva lotes, envia todos pela
+# mesma conexão SMTP e reagenda as falhas com backoff exponencial.
+#
+# Modo de teste: SMTP_LOCAL=1 sobe um servidor SMTP em processo
+# (smtp_local.py) — funciona offline e serve para o benchmark
+# `flask mail-bench`.
+import os
+import sys
+import threading
+import time
+
+import click
+
+import db
+
+LOTE = int(os.environ.get("MAIL_OUTBOX_BATCH", 50))        # mensagens por conexão SMTP
+MAX_TENTATIVAS = int(os.environ.get("MAIL_OUTBOX_MAX_ATTEMPTS", 6))
+BACKOFF_BASE = float(os.environ.get("MAIL_OUTBOX_BACKOFF", 30))  # 30s, 60s, 120s...
+INTERVALO = 5            # polling quando a fila está vazia (segundos)
+RESERVA_EXPIRA = 300     # reserva de worker que morreu no meio do envio
+
+_acordar = threading.Event()
+_worker = {"pid": None, "thread": None}
+_worker_lock = threading.Lock()
+
+
+def configurado(app):
+    if app.config.get("MAIL_LOCAL"):
+        return True
+    return bool(app.config["MAIL_USERNAME"] and app.config["MAIL_PASSWORD"])
+
+
+def enfileirar(conn, to_email, subject, html):
+    """Grava a mensagem na fila e acorda o worker. Não toca no SMTP."""
+    conn.execute(
+        "INSERT INTO outbox (to_email, subject, html) VALUES (?, ?, ?)",
+        (to_email, subject, html)
+    )
+    conn.commit()
+    _acordar.set()
+
+
+def _reservar(conn, limite):
+    agora = time.time()
+    conn.execute("""
+        UPDATE outbox SET status='pending', claimed_at=NULL
+        WHERE status='sending' AND claimed_at < ?
+    """, (agora - RESERVA_EXPIRA,))
+    # Reserva atômica: dois workers nunca pegam a mesma mensagem
+    rows = conn.execute("""
+        UPDATE outbox SET status='sending', claimed_at=?
+        WHERE id IN (
+            SELECT id FROM outbox
+            WHERE status='pending' AND next_attempt_at <= ?
+            ORDER BY next_attempt_at, id LIMIT ?
+        )
+        RETURNING id, to_email, subject, html, attempts
+    """, (agora, agora, limite)).fetchall()
+    conn.commit()
+    return rows
+
+
+def _registrar(conn, enviados, falhas):
+    if enviados:
+        conn.executemany("""
+            UPDATE outbox SET status='sent', sent_at=CURRENT_TIMESTAMP,
+                              claimed_at=NULL, last_error=NULL
+            WHERE id=?
+        """, [(i,) for i in enviados])
+
+    agora = time.time()
+    for row, erro in falhas:
+        tentativas = row["attempts"] + 1
+        status = "failed" if tentativas >= MAX_TENTATIVAS else "pending"
+        conn.execute("""
+            UPDATE outbox SET status=?, attempts=?, next_attempt_at=?,
+                              claimed_at=NULL, last_error=?
+            WHERE id=?
+        """, (status, tentativas, agora + BACKOFF_BASE * 2 ** row["attempts"],
+              erro[:500], row["id"]))
+    conn.commit()
+
+
+def enviar_lote(app, mail, conn, limite=LOTE):
+    """Envia um lote pela mesma conexão SMTP. Retorna quantas foram reservadas."""
+    rows = _reservar(conn, limite)
+    if not rows:
+        return 0
+    from flask_mail import Message
+
+    enviados, falhas = [], []
+    try:
+        with app.app_context(), mail.connect() as smtp:
+            for row in rows:
+                try:
+                    smtp.send(Message(row["subject"], recipients=[row["to_email"]], html=row["html"]))
+                    enviados.append(row["id"])
+                except Exception as e:
+                    falhas.append((row, str(e)))
+    except Exception as e:
+        # Servidor fora do ar / conexão caiu: o que sobrou volta pra fila
+        tratados = set(enviados) | {r["id"] for r, _ in falhas}
+        falhas += [(row, str(e)) for row in rows if row["id"] not in tratados]
+        print("Mail error:", e)
+
+    _registrar(conn, enviados, falhas)
+    return len(rows)
+
+
+def rodar(app, mail, parar=None):
+    """Loop do worker: envia enquanto houver fila, depois espera ser acordado."""
+    parar = parar or threading.Event()
+    conn = db.connect(app.config["DATABASE"])
+    try:
+        while not parar.is_set():
+            _acordar.clear()
+            try:
+                n = enviar_lote(app, mail, conn)
+            except Exception as e:
+                print("Mail worker error:", e)
+                n = 0
+            if n < LOTE:
+                _acordar.wait(INTERVALO)
+    finally:
+        conn.close()
+
+
+def drenar(app, mail, timeout=30):
+    """Envia tudo que estiver pronto agora (testes/benchmark)."""
+    conn = db.connect(app.config["DATABASE"])
+    fim = time.time() + timeout
+    try:
+        while time.time() < fim and enviar_lote(app, mail, conn):
+            pass
+    finally:
+        conn.close()
+
+
+def garantir_worker(app, mail=None):
+    """Sobe a thread de envio deste processo (uma vez por PID, depois do fork)."""
+    if app.config.get("MAIL_OUTBOX_WORKER", "thread") != "thread":
+        return
+    mail = mail or app.extensions["outbox"]
+    with _worker_lock:
+        if _worker["pid"] == os.getpid() and _worker["thread"].is_alive():
+            return
+        t = threading.Thread(target=rodar, args=(app, mail), name="outbox", daemon=True)
+        t.start()
+        _worker.update(pid=os.getpid(), thread=t)
+
+
+def usar_smtp_local(app, mail):
+    """Aponta o Flask-Mail para um SMTP local em processo (modo de teste)."""
+    from smtp_local import SMTPLocal
+
+    servidor = SMTPLocal().iniciar()
+    app.config.update(
+        MAIL_LOCAL=servidor,
+        MAIL_SERVER=servidor.host,
+        MAIL_PORT=servidor.port,
+        MAIL_USE_TLS=False,
+        MAIL_USE_SSL=False,
+        MAIL_USERNAME="",
+        MAIL_PASSWORD="",
+    )
+    mail.state = mail.init_app(app)
+    return servidor
+
+
+def init_app(app, mail):
+    app.config.setdefault("MAIL_OUTBOX_WORKER", os.environ.get("MAIL_OUTBOX_WORKER", "thread"))
+    app.extensions["outbox"] = mail
+    if os.environ.get("SMTP_LOCAL"):
+        usar_smtp_local(app, mail)
+
+    @app.cli.command("mail-worker")
+    def mail_worker_command():
+        """Processo dedicado de envio da fila (use MAIL_OUTBOX_WORKER=process nos workers web)."""
+        print("📬 Worker de e-mail rodando...")
+        db.preparar()
+        rodar(app, mail)
+
+    @app.cli.command("mail-bench")
+    @click.option("-n", "total", default=200, help="Pedidos de /forgot.")
+    def mail_bench_command(total):
+        """Mede /forgot + envio da fila contra o SMTP local."""
+        servidor = app.config.get("MAIL_LOCAL") or usar_smtp_local(app, mail)
+        app.config["MAIL_OUTBOX_WORKER"] = "off"
+        client = app.test_client()
+        email = "bench@teste.com"
+        with app.app_context():
+            conn = db.get_db()
+            conn.execute(
+                "INSERT OR IGNORE INTO users (name, email, password_hash) VALUES (?, ?, ?)",
+                ("Bench", email, "x")
+            )
+            conn.commit()
+
+        inicio = time.perf_counter()
+        for _ in range(total):
+            client.post("/forgot", data={"email": email})
+        t_http = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        antes = len(servidor.mensagens)
+        drenar(app, mail)
+        t_envio = time.perf_counter() - inicio
+        entregues = len(servidor.mensagens) - antes
+
+        print(f"/forgot: {total} pedidos em {t_http:.2f}s ({total / t_http:.0f} req/s)")
+        print(f"envio:   {entregues} e-mails em {t_envio:.2f}s ({entregues / max(t_envio, 1e-9):.0f}/s, lotes de {LOTE})")
+        if entregues < total:
+            sys.exit(1)
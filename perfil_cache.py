@@ -0,0 +1,135 @@
+# perfil_cache.py
+# Foto pronta da tela de perfil por jogador (tabela perfil_cache).
+#
+# /perfil lê uma linha: o JSON com perfil, IMC/faixa/peso ideal, tendência,
+# últimas HISTORICO pesagens e a última medida. Os triggers da migração 010
+# apagam a foto quando profile, weight_log, weight_trend ou body_measures
+# do jogador mudam. Sem foto, a mesma consulta já traz as colunas para
+# remontar a tela (as subconsultas JSON só rodam quando não há foto) — o
+# GET só lê, nunca grava. Quem grava a foto de novo são as rotas que
+# mudaram os dados (perfil, medidas, peso diário), com atualizar() na
+# própria transação delas; importações em lote deixam sem foto até a
+# próxima dessas gravações (a tela continua sendo uma consulta só).
+# O tempo da página não cresce com o histórico: nada de varrer weight_log.
+import json
+from datetime import date
+
+import exportacao
+import tendencia
+
+HISTORICO = 10   # pesagens listadas no perfil (o gráfico mostra o resto)
+
+_PERFIL = ("age", "height_m", "weight_kg")
+_MEDIDA = exportacao.MEDIDAS + ("created_at",)
+
+
+def _json_object(colunas):
+    return "json_object(" + ", ".join(f"'{c}', {c}" for c in colunas) + ")"
+
+
+# ?1 = user_id. Com foto, as subconsultas do CASE nem rodam.
+SQL = f"""
+    SELECT dados,
+        CASE WHEN dados IS NULL THEN (
+            SELECT {_json_object(_PERFIL)} FROM profile WHERE user_id = ?1
+        ) END AS prof,
+        CASE WHEN dados IS NULL THEN (
+            SELECT {_json_object(tendencia.COLUNAS)} FROM weight_trend WHERE user_id = ?1
+        ) END AS trend,
+        CASE WHEN dados IS NULL THEN (
+            SELECT json_group_array(json_object('weight_kg', weight_kg, 'log_date', log_date))
+            FROM (SELECT weight_kg, log_date FROM weight_log WHERE user_id = ?1
+                  ORDER BY log_date DESC LIMIT {HISTORICO})
+        ) END AS pesos,
+        CASE WHEN dados IS NULL THEN (
+            SELECT {_json_object(_MEDIDA)} FROM body_measures WHERE user_id = ?1
+            ORDER BY created_at DESC LIMIT 1
+        ) END AS medida
+    FROM (SELECT (SELECT dados FROM perfil_cache WHERE user_id = ?1) AS dados)
+"""
+
+
+def montar(user_id, prof, trend, pesos, medida):
+    """Dados da tela a partir das colunas cruas (dicts/listas do JSON)."""
+    est = tendencia.Estado(user_id, trend) if trend else tendencia.Estado(user_id)
+    dados = {
+        "prof": prof, "imc": None, "faixa": None, "peso_ideal": None, "motivacao": None,
+        "mensagem": None, "ideal_perfil": False, "erro_imc": False,
+        "tendencia": tendencia.resumo(est), "pesos": pesos or [], "ultima_medida": medida,
+    }
+    try:
+        if prof and prof["height_m"] and prof["weight_kg"]:
+            h = float(str(prof["height_m"]).replace(",", "."))
+            w = float(str(prof["weight_kg"]).replace(",", "."))
+            if h > 0 and w > 0:
+                imc = round(w / (h * h), 1)
+                min_w, max_w = tendencia.faixa_ideal(h)
+                dados.update(imc=imc, peso_ideal=(round(min_w, 1), round(max_w, 1)),
+                             tendencia=tendencia.resumo(est, h))
+
+                if imc < 18.5:
+                    faixa = "Abaixo do peso"
+                    motivacao = "⚡ Está leve demais! Bora ganhar massa com treinos e alimentação certa."
+                elif imc <= 24.9:
+                    faixa = "Peso ideal"
+                    motivacao = "✅ Tá no ponto, mantenha a disciplina que o jogo é seu!"
+                elif imc <= 29.9:
+                    faixa = "Sobrepeso"
+                    motivacao = "⚽ Força! Com treino e foco você vai chegar no shape ideal rapidinho."
+                else:
+                    faixa = "Obesidade"
+                    motivacao = "🔥 Hora de dar o gás! Cada treino é um passo rumo à evolução."
+                dados.update(faixa=faixa, motivacao=motivacao)
+
+                # Com pesagens, a mensagem segue a tendência (não oscila com o ruído do dia a dia)
+                if min_w <= (est.tendencia if est.n else w) <= max_w:
+                    dados["mensagem"] = "🎉 Parabéns! Você atingiu seu peso ideal."
+                dados["ideal_perfil"] = min_w <= w <= max_w
+    except Exception as e:
+        print("Erro ao calcular IMC:", e)
+        dados["erro_imc"] = True
+    return dados
+
+
+def _para_json(dados):
+    previsao = (dados["tendencia"] or {}).get("previsao")
+    if previsao:
+        dados = dict(dados, tendencia=dict(dados["tendencia"], previsao=previsao.isoformat()))
+    return json.dumps(dados, ensure_ascii=False)
+
+
+def _de_json(texto):
+    dados = json.loads(texto)
+    if dados["peso_ideal"]:
+        dados["peso_ideal"] = tuple(dados["peso_ideal"])
+    t = dados["tendencia"]
+    if t:
+        t["faixa"] = tuple(t["faixa"]) if t["faixa"] else None
+        t["previsao"] = date.fromisoformat(t["previsao"]) if t["previsao"] else None
+    return dados
+
+
+def _montar_row(user_id, row):
+    carregar = lambda v: json.loads(v) if v else None
+    return montar(user_id, carregar(row["prof"]), carregar(row["trend"]),
+                  carregar(row["pesos"]), carregar(row["medida"]))
+
+
+def ler(conn, user_id):
+    """Dados da tela de perfil — 1 consulta, só leitura (com ou sem foto)."""
+    row = conn.execute(SQL, (user_id,)).fetchone()
+    if row["dados"] is not None:
+        return _de_json(row["dados"])
+    return _montar_row(user_id, row)
+
+
+def atualizar(conn, user_id):
+    """Remonta e grava a foto. Chamar depois das gravações do jogador, na
+    mesma transação (os triggers já apagaram a foto velha). Não faz commit."""
+    row = conn.execute(SQL, (user_id,)).fetchone()
+    if row["dados"] is not None:
+        return _de_json(row["dados"])
+    dados = _montar_row(user_id, row)
+    conn.execute("INSERT OR REPLACE INTO perfil_cache (user_id, dados) VALUES (?, ?)",
+                 (user_id, _para_json(dados)))
+    return dados
@@ -0,0 +1,92 @@
+# peso.py
+# Série de peso (weight_log) para o gráfico, já reduzida no servidor.
+#
+# A página do gráfico busca /api/peso?de=AAAA-MM-DD&ate=AAAA-MM-DD&pontos=N
+# e recebe colunas compactas (t = epoch em segundos, kg = pesos). Se o
+# período tiver mais registros que `pontos`, a série é reduzida com LTTB
+# (Largest-Triangle-Three-Buckets), que mantém o formato da curva, o
+# primeiro e o último ponto. Mín/máx/atual são calculados antes da redução.
+# Linha sem data, com data que o SQLite não entende ou peso que não é
+# número (registros antigos) fica fora da série.
+from datetime import date, timedelta
+
+PONTOS_PADRAO = 200
+PONTOS_MAX = 2000
+
+_NUMEROS = (int, float)
+
+
+def lttb(ts, ys, pontos):
+    """Reduz (ts, ys) para `pontos` pontos. Retorna os índices escolhidos."""
+    n = len(ts)
+    if pontos >= n:
+        return list(range(n))
+    if pontos < 3:
+        return [0, n - 1]
+
+    escolhidos = [0]
+    tamanho = (n - 2) / (pontos - 2)
+    a = 0
+    for i in range(pontos - 2):
+        # Média do próximo balde (o terceiro vértice do triângulo)
+        ini_prox = int((i + 1) * tamanho) + 1
+        fim_prox = min(int((i + 2) * tamanho) + 1, n)
+        qtd = fim_prox - ini_prox
+        media_t = sum(ts[ini_prox:fim_prox]) / qtd
+        media_y = sum(ys[ini_prox:fim_prox]) / qtd
+
+        # Ponto do balde atual com maior triângulo (a, ponto, média)
+        ini, fim = int(i * tamanho) + 1, int((i + 1) * tamanho) + 1
+        ta, ya = ts[a], ys[a]
+        melhor, maior_area = ini, -1.0
+        for j in range(ini, fim):
+            area = abs((ta - media_t) * (ys[j] - ya) - (ta - ts[j]) * (media_y - ya))
+            if area > maior_area:
+                melhor, maior_area = j, area
+        escolhidos.append(melhor)
+        a = melhor
+
+    escolhidos.append(n - 1)
+    return escolhidos
+
+
+def _data(valor):
+    """'AAAA-MM-DD' -> date (None se vazio/inválido)."""
+    try:
+        return date.fromisoformat(valor) if valor else None
+    except ValueError:
+        return None
+
+
+def serie(conn, user_id, de=None, ate=None, pontos=PONTOS_PADRAO):
+    """Série do usuário no período [de, ate] em formato colunar."""
+    pontos = max(2, min(int(pontos), PONTOS_MAX))
+    filtros, args = ["user_id = ?", "log_date IS NOT NULL"], [user_id]
+    de, ate = _data(de), _data(ate)
+    if de:
+        filtros.append("log_date >= ?")
+        args.append(de.isoformat())
+    if ate:
+        filtros.append("log_date < ?")
+        args.append((ate + timedelta(days=1)).isoformat())
+
+    ts, ys = [], []
+    for t, kg in conn.execute(f"""
+        SELECT CAST(strftime('%s', log_date) AS INTEGER), weight_kg
+        FROM weight_log
+        WHERE {" AND ".join(filtros)}
+        ORDER BY log_date
+    """, args):
+        if t is None or type(kg) not in _NUMEROS:
+            continue
+        ts.append(t)
+        ys.append(kg)
+
+    resultado = {"total": len(ts), "t": ts, "kg": ys,
+                 "atual": None, "min": None, "max": None}
+    if ts:
+        resultado.update(atual=ys[-1], min=min(ys), max=max(ys))
+        if len(ts) > pontos:
+            idx = lttb(ts, ys, pontos)
+            resultado.update(t=[ts[i] for i in idx], kg=[ys[i] for i in idx])
+    return resultado
@@ -0,0 +1,73 @@
+# programas.py
+# Registro e progresso dos treinos específicos (resistência, velocidade,
+# força, explosão, mobilidade...).
+#
+# Todos os programas dividem a mesma tabela program_progress, com chave
+# (user_id, program, day). Novo programa = registrar a lista de treinos,
+# nenhuma tabela nova. O reinício do ciclo (ao concluir o último dia) é feito
+# por trigger, então concluir um dia é um único INSERT.
+from collections import namedtuple
+
+Programa = namedtuple("Programa", "nome treinos template")
+
+# nome -> Programa (ordem de registro = ordem de exibição)
+PROGRAMAS = {}
+
+
+def registrar_programa(nome, treinos, template=None):
+    PROGRAMAS[nome] = Programa(nome, treinos, template or f"treino_{nome}.html")
+    return PROGRAMAS[nome]
+
+
+def total_dias(nome):
+    return len(PROGRAMAS[nome].treinos)
+
+
+def sincronizar(conn):
+    """Grava o total de dias de cada programa (usado pelo trigger de ciclo)."""
+    atuais = dict(conn.execute("SELECT name, total_days FROM programs").fetchall())
+    novos = [(p.nome, len(p.treinos)) for p in PROGRAMAS.values()
+             if atuais.get(p.nome) != len(p.treinos)]
+    if novos:
+        conn.executemany("""
+            INSERT INTO programs (name, total_days) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET total_days = excluded.total_days
+        """, novos)
+        conn.commit()
+
+
+def concluir_dia(conn, user_id, programa, dia):
+    # Um único statement: se for o último dia que faltava, o trigger
+    # program_progress_ciclo zera o programa na mesma transação.
+    conn.execute(
+        "INSERT OR IGNORE INTO program_progress (user_id, program, day) VALUES (?, ?, ?)",
+        (user_id, programa, dia)
+    )
+    conn.commit()
+
+
+def dias_concluidos(conn, user_id, programa):
+    cur = conn.execute(
+        "SELECT day FROM program_progress WHERE user_id=? AND program=?",
+        (user_id, programa)
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def progresso_todos(conn, user_id):
+    """Progresso de todos os programas do usuário numa consulta só."""
+    # Contadores de user_progress (mantidos por trigger) — sem COUNT(*)
+    feitos = dict(conn.execute(
+        "SELECT plano, feitos FROM user_progress WHERE user_id=?", (user_id,)
+    ).fetchall())
+
+    resultado = {}
+    for nome, prog in PROGRAMAS.items():
+        total = len(prog.treinos)
+        n = feitos.get(nome, 0)
+        resultado[nome] = {
+            "feitos": n,
+            "total": total,
+            "progresso": int((n / total) * 100) if total else 0,
+        }
+    return resultado
@@ -0,0 +1,68 @@
+# progresso.py
+# Contadores de progresso por usuário (tabela user_progress).
+#
+# Os contadores são mantidos pelos triggers da migração 006 sempre que um
+# check-in (checkins) ou dia de programa (program_progress) é gravado ou
+# apagado — inclusive nos reinícios de ciclo. Aqui ficam a leitura e o
+# comando de conferência/reconstrução:
+#
+#     flask --app varzea_trainer_flask check-progress
+import sys
+
+import db
+from migrations import USER_PROGRESS_REAL, USER_PROGRESS_REBUILD
+
+
+def ler(conn, user_id):
+    """{plano: feitos} do usuário — uma busca pela chave primária."""
+    return dict(conn.execute(
+        "SELECT plano, feitos FROM user_progress WHERE user_id=?", (user_id,)
+    ).fetchall())
+
+
+def divergencias(conn):
+    """Contadores que não batem com os check-ins: [(user_id, plano, salvo, real)]."""
+    return conn.execute(f"""
+        WITH real AS ({USER_PROGRESS_REAL})
+        SELECT r.user_id, r.plano, COALESCE(u.feitos, 0), r.feitos
+        FROM real r LEFT JOIN user_progress u
+          ON u.user_id = r.user_id AND u.plano = r.plano
+        WHERE COALESCE(u.feitos, 0) != r.feitos
+        UNION ALL
+        SELECT u.user_id, u.plano, u.feitos, 0
+        FROM user_progress u
+        WHERE u.feitos > 0 AND NOT EXISTS (
+            SELECT 1 FROM real r WHERE r.user_id = u.user_id AND r.plano = u.plano
+        )
+    """).fetchall()
+
+
+def reconstruir(conn):
+    """Recalcula todos os contadores a partir dos check-ins."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM user_progress")
+        conn.execute(USER_PROGRESS_REBUILD)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def init_app(app):
+    @app.cli.command("check-progress")
+    def check_progress_command():
+        """Confere user_progress contra os check-ins e reconstrói se divergir."""
+        db.preparar()
+        conn = db.connect(app.config["DATABASE"])
+        try:
+            erradas = divergencias(conn)
+            for user_id, plano, salvo, real in erradas:
+                print(f"⚠️ usuário {user_id} / {plano}: salvo {salvo}, real {real}")
+            if erradas:
+                reconstruir(conn)
+                print(f"🔧 {len(erradas)} contadores divergentes — user_progress reconstruída.")
+                sys.exit(1)
+            print("✅ Contadores de progresso consistentes.")
+        finally:
+            conn.close()
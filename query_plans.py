@@ -0,0 +1,171 @@
+# query_plans.py
+# Verificação de planos de consulta (EXPLAIN QUERY PLAN).
+#
+# Roda uma sessão de jogador contra um banco temporário, captura TODAS as
+# consultas que as rotas fazem (set_trace_callback na conexão do pool) e
+# falha se alguma delas virar SCAN de tabela. Assim, um índice esquecido ou
+# uma consulta nova sem índice aparece antes de ir para produção:
+#
+#     flask --app varzea_trainer_flask check-queries
+import os
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import db
+import migrations
+import programas
+
+# Sessão típica: cadastro, login, dashboard, treinos, perfil, medidas...
+MEDIDAS = ["barriga", "peito", "braco_dir", "braco_esq",
+           "coxa_dir", "coxa_esq", "pant_dir", "pant_esq"]
+
+SESSAO = [
+    ("post", "/register", {"name": "Jogador", "email": "jogador@teste.com", "password": "123"}),
+    ("post", "/register", {"name": "Plano", "email": "plano@teste.com", "password": "123"}),
+    ("post", "/login", {"email": "plano@teste.com", "password": "123"}),
+    ("get", "/dashboard", None),
+    ("get", "/treino/1", None),
+    ("post", "/treino/1", {"treino_id": "1"}),
+    ("get", "/treino_semi_pro?treino_id=1", None),
+    ("post", "/treino_semi_pro?treino_id=1", {"treino_id": "1"}),
+    ("post", "/checkin", {"treino": "treino_livre"}),
+    ("get", "/meus_checkins", None),
+    ("get", "/api/checkins?cursor=MjAwMC0wMS0wMSAwMDowMDowMHwx", None),
+    ("get", "/treino_forca", None),
+    ("post", "/concluir_treino_forca/1", None),
+    ("post", "/perfil", {"idade": "25", "altura": "1,75", "peso": "80"}),
+    ("post", "/peso_diario", {"peso_diario": "79,5"}),
+    ("get", "/peso_grafico", None),
+    ("get", "/api/peso?de=2000-01-01&ate=2100-01-01&pontos=50", None),
+    ("post", "/medidas", {k: "30" for k in MEDIDAS}),
+    ("post", "/medidas", {k: "31" for k in MEDIDAS}),
+    ("get", "/perfil", None),
+    ("get", "/medidas", None),
+    ("get", "/comparativo", None),
+    ("get", "/api/comparativo?de=2000-01-01&ate=2100-01-01", None),
+    ("get", "/exportar", None),
+    ("get", "/exportar?formato=csv", None),
+    ("post", "/equipe/nova", {"nome": "Várzea FC"}),
+    ("post", "/equipe/1/jogadores", {"emails": "jogador@teste.com, sem@cadastro.com"}),
+    ("post", "/login", {"email": "jogador@teste.com", "password": "123"}),
+    ("get", "/dashboard", None),
+    ("post", "/equipe/1/convite", {"acao": "aceitar"}),
+    ("post", "/login", {"email": "plano@teste.com", "password": "123"}),
+    ("get", "/equipe/1", None),
+    ("post", "/equipe/1/plano", {"plano": "semi_pro"}),
+    ("get", "/equipe/1", None),
+    ("get", "/api/equipe/1", None),
+    ("get", "/ranking", None),
+    ("get", "/api/ranking?tipo=melhor&n=5", None),
+    ("post", "/forgot", {"email": "plano@teste.com"}),
+]
+
+# SCANs aceitos — a linha inteira do plano, não um pedaço dela: tabelas do
+# próprio SQLite (minúsculas), linha constante, o resultado já montado de
+# uma subconsulta no FROM (o plano dela vem em linhas próprias, que também
+# passam por aqui) e json_each(?) das listas passadas como parâmetro (sem
+# apelido, para o nome aparecer no plano)
+PERMITIDOS = (
+    re.compile(r"^SCAN (sqlite_master|sqlite_schema)( |$)"),
+    re.compile(r"^SCAN CONSTANT ROW$"),
+    re.compile(r"^SCAN \(subquery-\d+\)$"),
+    re.compile(r"^SCAN json_each VIRTUAL TABLE INDEX \d+:"),
+)
+
+_SCAN = re.compile(r"^SCAN (\S+)")
+
+
+def _normalizar(sql):
+    return " ".join(sql.split())
+
+
+def coletar(app, sessao=SESSAO):
+    """Executa a sessão e devolve as consultas (texto expandido) feitas pelas rotas."""
+    consultas = []
+    client = app.test_client()
+
+    with app.app_context():
+        conn = db.get_db()
+    conn.set_trace_callback(consultas.append)
+    try:
+        for metodo, caminho, dados in sessao:
+            resp = getattr(client, metodo)(caminho, data=dados)
+            resp.get_data()  # respostas em stream só consultam ao serem lidas
+            if resp.status_code >= 500:
+                raise RuntimeError(f"{metodo.upper()} {caminho} retornou {resp.status_code}")
+    finally:
+        conn.set_trace_callback(None)
+    return consultas
+
+
+def planos(conn, consultas):
+    """EXPLAIN QUERY PLAN de cada consulta distinta -> {sql: [detalhes]}."""
+    resultado = {}
+    for sql in consultas:
+        sql = _normalizar(sql)
+        verbo = sql.split(" ", 1)[0].upper()
+        # Ignora controle de transação, PRAGMAs e statements de triggers
+        if verbo not in ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH") or sql in resultado:
+            continue
+        resultado[sql] = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+    return resultado
+
+
+def regressoes(resultado):
+    """Consultas que fazem SCAN em tabela do app."""
+    ruins = {}
+    for sql, detalhes in resultado.items():
+        scans = [d for d in detalhes
+                 if _SCAN.match(d) and not any(p.match(d) for p in PERMITIDOS)]
+        if scans:
+            ruins[sql] = scans
+    return ruins
+
+
+@contextmanager
+def banco_temporario(app):
+    """Aponta o app para um banco novo (migrado) durante o bloco -> conexão avulsa."""
+    fd, caminho = tempfile.mkstemp(prefix="varzea_plans_", suffix=".db")
+    os.close(fd)
+    original = app.config["DATABASE"]
+    app.config["DATABASE"] = caminho
+    try:
+        migrations.upgrade(caminho, verbose=False)
+        conn = db.connect(caminho)
+        programas.sincronizar(conn)
+        try:
+            yield conn
+        finally:
+            conn.close()
+    finally:
+        app.config["DATABASE"] = original
+        db.close_all()
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(caminho + sufixo):
+                os.remove(caminho + sufixo)
+
+
+def verificar(app, verbose=True):
+    """Roda a sessão num banco temporário. Retorna {sql: [SCANs]} (vazio = ok)."""
+    with banco_temporario(app) as conn:
+        resultado = planos(conn, coletar(app))
+    ruins = regressoes(resultado)
+
+    if verbose:
+        for sql, detalhes in resultado.items():
+            marca = "❌" if sql in ruins else "✅"
+            print(f"{marca} {sql}")
+            for d in detalhes:
+                print(f"      {d}")
+        print(f"\n{len(resultado)} consultas verificadas, {len(ruins)} com SCAN.")
+    return ruins
+
+
+def init_app(app):
+    @app.cli.command("check-queries")
+    def check_queries_command():
+        """Falha se alguma consulta das rotas fizer SCAN de tabela."""
+        if verificar(app):
+            sys.exit(1)
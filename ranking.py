@@ -0,0 +1,220 @@
+# ranking.py
+# Ranking de constância: dias seguidos com check-in (sequência atual e a
+# melhor de cada jogador), tabelas da migração 012.
+#
+# Cada check-in (/checkin, treino amador, treino semi-pro) chama registrar()
+# na mesma transação: grava o dia em checkin_dias e, se for um dia novo,
+# anda a sequência num UPSERT só — nada de reler o histórico. Os dias ficam
+# guardados mesmo quando o plano reinicia (os check-ins do ciclo são
+# apagados, a constância não). Dia = data local (VARZEA_FUSO).
+#
+# Top N sai do índice (atual/melhor DESC); a posição do jogador soma
+# streak_contagem (jogadores por valor, mantida por trigger) só nos valores
+# acima do dele — o custo depende do tamanho das sequências, não de quantos
+# jogadores existem. Sequência que não treinou ontem nem hoje é zerada na
+# primeira leitura do dia (expirar). Conferir contra os dias gravados:
+#
+#     flask --app varzea_trainer_flask check-streaks
+import sys
+from datetime import datetime, timedelta, timezone
+
+import db
+import regional
+
+TOP = 20
+TOP_MAX = 100
+TIPOS = ("atual", "melhor")
+
+_expirado = None   # último dia (local) em que este processo expirou sequências
+
+# Sequências a partir dos dias: ilhas de dias consecutivos (dia - nº da linha
+# é constante dentro de uma ilha). ?1 = user_id, ou NULL para todos.
+SQL_ILHAS = """
+    WITH d AS (
+        SELECT user_id, dia,
+            julianday(dia) - ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY dia) AS ilha
+        FROM checkin_dias
+        WHERE ?1 IS NULL OR user_id = ?1
+    ), ilhas AS (
+        SELECT user_id, COUNT(*) AS n, MAX(dia) AS fim FROM d GROUP BY user_id, ilha
+    )
+    SELECT user_id, MAX(n) AS melhor, MAX(fim) AS ultimo,
+        (SELECT n FROM ilhas i2 WHERE i2.user_id = ilhas.user_id ORDER BY fim DESC LIMIT 1) AS ultima_ilha
+    FROM ilhas GROUP BY user_id
+"""
+
+
+def dia_local(created_at):
+    """created_at do SQLite (UTC, 'AAAA-MM-DD HH:MM:SS') -> 'AAAA-MM-DD' local."""
+    quando = datetime.fromisoformat(str(created_at))
+    if quando.tzinfo is None:
+        quando = quando.replace(tzinfo=timezone.utc)
+    return quando.astimezone(regional.tz()).date().isoformat()
+
+
+def _atual(ultima_ilha, ultimo, referencia=None):
+    # Sequência que parou antes de ontem já quebrou
+    ontem = ((referencia or regional.hoje()) - timedelta(days=1)).isoformat()
+    return ultima_ilha if ultimo >= ontem else 0
+
+
+def _salvar(conn, user_id, atual, melhor, ultimo):
+    conn.execute("""
+        INSERT INTO streaks (user_id, atual, melhor, ultimo) VALUES (?, ?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            atual = excluded.atual, melhor = excluded.melhor, ultimo = excluded.ultimo
+    """, (user_id, atual, melhor, ultimo))
+
+
+def registrar(conn, user_id, created_at=None):
+    """Chamar logo depois do INSERT em checkins, na mesma transação. Não faz commit.
+
+    Dia já contado: 1 statement. Dia novo: 2 (o dia + UPSERT da sequência).
+    Dia antigo (fora de ordem): recalcula o jogador.
+    """
+    dia = dia_local(created_at) if created_at else regional.hoje().isoformat()
+    if not conn.execute("INSERT OR IGNORE INTO checkin_dias (user_id, dia) VALUES (?, ?)",
+                        (user_id, dia)).rowcount:
+        return
+    # Todas as expressões do SET enxergam a linha antiga
+    andou = conn.execute("""
+        INSERT INTO streaks (user_id, atual, melhor, ultimo) VALUES (?1, 1, 1, ?2)
+        ON CONFLICT(user_id) DO UPDATE SET
+            atual = CASE WHEN ?2 = date(ultimo, '+1 day') THEN atual + 1 ELSE 1 END,
+            melhor = MAX(melhor, CASE WHEN ?2 = date(ultimo, '+1 day') THEN atual + 1 ELSE 1 END),
+            ultimo = ?2
+        WHERE ?2 > ultimo
+    """, (user_id, dia)).rowcount
+    if not andou:
+        recalcular(conn, user_id, incluir_checkins=False)   # dia anterior ao último
+
+
+def recalcular(conn, user_id, incluir_checkins=True):
+    """Refaz a sequência do jogador a partir dos dias gravados (antes, junta
+    os dias dos check-ins que existem — importação/migração). Não faz commit."""
+    if incluir_checkins:
+        dias = {dia_local(r[0]) for r in conn.execute(
+            "SELECT created_at FROM checkins WHERE user_id=? AND created_at IS NOT NULL", (user_id,))}
+        conn.executemany("INSERT OR IGNORE INTO checkin_dias (user_id, dia) VALUES (?, ?)",
+                         [(user_id, d) for d in dias])
+    row = conn.execute(SQL_ILHAS, (user_id,)).fetchone()
+    if row is None:
+        conn.execute("DELETE FROM streaks WHERE user_id=?", (user_id,))
+        return
+    _salvar(conn, user_id, _atual(row["ultima_ilha"], row["ultimo"]), row["melhor"], row["ultimo"])
+
+
+def expirar(conn, forcar=False):
+    """Zera as sequências de quem não treinou ontem nem hoje. Uma vez por dia
+    por processo (depois disso nenhuma quebra até a virada do dia)."""
+    global _expirado
+    dia = regional.hoje()
+    if _expirado == dia and not forcar:
+        return 0
+    ontem = (dia - timedelta(days=1)).isoformat()
+    try:
+        n = conn.execute("UPDATE streaks SET atual = 0 WHERE atual > 0 AND ultimo < ?",
+                         (ontem,)).rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    _expirado = dia
+    return n
+
+
+def top(conn, tipo="atual", n=TOP):
+    """[(posição, user_id, nome, atual, melhor, ultimo)] dos N primeiros."""
+    if tipo not in TIPOS:
+        raise ValueError(f"tipo inválido: {tipo}")
+    n = max(1, min(int(n), TOP_MAX))
+    expirar(conn)
+    rows = conn.execute(f"""
+        SELECT s.user_id, u.name, s.atual, s.melhor, s.ultimo
+        FROM streaks s JOIN users u ON u.id = s.user_id
+        WHERE s.{tipo} > 0
+        ORDER BY s.{tipo} DESC, s.ultimo DESC
+        LIMIT ?
+    """, (n,)).fetchall()
+    # Empates dividem a posição (1, 2, 2, 4...)
+    resultado, posicao, anterior = [], 0, None
+    for i, r in enumerate(rows, 1):
+        if r[tipo] != anterior:
+            posicao, anterior = i, r[tipo]
+        resultado.append((posicao, r["user_id"], r["name"], r["atual"], r["melhor"], r["ultimo"]))
+    return resultado
+
+
+def posicao(conn, user_id):
+    """{"atual", "melhor", "posicao_atual", "posicao_melhor", "jogadores"} do
+    jogador (None se nunca fez check-in)."""
+    expirar(conn)
+    row = conn.execute("""
+        SELECT s.atual, s.melhor,
+            1 + (SELECT COALESCE(SUM(n), 0) FROM streak_contagem
+                 WHERE tipo = 'atual' AND valor > s.atual) AS posicao_atual,
+            1 + (SELECT COALESCE(SUM(n), 0) FROM streak_contagem
+                 WHERE tipo = 'melhor' AND valor > s.melhor) AS posicao_melhor,
+            (SELECT COALESCE(SUM(n), 0) FROM streak_contagem WHERE tipo = 'melhor') AS jogadores
+        FROM streaks s WHERE s.user_id = ?
+    """, (user_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def divergencias(conn, referencia=None):
+    """[(user_id, salvo, real)] das sequências que não batem com checkin_dias
+    (salvo/real = (atual, melhor, ultimo)) — uma consulta para todos."""
+    reais = {r["user_id"]: (_atual(r["ultima_ilha"], r["ultimo"], referencia), r["melhor"], r["ultimo"])
+             for r in conn.execute(SQL_ILHAS, (None,))}
+    salvos = {r[0]: tuple(r[1:]) for r in conn.execute(
+        "SELECT user_id, atual, melhor, ultimo FROM streaks")}
+    erradas = []
+    for user_id in reais.keys() | salvos.keys():
+        salvo, real = salvos.get(user_id), reais.get(user_id)
+        # "atual" salvo de quem parou só zera na expiração do dia
+        if salvo and real and salvo[0] and not real[0]:
+            salvo = (0,) + salvo[1:]
+        if salvo != real:
+            erradas.append((user_id, salvo, real))
+    return erradas
+
+
+def init_app(app):
+    @app.cli.command("check-streaks")
+    def check_streaks_command():
+        """Confere streaks e streak_contagem contra os dias de check-in e refaz quem divergir."""
+        db.preparar()
+        conn = db.connect(app.config["DATABASE"])
+        try:
+            erradas = divergencias(conn)
+            for user_id, salvo, real in erradas:
+                print(f"⚠️ usuário {user_id}: salvo {salvo}, real {real}")
+            salvos = {(r[0], r[1]): r[2] for r in conn.execute(
+                "SELECT tipo, valor, n FROM streak_contagem")}
+            reais = {(r[0], r[1]): r[2] for r in conn.execute("""
+                SELECT 'atual', atual, COUNT(*) FROM streaks GROUP BY atual
+                UNION ALL
+                SELECT 'melhor', melhor, COUNT(*) FROM streaks GROUP BY melhor
+            """)}
+            contagem = [chave for chave in salvos.keys() | reais.keys()
+                        if salvos.get(chave) != reais.get(chave)]
+            for tipo, valor in sorted(contagem):
+                print(f"⚠️ streak_contagem {tipo}={valor}: {salvos.get((tipo, valor), 0)}, "
+                      f"real {reais.get((tipo, valor), 0)}")
+            if erradas or contagem:
+                conn.execute("BEGIN IMMEDIATE")
+                for user_id, _, _ in erradas:
+                    recalcular(conn, user_id, incluir_checkins=False)
+                if contagem:
+                    conn.execute("DELETE FROM streak_contagem")
+                    for tipo in TIPOS:
+                        conn.execute(f"""
+                            INSERT INTO streak_contagem (tipo, valor, n)
+                            SELECT '{tipo}', {tipo}, COUNT(*) FROM streaks GROUP BY {tipo}
+                        """)
+                conn.commit()
+                print(f"🔧 {len(erradas)} sequências e {len(contagem)} contadores divergentes — refeitos.")
+                sys.exit(1)
+            print("✅ Sequências de check-in consistentes.")
+        finally:
+            conn.close()
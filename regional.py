@@ -0,0 +1,50 @@
+# regional.py
+# Números e horas no formato do jogador: vírgula decimal ("72,5") e o fuso
+# do app (VARZEA_FUSO). Usado pelos formulários (perfil, medidas, peso
+# diário), pela importação da balança e pelo ranking de constância.
+import os
+from datetime import datetime, timezone
+
+FUSO = os.environ.get("VARZEA_FUSO", "America/Sao_Paulo")
+
+_tz = None
+
+
+def numero(texto):
+    """'72,5' / '72.5' / '1.234,5' / '1,234.5' -> float (ValueError se não for número)."""
+    t = str(texto).strip().replace(" ", "")
+    if "," in t:
+        if "." in t and t.rindex(".") > t.rindex(","):
+            t = t.replace(",", "")
+        else:
+            t = t.replace(".", "").replace(",", ".")
+    return float(t)
+
+
+def fuso(nome):
+    """Nome IANA ('America/Sao_Paulo') -> tzinfo. ValueError se não existir."""
+    from zoneinfo import ZoneInfo   # só quem importa paga
+
+    if nome in ("UTC", "Z"):
+        return timezone.utc
+    try:
+        return ZoneInfo(nome)
+    except (KeyError, ValueError):
+        raise ValueError(f"fuso horário desconhecido: {nome}")
+
+
+def tz():
+    """tzinfo de FUSO (carregado uma vez)."""
+    global _tz
+    if _tz is None:
+        _tz = fuso(FUSO)
+    return _tz
+
+
+def agora():
+    """Hora local do app sem tzinfo — o formato gravado em weight_log."""
+    return datetime.now(tz()).replace(tzinfo=None)
+
+
+def hoje():
+    return datetime.now(tz()).date()
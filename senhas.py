@@ -0,0 +1,142 @@
+# senhas.py
+# Hash de senha com política configurável e verificação fora do worker web.
+#
+# - PASSWORD_METHOD: método/custo do werkzeug (ex.: "scrypt:32768:8:1",
+#   "pbkdf2:sha256:600000"). Hash antigo com outro método é refeito no login.
+# - PASSWORD_POOL: nº de processos para hash/verificação (0 = na própria
+#   thread). O pool é limitado: no máximo PASSWORD_POOL * 4 pedidos na fila.
+#   Fila cheia ou hash demorando mais que TIMEOUT: Ocupado (a rota responde
+#   503); processo do pool morto: o pool é recriado e o hash sai inline.
+#
+#     flask --app varzea_trainer_flask hash-bench
+import os
+import threading
+import time
+
+import click
+from werkzeug.security import check_password_hash, generate_password_hash
+
+METODO = os.environ.get("PASSWORD_METHOD", "scrypt:32768:8:1")
+POOL = int(os.environ.get("PASSWORD_POOL", min(os.cpu_count() or 1, 4)))
+TIMEOUT = 10  # segundos esperando o pool antes de desistir
+
+_pool = {"pid": None, "executor": None, "vagas": None}
+_pool_lock = threading.Lock()
+
+
+class Ocupado(Exception):
+    """Pool de senhas sem vaga (ou sem resposta) dentro do TIMEOUT."""
+
+
+def _executor():
+    if POOL <= 0:
+        return None, None
+    with _pool_lock:
+        # Um pool por processo — workers do gunicorn não herdam o do pai
+        if _pool["pid"] != os.getpid():
+            # Importados só aqui: subir o app não carrega multiprocessing
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Nada de fork: o worker gthread tem várias threads (locks
+            # copiados no meio do uso). forkserver cria os filhos a partir
+            # de um processo limpo; spawn onde ele não existe
+            contexto = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool.update(
+                pid=os.getpid(),
+                executor=ProcessPoolExecutor(
+                    max_workers=POOL, mp_context=multiprocessing.get_context(contexto)
+                ),
+                vagas=threading.BoundedSemaphore(POOL * 4),
+            )
+        return _pool["executor"], _pool["vagas"]
+
+
+def _rodar(fn, *args):
+    executor, vagas = _executor()
+    if executor is None:
+        return fn(*args)
+    from concurrent.futures import TimeoutError as Demorou
+    from concurrent.futures.process import BrokenProcessPool
+
+    if not vagas.acquire(timeout=TIMEOUT):
+        raise Ocupado("fila do pool de senhas cheia")
+    futuro = None
+    try:
+        futuro = executor.submit(fn, *args)
+        return futuro.result(timeout=TIMEOUT)
+    except Demorou:
+        futuro.cancel()
+        raise Ocupado("pool de senhas sem resposta")
+    except (BrokenProcessPool, RuntimeError):
+        # Processo do pool morreu (ou pool desligado): recria na próxima e
+        # resolve aqui mesmo
+        with _pool_lock:
+            if _pool["executor"] is executor:
+                _pool["pid"] = None
+        return fn(*args)
+    finally:
+        vagas.release()
+
+
+def encerrar():
+    """Desliga o pool deste processo (fim do worker do gunicorn)."""
+    with _pool_lock:
+        if _pool["pid"] == os.getpid() and _pool["executor"] is not None:
+            _pool["executor"].shutdown(wait=False, cancel_futures=True)
+        _pool.update(pid=None, executor=None, vagas=None)
+
+
+def gerar_hash(senha, metodo=None):
+    return _rodar(generate_password_hash, senha, metodo or METODO)
+
+
+def verificar(pw_hash, senha):
+    return _rodar(check_password_hash, pw_hash, senha)
+
+
+def precisa_rehash(pw_hash, metodo=None):
+    """True se o hash foi gerado com método/custo diferente da política atual."""
+    return pw_hash.split("$", 1)[0] != (metodo or METODO)
+
+
+def init_app(app):
+    @app.errorhandler(Ocupado)
+    def ocupado(erro):
+        # Só login/cadastro/nova senha chegam aqui — cada uma com o template do mesmo nome
+        from flask import flash, render_template, request
+
+        print(f"⚠️ {erro}")
+        flash("⏳ Muita gente entrando agora — tente de novo em alguns segundos.", "error")
+        return render_template(f"{request.endpoint}.html"), 503, {"Retry-After": "5"}
+
+    @app.cli.command("hash-bench")
+    @click.option("-n", "total", default=20, help="Verificações por método.")
+    @click.option("--metodo", "metodos", multiple=True,
+                  help="Método a medir (pode repetir). Padrão: alguns custos de scrypt/pbkdf2.")
+    def hash_bench_command(total, metodos):
+        """Logins/s (verificação de senha) por método de hash, inline e no pool."""
+        metodos = metodos or (
+            "scrypt:16384:8:1", "scrypt:32768:8:1",
+            "pbkdf2:sha256:260000", "pbkdf2:sha256:600000",
+        )
+        executor, _ = _executor()
+        print(f"{'método':<24} {'inline/s':>10} {'pool/s':>10}  (pool={POOL})")
+        for metodo in metodos:
+            h = generate_password_hash("senha-bench", metodo)
+
+            inicio = time.perf_counter()
+            for _ in range(total):
+                check_password_hash(h, "senha-bench")
+            inline = total / (time.perf_counter() - inicio)
+
+            pool = "-"
+            if executor is not None:
+                executor.submit(check_password_hash, h, "x").result()  # aquece
+                inicio = time.perf_counter()
+                futuros = [executor.submit(check_password_hash, h, "senha-bench")
+                           for _ in range(total)]
+                for f in futuros:
+                    f.result()
+                pool = f"{total / (time.perf_counter() - inicio):.1f}"
+            print(f"{metodo:<24} {inline:>10.1f} {pool:>10}")
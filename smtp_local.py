@@ -0,0 +1,91 @@
+# smtp_local.py
+# Servidor SMTP mínimo, em processo, para testes e benchmarks offline.
+#
+# Aceita qualquer remetente/destinatário e guarda as mensagens em memória
+# (SMTPLocal.mensagens). Sem TLS e sem autenticação — nunca use em produção.
+import socketserver
+import threading
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _responder(self, linha):
+        self.wfile.write((linha + "\r\n").encode())
+
+    def handle(self):
+        servidor = self.server.smtp
+        remetente, destinos = None, []
+        self._responder("220 varzea-smtp-local pronto")
+
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode(errors="replace").strip()
+            verbo = comando.split(" ", 1)[0].upper()
+
+            if verbo in ("EHLO", "HELO"):
+                self._responder("250 varzea-smtp-local")
+            elif verbo == "MAIL":
+                remetente, destinos = comando.split(":", 1)[1].strip(), []
+                self._responder("250 OK")
+            elif verbo == "RCPT":
+                destinos.append(comando.split(":", 1)[1].strip())
+                self._responder("250 OK")
+            elif verbo == "DATA":
+                self._responder("354 Termine com <CRLF>.<CRLF>")
+                partes = []
+                while True:
+                    dado = self.rfile.readline()
+                    if not dado or dado in (b".\r\n", b".\n"):
+                        break
+                    partes.append(dado[1:] if dado.startswith(b"..") else dado)
+                with servidor.lock:
+                    servidor.mensagens.append({
+                        "de": remetente,
+                        "para": destinos,
+                        "dados": b"".join(partes),
+                    })
+                remetente, destinos = None, []
+                self._responder("250 Mensagem aceita")
+            elif verbo == "RSET":
+                remetente, destinos = None, []
+                self._responder("250 OK")
+            elif verbo == "NOOP":
+                self._responder("250 OK")
+            elif verbo == "QUIT":
+                self._responder("221 Tchau")
+                return
+            else:
+                self._responder("502 Comando não implementado")
+
+
+class _Servidor(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPLocal:
+    """Servidor SMTP local em thread: `with SMTPLocal() as smtp: ...`."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.mensagens = []
+        self.lock = threading.Lock()
+        self._server = _Servidor((host, port), _Handler)
+        self._server.smtp = self
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
@@ -0,0 +1,165 @@
+# sql_trace.py
+# Rastreamento de SQL (opcional): consultas lentas e padrão N+1.
+#
+#     SQL_TRACE=1 flask --app varzea_trainer_flask run
+#
+# - Statement acima de SQL_SLOW_MS (padrão 50 ms) vai para o log com a rota.
+# - No fim da requisição, a mesma "forma" de statement repetida SQL_N_MAIS_1
+#   vezes ou mais (padrão 5) é avisada como provável N+1.
+# - Nada de valores no log: parâmetros ligados (?) nunca aparecem e literais
+#   escritos no SQL viram "?".
+#
+# Limite de consultas por rota (roda a sessão do check-queries):
+#
+#     flask --app varzea_trainer_flask check-query-count
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+import db
+
+SLOW_MS = float(os.environ.get("SQL_SLOW_MS", 50))
+N_MAIS_1 = int(os.environ.get("SQL_N_MAIS_1", 5))
+
+# Máximo de statements por requisição na sessão do query_plans (método, rota)
+LIMITES = {
+    ("POST", "/register"): 3,
+    ("POST", "/login"): 2,
+    ("GET", "/dashboard"): 3,    # progresso + equipes do jogador
+    ("POST", "/perfil"): 5,         # perfil + foto nova em perfil_cache (o GET só lê)
+    ("POST", "/medidas"): 4,        # idem
+    ("POST", "/peso_diario"): 8,    # peso + estado da tendência (janelas 7/30 dias) + foto
+    ("GET", "/exportar"): 6,
+    ("GET", "/equipe/1"): 5,        # sem painel salvo: lê, remonta e grava
+    ("POST", "/equipe/nova"): 4,
+    ("POST", "/equipe/1/jogadores"): 5,
+    ("POST", "/treino/1"): 5,          # check-in + dia e sequência (ranking.registrar)
+    ("POST", "/treino_semi_pro"): 5,
+    ("POST", "/checkin"): 5,
+    ("GET", "/ranking"): 5,           # expiração do dia (1ª leitura) + top atual/melhor + posição
+}
+LIMITE_PADRAO = 3
+
+# PRAGMA/BEGIN/COMMIT se repetem por natureza — N+1 só vale para consultas
+_DML = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def forma(sql):
+    """SQL sem espaços extras e sem literais — chave de agrupamento e texto do log."""
+    if sql is None:
+        return "?"
+    return _LITERAIS.sub("?", " ".join(sql.split()))
+
+
+def repetidas(formas, minimo=N_MAIS_1):
+    """{forma: n} das consultas repetidas `minimo` vezes ou mais."""
+    return {sql: n for sql, n in formas.items()
+            if n >= minimo and sql.split(" ", 1)[0].upper() in _DML}
+
+
+def _onde():
+    if has_request_context():
+        return f"{request.method} {request.path}"
+    return "fora de requisição"
+
+
+def _observar(sql, segundos, novo):
+    if segundos * 1000 >= SLOW_MS:
+        etapa = "" if novo else " (fetch)"
+        print(f"🐢 SQL lento{etapa} {segundos * 1000:.1f} ms [{_onde()}]: {forma(sql)}")
+    if novo and has_request_context():
+        formas = g.get("_sql_formas")
+        if formas is None:
+            formas = g._sql_formas = Counter()
+        formas[forma(sql)] += 1
+
+
+def _depois(resp):
+    formas = g.pop("_sql_formas", None)
+    for sql, n in repetidas(formas or {}).items():
+        print(f"⚠️ Possível N+1 [{_onde()}]: {n}× {sql}")
+    return resp
+
+
+class Contagem:
+    """Statements vistos dentro de contar_consultas()."""
+
+    def __init__(self):
+        self.formas = Counter()
+
+    @property
+    def total(self):
+        return sum(self.formas.values())
+
+    def repetidas(self, minimo=N_MAIS_1):
+        return repetidas(self.formas, minimo)
+
+
+@contextmanager
+def contar_consultas():
+    """Conta os statements (por forma) executados dentro do bloco."""
+    contagem = Contagem()
+
+    def _contar(sql, segundos, novo):
+        if novo:
+            contagem.formas[forma(sql)] += 1
+
+    db.observar(_contar)
+    try:
+        yield contagem
+    finally:
+        db.esquecer(_contar)
+
+
+def verificar(app, verbose=True):
+    """Roda a sessão do check-queries contando statements -> lista de problemas."""
+    import query_plans
+
+    problemas = []
+    with query_plans.banco_temporario(app):
+        # Migrações/preparo da 1ª conexão não contam para a rota
+        with app.app_context():
+            db.get_db()
+        client = app.test_client()
+        for metodo, caminho, dados in query_plans.SESSAO:
+            rota = caminho.split("?", 1)[0]
+            limite = LIMITES.get((metodo.upper(), rota), LIMITE_PADRAO)
+            inicio = time.perf_counter()
+            with contar_consultas() as c:
+                resp = getattr(client, metodo)(caminho, data=dados)
+                resp.get_data()
+            ms = (time.perf_counter() - inicio) * 1000
+            if resp.status_code >= 500:
+                problemas.append(f"{metodo.upper()} {caminho} retornou {resp.status_code}")
+            if c.total > limite:
+                problemas.append(f"{metodo.upper()} {rota}: {c.total} statements (limite {limite})")
+            for sql, n in c.repetidas().items():
+                problemas.append(f"{metodo.upper()} {rota}: N+1? {n}× {sql}")
+            if verbose:
+                marca = "❌" if c.total > limite or c.repetidas() else "✅"
+                print(f"{marca} {metodo.upper():4} {rota:28} {c.total:3}/{limite:<3} {ms:6.1f} ms")
+    return problemas
+
+
+def init_app(app):
+    @app.cli.command("check-query-count")
+    def check_query_count_command():
+        """Falha se alguma rota passar do limite de statements ou repetir consultas (N+1)."""
+        problemas = verificar(app)
+        for p in problemas:
+            print("❌", p)
+        if problemas:
+            sys.exit(1)
+        print("✅ Nº de consultas por rota dentro dos limites.")
+
+    if os.environ.get("SQL_TRACE") == "1" or app.config.get("SQL_TRACE"):
+        db.observar(_observar)
+        app.after_request(_depois)
+        print(f"🔎 SQL_TRACE ativo (lentas ≥ {SLOW_MS:.0f} ms, N+1 ≥ {N_MAIS_1}×)")
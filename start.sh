@@ -6,4 +6,7 @@ export SMTP_PASS="SUA_SENHA_DE_APP"
 export SMTP_FROM="$SMTP_USER"
 export APP_SECRET="troca_esse_segredo"
 export BASE_URL="http://127.0.0.1:5000"
+# Caminho do banco SQLite (":memory:" para benchmarks)
+export VARZEA_DB="$(dirname "$0")/varzea.db"
+# Servidor de desenvolvimento; em produção: gunicorn app:app (ver gunicorn.conf.py)
 python3 varzea_trainer_flask.py
@@ -0,0 +1,297 @@
+# tendencia.py
+# Tendência do peso por jogador (tabela weight_trend), atualizada em O(1) a
+# cada peso gravado — as páginas leem o estado em vez de reler o histórico.
+#
+# Estado por jogador:
+# - médias de 7 e 30 dias (janela terminando no peso mais recente): soma e
+#   contagem; quando a janela anda, sai só o que ficou para trás (uma
+#   consulta pelo índice (user_id, log_date));
+# - EWMA no tempo e reta de mínimos quadrados ponderada, das mesmas somas
+#   (sw, st, sy, stt, sty) com peso exp(-idade/TAU), idade em dias até o
+#   peso mais recente. EWMA = sy/sw; a inclinação é a da reta. Como o peso
+#   depende só da idade, um registro antigo (importado) entra com o peso
+#   certo: a ordem de chegada não muda o resultado.
+# Com a altura do perfil, projeta a data em que a tendência entra na faixa
+# de peso ideal (IMC 18.5–24.9). O "peso ideal" das telas usa a tendência,
+# não a pesagem do dia — o ruído diário não faz o aviso ir e voltar.
+#
+# A migração 009 monta o estado de quem já tinha pesos; importações em lote
+# recalculam o jogador de uma vez (recalcular). Conferir o estado salvo
+# contra o histórico:
+#
+#     flask --app varzea_trainer_flask check-trends
+import math
+import os
+import sys
+from datetime import datetime, timedelta
+
+import db
+
+MEIA_VIDA = float(os.environ.get("TREND_MEIA_VIDA", 10))   # dias
+TAU = MEIA_VIDA / math.log(2)
+JANELAS = (7, 30)                 # dias das médias móveis
+MIN_DIAS = 7                      # histórico mínimo para a inclinação
+HORIZONTE = 730                   # previsão além disso (dias) não é mostrada
+IMC_IDEAL = (18.5, 24.9)
+
+COLUNAS = ("n", "primeira", "ultima", "ultimo_kg", "n7", "s7", "n30", "s30",
+           "sw", "st", "sy", "stt", "sty")
+
+
+def _data(texto):
+    return datetime.fromisoformat(str(texto))
+
+
+def _texto(quando):
+    return quando.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _dias(a, b):
+    return (a - b).total_seconds() / 86400
+
+
+def faixa_ideal(altura_m):
+    """(mínimo, máximo) em kg do IMC ideal para a altura."""
+    h2 = altura_m * altura_m
+    return IMC_IDEAL[0] * h2, IMC_IDEAL[1] * h2
+
+
+class Estado:
+    """Estado da tendência de um jogador (uma linha de weight_trend)."""
+
+    __slots__ = ("user_id",) + COLUNAS
+
+    def __init__(self, user_id, row=None):
+        self.user_id = user_id
+        for c in COLUNAS:
+            setattr(self, c, row[c] if row is not None else 0)
+        if row is None:
+            self.primeira = self.ultima = ""   # sem pesos ainda
+
+    # --------- atualização ---------
+
+    def _somar(self, kg, idade):
+        e = math.exp(-idade / TAU)
+        t = -idade
+        self.sw += e
+        self.st += e * t
+        self.sy += e * kg
+        self.stt += e * t * t
+        self.sty += e * t * kg
+
+    def _andar(self, delta):
+        # Todas as idades crescem `delta` dias: desloca t e aplica o decaimento
+        self.stt += -2 * delta * self.st + delta * delta * self.sw
+        self.sty -= delta * self.sy
+        self.st -= delta * self.sw
+        d = math.exp(-delta / TAU)
+        self.sw *= d
+        self.st *= d
+        self.sy *= d
+        self.stt *= d
+        self.sty *= d
+
+    def incluir(self, kg, quando, saiu_da_janela):
+        """Soma um peso. saiu_da_janela(de, ate) -> (n, soma) dos pesos em (de, ate]."""
+        if not self.n:
+            self.primeira = self.ultima = _texto(quando)
+            self.ultimo_kg = kg
+        ultima = _data(self.ultima)
+        if quando > ultima:
+            for dias in JANELAS:
+                n, soma = saiu_da_janela(_texto(ultima - timedelta(days=dias)),
+                                         _texto(quando - timedelta(days=dias)))
+                setattr(self, f"n{dias}", getattr(self, f"n{dias}") - n)
+                setattr(self, f"s{dias}", getattr(self, f"s{dias}") - soma)
+            self._andar(_dias(quando, ultima))
+            self.ultima, self.ultimo_kg = _texto(quando), kg
+            ultima = quando
+        if _texto(quando) < self.primeira:
+            self.primeira = _texto(quando)
+        idade = _dias(ultima, quando)
+        for dias in JANELAS:
+            if idade < dias:
+                setattr(self, f"n{dias}", getattr(self, f"n{dias}") + 1)
+                setattr(self, f"s{dias}", getattr(self, f"s{dias}") + kg)
+        self.n += 1
+        self._somar(kg, idade)
+
+    # --------- leitura ---------
+
+    @property
+    def media7(self):
+        return self.s7 / self.n7 if self.n7 else None
+
+    @property
+    def media30(self):
+        return self.s30 / self.n30 if self.n30 else None
+
+    @property
+    def ewma(self):
+        return self.sy / self.sw if self.sw else None
+
+    @property
+    def inclinacao(self):
+        """kg por dia (reta ponderada); None com pouco histórico."""
+        if not self.sw or _dias(_data(self.ultima), _data(self.primeira)) < MIN_DIAS:
+            return None
+        media_t = self.st / self.sw
+        variancia = self.stt / self.sw - media_t * media_t
+        if self.sw < 2 or variancia < 1:
+            return None   # pesos recentes concentrados num dia só
+        return (self.sty / self.sw - media_t * self.sy / self.sw) / variancia
+
+    @property
+    def tendencia(self):
+        """Peso da tendência no dia da última pesagem (reta, ou EWMA sem reta)."""
+        inclinacao = self.inclinacao
+        if inclinacao is None:
+            return self.ewma
+        return (self.sy - inclinacao * self.st) / self.sw
+
+    def no_ideal(self, altura_m):
+        minimo, maximo = faixa_ideal(altura_m)
+        return minimo <= self.tendencia <= maximo
+
+    def previsao(self, altura_m):
+        """Data em que a tendência chega à faixa ideal (None se já está, se vai
+        para o lado errado ou se passa de HORIZONTE dias)."""
+        minimo, maximo = faixa_ideal(altura_m)
+        valor, inclinacao = self.tendencia, self.inclinacao
+        if minimo <= valor <= maximo or not inclinacao:
+            return None
+        dias = ((maximo if valor > maximo else minimo) - valor) / inclinacao
+        if not 0 < dias <= HORIZONTE:
+            return None
+        return (_data(self.ultima) + timedelta(days=dias)).date()
+
+
+def resumo(estado, altura_m=None):
+    """Números arredondados para as telas (None sem pesos)."""
+    if estado is None or not estado.n:
+        return None
+    inclinacao = estado.inclinacao
+    r = {
+        "tendencia": round(estado.tendencia, 1),
+        "media7": round(estado.media7, 1) if estado.n7 else None,
+        "media30": round(estado.media30, 1) if estado.n30 else None,
+        "kg_semana": round(inclinacao * 7, 2) if inclinacao is not None else None,
+        "ultima": estado.ultima,
+        "faixa": None, "no_ideal": None, "previsao": None,
+    }
+    if altura_m:
+        minimo, maximo = faixa_ideal(altura_m)
+        r.update(faixa=(round(minimo, 1), round(maximo, 1)),
+                 no_ideal=estado.no_ideal(altura_m),
+                 previsao=estado.previsao(altura_m))
+    return r
+
+
+# ------------------- BANCO -------------------
+
+def _salvo(conn, user_id):
+    row = conn.execute("SELECT * FROM weight_trend WHERE user_id=?", (user_id,)).fetchone()
+    return Estado(user_id, row) if row else None
+
+
+def salvar(conn, estado):
+    conn.execute(f"""
+        INSERT OR REPLACE INTO weight_trend (user_id, {", ".join(COLUNAS)})
+        VALUES ({", ".join("?" * (len(COLUNAS) + 1))})
+    """, [estado.user_id] + [getattr(estado, c) for c in COLUNAS])
+
+
+def calcular(conn, user_id):
+    """Estado direto do histórico (uma leitura pelo índice)."""
+    rows = conn.execute(
+        "SELECT weight_kg, log_date FROM weight_log WHERE user_id=? AND weight_kg IS NOT NULL "
+        "ORDER BY log_date", (user_id,)
+    ).fetchall()
+    estado = Estado(user_id)
+    if not rows:
+        return estado
+    ultima = _data(rows[-1][1])
+    estado.n = len(rows)
+    estado.primeira, estado.ultima = _texto(_data(rows[0][1])), _texto(ultima)
+    estado.ultimo_kg = rows[-1][0]
+    for kg, log_date in rows:
+        idade = _dias(ultima, _data(log_date))
+        for dias in JANELAS:
+            if idade < dias:
+                setattr(estado, f"n{dias}", getattr(estado, f"n{dias}") + 1)
+                setattr(estado, f"s{dias}", getattr(estado, f"s{dias}") + kg)
+        estado._somar(kg, idade)
+    return estado
+
+
+def recalcular(conn, user_id):
+    """Refaz o estado do jogador (depois de importação em lote). Não faz commit."""
+    estado = calcular(conn, user_id)
+    salvar(conn, estado)
+    return estado
+
+
+def registrar(conn, user_id, kg, log_date, estado=None):
+    """Chamar logo depois do INSERT em weight_log, na mesma transação.
+
+    O(1): uma leitura do estado (ou o `estado` já lido, que é atualizado)
+    e, se a janela andar, uma soma pelo índice do que saiu dela. Retorna o
+    Estado novo. Não faz commit.
+    """
+    estado = estado or _salvo(conn, user_id)
+    if estado is None:
+        return recalcular(conn, user_id)   # estado ainda não montado
+
+    def saiu_da_janela(de, ate):
+        return conn.execute("""
+            SELECT COUNT(*), COALESCE(SUM(weight_kg), 0) FROM weight_log
+            WHERE user_id=? AND log_date > ? AND log_date <= ? AND weight_kg IS NOT NULL
+        """, (user_id, de, ate)).fetchone()
+
+    estado.incluir(float(kg), _data(log_date), saiu_da_janela)
+    salvar(conn, estado)
+    return estado
+
+
+def ler(conn, user_id):
+    """Estado salvo do jogador (só leitura). Sem linha ainda — jogador que
+    nunca se pesou —, calcula na hora (n=0) sem gravar nada."""
+    return _salvo(conn, user_id) or calcular(conn, user_id)
+
+
+def divergencias(conn, tolerancia=1e-6):
+    """[(user_id, coluna, salvo, real)] do estado que não bate com o histórico."""
+    erradas = []
+    usuarios = [r[0] for r in conn.execute("SELECT user_id FROM weight_trend")]
+    for user_id in usuarios:
+        salvo, real = _salvo(conn, user_id), calcular(conn, user_id)
+        for c in COLUNAS:
+            a, b = getattr(salvo, c), getattr(real, c)
+            if isinstance(b, str):
+                if a != b:
+                    erradas.append((user_id, c, a, b))
+            elif abs(a - b) > tolerancia * max(1.0, abs(b)):
+                erradas.append((user_id, c, a, b))
+    return erradas
+
+
+def init_app(app):
+    @app.cli.command("check-trends")
+    def check_trends_command():
+        """Confere weight_trend contra o histórico de peso e refaz quem divergir."""
+        db.preparar()
+        conn = db.connect(app.config["DATABASE"])
+        try:
+            erradas = divergencias(conn)
+            for user_id, coluna, salvo, real in erradas:
+                print(f"⚠️ usuário {user_id} / {coluna}: salvo {salvo}, real {real}")
+            if erradas:
+                conn.execute("BEGIN IMMEDIATE")
+                for user_id in {e[0] for e in erradas}:
+                    recalcular(conn, user_id)
+                conn.commit()
+                print(f"🔧 {len({e[0] for e in erradas})} jogadores com tendência divergente — recalculados.")
+                sys.exit(1)
+            print("✅ Tendências de peso consistentes.")
+        finally:
+            conn.close()
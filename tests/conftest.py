@@ -0,0 +1,74 @@
+# tests/conftest.py
+# Fixtures comuns: app com banco temporário (migrado), cliente e o limite de
+# statements por rota do sql_trace.
+#
+#     python -m pytest -q
+import os
+from contextlib import contextmanager
+
+# Antes de importar o app: senha na própria thread (sem pool de processos)
+# e um hash barato — os testes não medem custo de senha
+os.environ.setdefault("PASSWORD_POOL", "0")
+os.environ.setdefault("PASSWORD_METHOD", "pbkdf2:sha256:1000")
+
+import pytest
+
+import db
+import sql_trace
+from varzea_trainer_flask import create_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App apontando para um banco novo em tmp_path, já migrado."""
+    app = create_app({"DATABASE": str(tmp_path / "varzea.db"), "TESTING": True})
+    with app.app_context():
+        db.get_db()
+    yield app
+    db.close_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def conn(app):
+    """Conexão avulsa no banco do app (fora do pool das rotas)."""
+    conn = db.connect(app.config["DATABASE"])
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def limite_consultas():
+    """with limite_consultas("post", "/checkin"): ... — falha se o bloco passar
+    do limite de sql_trace.LIMITES para a rota ou repetir consultas (N+1)."""
+    @contextmanager
+    def medir(metodo, caminho):
+        rota = caminho.split("?", 1)[0]
+        limite = sql_trace.LIMITES.get((metodo.upper(), rota), sql_trace.LIMITE_PADRAO)
+        with sql_trace.contar_consultas() as c:
+            yield c
+        assert c.total <= limite, f"{metodo.upper()} {rota}: {c.total} statements (limite {limite})"
+        assert not c.repetidas(), f"{metodo.upper()} {rota}: N+1? {c.repetidas()}"
+    return medir
+
+
+def cadastrar(client, nome="Jogador", email="jogador@teste.com", senha="123"):
+    """Cadastra e faz login (mesmos campos dos formulários)."""
+    client.post("/register", data={"name": nome, "email": email, "password": senha})
+    client.post("/login", data={"email": email, "password": senha})
+
+
+def usuario(conn, email="jogador@teste.com"):
+    return conn.execute("SELECT id FROM users WHERE email=?", (email,)).fetchone()[0]
+
+
+def criar_usuario(conn, email="jogador@teste.com", nome="Jogador"):
+    """Usuário direto no banco (sem passar pelo hash de senha) -> id."""
+    user_id = conn.execute("INSERT INTO users (name, email, password_hash) VALUES (?, ?, 'x')",
+                           (nome, email)).lastrowid
+    conn.commit()
+    return user_id
@@ -0,0 +1,52 @@
+import pytest
+
+import assets
+
+MANIFEST = {"capa.png": {"largura": 1050, "altura": 700, "variantes": [
+    {"arquivo": f"capa-{w}.h{w}.{fmt}", "largura": w, "formato": fmt, "mime": mime, "bytes": 1}
+    for w in (480, 960) for fmt, mime, _ in assets.FORMATOS
+]}}
+
+
+@pytest.fixture
+def manifest(monkeypatch):
+    monkeypatch.setattr(assets, "carregar_manifest", lambda: MANIFEST)
+
+
+def test_sem_manifest_cai_no_original(app, monkeypatch):
+    monkeypatch.setattr(assets, "carregar_manifest", lambda: {})
+    with app.test_request_context():
+        assert assets.asset_url("capa.png") == "/static/capa.png"
+        assert assets.asset_background("body", "capa.png") == \
+            'body { background-image: url("/static/capa.png"); }'
+
+
+def test_asset_url_escolhe_a_menor_que_cobre(app, manifest):
+    with app.test_request_context():
+        assert assets.asset_url("capa.png", 500) == "/assets/capa-960.h960.jpg"
+        assert assets.asset_url("capa.png", 4000) == "/assets/capa-960.h960.jpg"
+        assert assets.asset_url("capa.png", 100, "webp") == "/assets/capa-480.h480.webp"
+        assert assets.asset_srcset("capa.png") == \
+            "/assets/capa-480.h480.webp 480w, /assets/capa-960.h960.webp 960w"
+
+
+def test_background_mobile_first_com_image_set(app, manifest):
+    with app.test_request_context():
+        padrao, maior = assets.asset_background("body", "capa.png").split("\n")
+    assert padrao.startswith('body { background-image: url("/assets/capa-480.h480.jpg"); ')
+    assert 'url("/assets/capa-480.h480.avif") type("image/avif")' in padrao
+    assert maior.startswith("@media (min-width: 481px) { body {")
+    assert "capa-960.h960.webp" in maior
+
+
+@pytest.mark.parametrize("pagina", ["/login", "/register", "/forgot"])
+def test_paginas_de_login_usam_o_fundo_otimizado(client, manifest, pagina):
+    html = client.get(pagina).get_data(as_text=True)
+    assert "/assets/capa-480.h480.jpg" in html
+
+
+def test_variantes_com_cache_imutavel(client):
+    arquivo = next(iter(assets.carregar_manifest()["capa.png"]["variantes"]))["arquivo"]
+    resp = client.get(f"/assets/{arquivo}")
+    assert resp.status_code == 200
+    assert resp.headers["Cache-Control"] == f"public, max-age={assets.UM_ANO}, immutable"
@@ -0,0 +1,112 @@
+import os
+import sqlite3
+
+import pytest
+
+import backup
+import db
+from tests.conftest import criar_usuario
+
+
+def test_varint():
+    assert backup._varint(b"\x05", 0) == (5, 1)
+    assert backup._varint(b"\x81\x00", 0) == (128, 2)
+    assert backup._varint(b"\xff" * 8 + b"\x01", 0) == ((1 << 64) - 255, 9)
+
+
+def test_registro():
+    # cabeçalho: tamanho 4, int8, NULL, texto de 2 bytes (12 + 2*2 + 1 = 17)
+    payload = bytes([4, 1, 0, 17]) + b"\xfe" + b"oi"
+    assert backup._registro(payload, "utf-8") == [-2, None, "oi"]
+    with pytest.raises(ValueError):
+        backup._registro(bytes([4, 1, 0, 17]) + b"\xfe", "utf-8")   # truncado
+
+
+def test_paginas_le_como_o_sqlite(tmp_path):
+    caminho = str(tmp_path / "x.db")
+    conn = sqlite3.connect(caminho)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, a TEXT, b REAL, c BLOB)")
+    linhas = [(i, "x" * (i % 7) * 1000, i / 3, bytes([i % 256]) * 3) for i in range(1, 400)]
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?, ?)", linhas)   # com páginas de overflow
+    conn.commit()
+    raiz = conn.execute("SELECT rootpage FROM sqlite_master WHERE name='t'").fetchone()[0]
+    conn.close()
+
+    paginas = backup.Paginas(caminho)
+    try:
+        stats = backup._novas_stats()
+        lidas = [(rowid, *valores[1:]) for rowid, valores in paginas.linhas(raiz, stats)]
+    finally:
+        paginas.fechar()
+    assert lidas == linhas
+    assert stats["paginas_ruins"] == stats["celulas_ruins"] == 0
+
+
+def test_arquivo_que_nao_e_sqlite(tmp_path):
+    caminho = tmp_path / "lixo.db"
+    caminho.write_bytes(b"nada a ver" * 100)
+    with pytest.raises(backup.ArquivoCorrompido):
+        backup.Paginas(str(caminho))
+
+
+def _corromper_folha(caminho, tabela):
+    """Estraga a 1ª folha da árvore de `tabela` -> nº da página."""
+    conn = sqlite3.connect(caminho)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    raiz = conn.execute("SELECT rootpage FROM sqlite_master WHERE name=?", (tabela,)).fetchone()[0]
+    tamanho = conn.execute("PRAGMA page_size").fetchone()[0]
+    conn.close()
+    with open(caminho, "r+b") as f:
+        f.seek((raiz - 1) * tamanho)
+        pag = f.read(tamanho)
+        assert pag[0] == 0x05, "tabela pequena demais para ter página interior"
+        i = int.from_bytes(pag[12:14], "big")
+        folha = int.from_bytes(pag[i:i + 4], "big")
+        f.seek((folha - 1) * tamanho)
+        f.write(b"\xff" * tamanho)
+    return folha
+
+
+def test_salvar_recupera_o_resto_e_refaz_derivadas(app, conn, tmp_path):
+    user_id = criar_usuario(conn)
+    conn.executemany("INSERT INTO checkins (user_id, treino, plano, created_at) VALUES (?, ?, 'amador', ?)",
+                     [(user_id, f"treino {i} " + "x" * 200, f"2024-01-01 10:{i // 60:02d}:{i % 60:02d}")
+                      for i in range(600)])
+    conn.commit()
+    conn.close()
+    db.close_all()
+    origem = app.config["DATABASE"]
+    _corromper_folha(origem, "checkins")
+
+    destino = str(tmp_path / "salvo.db")
+    relatorio = backup.salvar(origem, destino, verbose=False)
+    assert relatorio["checkins"]["paginas_ruins"] == 1
+    assert 0 < relatorio["checkins"]["gravadas"] < 600
+    assert relatorio["users"]["gravadas"] == 1
+
+    novo = db.connect(destino)
+    try:
+        recuperados = novo.execute("SELECT COUNT(*) FROM checkins").fetchone()[0]
+        assert recuperados == relatorio["checkins"]["gravadas"]
+        # Contador refeito a partir do que voltou, não copiado do original
+        assert novo.execute("SELECT feitos FROM user_progress WHERE user_id=?",
+                            (user_id,)).fetchone()[0] == recuperados
+    finally:
+        novo.close()
+    with pytest.raises(FileExistsError):
+        backup.salvar(origem, destino, verbose=False)
+
+
+def test_backup_e_rotacao(app, conn, tmp_path):
+    criar_usuario(conn)
+    pasta = str(tmp_path / "backups")
+    os.makedirs(pasta)
+    for i in range(3):
+        open(os.path.join(pasta, f"varzea-2000010{i}-000000.db"), "w").close()
+    stats = backup.fazer_backup(app.config["DATABASE"], pasta, manter=2)
+    assert len(stats["apagados"]) == 2
+    assert sorted(os.listdir(pasta))[-1] == os.path.basename(stats["destino"])
+    assert backup.verificar(stats["destino"]) == []
+    copia = sqlite3.connect(stats["destino"])
+    assert copia.execute("SELECT email FROM users").fetchall() == [("jogador@teste.com",)]
+    copia.close()
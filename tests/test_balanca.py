@@ -0,0 +1,117 @@
+import io
+
+import pytest
+
+import balanca
+import regional
+from tests.conftest import criar_usuario
+
+SP = regional.fuso("America/Sao_Paulo")
+
+
+def _ler(texto, **kw):
+    return list(balanca.ler(io.StringIO(texto), kw.pop("tz", SP), **kw))
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("72,5", 72.5), ("72.5", 72.5), ("1.234,5", 1234.5), ("1,234.5", 1234.5), (" 80 ", 80.0),
+])
+def test_numero(texto, esperado):
+    assert regional.numero(texto) == esperado
+
+
+def test_fuso_desconhecido():
+    assert regional.fuso("UTC") is regional.fuso("Z")
+    with pytest.raises(ValueError, match="fuso horário desconhecido"):
+        regional.fuso("Marte/Olympus")
+
+
+@pytest.mark.parametrize("valor, unidade, kg", [
+    ("80,5", "kg", 80.5),
+    ("176.4 lbs", "kg", 80.01),   # unidade do valor vence a padrão
+    ("176.4", "lb", 80.01),
+    ("12,6 st", "kg", 80.01),
+    ("80500g", "kg", 80.5),
+])
+def test_peso_kg(valor, unidade, kg):
+    assert balanca.peso_kg(valor, unidade) == kg
+
+
+@pytest.mark.parametrize("valor, erro", [
+    ("oitenta", "peso inválido"),
+    ("80 oz", "unidade desconhecida"),
+    ("5", "fora da faixa"),
+    ("400", "fora da faixa"),
+])
+def test_peso_kg_recusado(valor, erro):
+    with pytest.raises(ValueError, match=erro):
+        balanca.peso_kg(valor)
+
+
+@pytest.mark.parametrize("separador", [",", ";", "\t", "|"])
+def test_separador_detectado(separador):
+    texto = f"Date{separador}Weight\n2024-01-02 08:00{separador}80\n"
+    assert _ler(texto) == [(2, "2024-01-02 08:00:00", 80.0, None)]
+
+
+def test_sep_do_excel_e_virgula_decimal():
+    texto = 'sep=;\nData;Hora;Peso (kg)\n02/01/2024;07:30;"80,4"\n'
+    assert [linha[1:] for linha in _ler(texto)] == [("2024-01-02 07:30:00", 80.4, None)]
+
+
+def test_formatos_de_data():
+    texto = ("Timestamp,Weight\n"
+             "2024-01-02T12:00:00+00:00,80\n"   # ISO com fuso -> hora de São Paulo
+             "1704283200,80\n"                  # epoch em segundos (2024-01-03 12:00 UTC)
+             "1704369600000,80\n"               # epoch em milissegundos
+             "05/01/2024 08:15,80\n")           # dd/mm/aaaa
+    assert [d for _, d, _, _ in _ler(texto)] == [
+        "2024-01-02 09:00:00", "2024-01-03 09:00:00",
+        "2024-01-04 09:00:00", "2024-01-05 08:15:00",
+    ]
+
+
+def test_mes_primeiro():
+    texto = "Date,Weight\n01/05/2024,80\n"
+    assert _ler(texto)[0][1] == "2024-05-01 00:00:00"
+    assert _ler(texto, dia_primeiro=False)[0][1] == "2024-01-05 00:00:00"
+
+
+def test_unidade_no_nome_e_na_coluna():
+    assert _ler("Date,Weight (lb)\n2024-01-02,176.4\n")[0][2] == 80.01
+    texto = "Date,Weight,Unit\n2024-01-02,176.4,lb\n2024-01-03,80,kg\n2024-01-04,80,oz\n"
+    linhas = _ler(texto)
+    assert [kg for _, _, kg, _ in linhas[:2]] == [80.01, 80.0]
+    assert linhas[2] == (4, None, None, "unidade desconhecida: oz")
+    # Padrão do --unidade quando o arquivo não diz
+    assert _ler("Date,Weight\n2024-01-02,176.4\n", unidade="lb")[0][2] == 80.01
+
+
+def test_linhas_puladas_e_recusadas():
+    texto = "Date,Weight\n2024-01-02,\n2024-01-03,-\nontem,80\n2024-01-05,5\n"
+    linhas = _ler(texto)
+    assert [(n, motivo is not None) for n, _, _, motivo in linhas] == [(4, True), (5, True)]
+    assert "data inválida" in linhas[0][3]
+
+
+def test_cabecalho_sem_peso():
+    with pytest.raises(ValueError, match="coluna de data"):
+        _ler("Date,Gordura\n2024-01-02,20\n")
+
+
+def test_importar_ignora_repetidos(conn, monkeypatch):
+    monkeypatch.setattr(balanca, "PAUSA", 0)
+    user_id = criar_usuario(conn)
+    texto = ("Date,Weight\n" + "".join(f"2024-01-{d:02d} 08:00,{80 - d / 10}\n" for d in range(1, 11))
+             + "2024-01-01 08:00,80\nontem,80\n")
+
+    resumo = balanca.importar(conn, user_id, _ler(texto), lote=3)
+    assert (resumo["lidas"], resumo["gravadas"], resumo["repetidas"], resumo["rejeitadas"]) == (12, 10, 1, 1)
+    assert resumo["erros"] == ["linha 13: data inválida: 'ontem'"]
+    assert conn.execute("SELECT COUNT(*) FROM weight_log WHERE user_id=?", (user_id,)).fetchone()[0] == 10
+    # Tendência refeita no fim, com o último peso do histórico
+    assert conn.execute("SELECT ultimo_kg FROM weight_trend WHERE user_id=?", (user_id,)).fetchone()[0] == 79.0
+
+    resumo = balanca.importar(conn, user_id, _ler(texto), lote=3)
+    assert (resumo["gravadas"], resumo["repetidas"]) == (0, 11)
+    assert conn.execute("SELECT COUNT(*) FROM weight_log WHERE user_id=?", (user_id,)).fetchone()[0] == 10
@@ -0,0 +1,48 @@
+import gzip
+
+import pytest
+
+import cache_paginas
+from tests.conftest import cadastrar
+
+
+@pytest.fixture(autouse=True)
+def _limpar():
+    cache_paginas.limpar()
+    yield
+    cache_paginas.limpar()
+
+
+def test_etag_e_304(client):
+    resp = client.get("/dieta")
+    assert resp.status_code == 200
+    assert resp.headers["Cache-Control"] == "private, no-cache"
+    etag = resp.headers["ETag"]
+
+    de_novo = client.get("/dieta", headers={"If-None-Match": etag})
+    assert de_novo.status_code == 304 and de_novo.data == b""
+    assert client.get("/dieta", headers={"If-None-Match": '"outro"'}).status_code == 200
+
+
+def test_gzip_tem_etag_proprio(client):
+    simples = client.get("/dieta")
+    comprimida = client.get("/dieta", headers={"Accept-Encoding": "gzip"})
+    assert comprimida.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in comprimida.headers["Vary"]
+    assert gzip.decompress(comprimida.data) == simples.data
+    assert comprimida.headers["ETag"] != simples.headers["ETag"]
+
+
+def test_view_roda_uma_vez(client, monkeypatch):
+    cadastrar(client)
+    client.get("/pre_jogo")
+    chamadas = []
+    original = cache_paginas._montar
+    monkeypatch.setattr(cache_paginas, "_montar", lambda *a: chamadas.append(a) or original(*a))
+    for _ in range(3):
+        assert client.get("/pre_jogo").status_code == 200
+    assert chamadas == []
+
+
+def test_login_vem_antes_do_cache(client):
+    assert client.get("/recuperacao").status_code == 302
@@ -0,0 +1,27 @@
+import carga
+
+
+def test_percentil_nearest_rank():
+    valores = [float(i) for i in range(1, 101)]
+    assert carga._percentil(valores, 50) == 50.0
+    assert carga._percentil(valores, 99) == 99.0
+    assert carga._percentil([0.2], 95) == 0.2
+    assert carga._percentil([], 50) == 0.0
+
+
+def test_resumo_conta_erros_e_5xx():
+    r = carga._resumo([0.01, 0.02, 0.03, 0.04], {200: 2, 503: 1, "erro": 1}, duracao=2)
+    assert (r["requisicoes"], r["req_s"], r["erros"]) == (4, 2.0, 2)
+    assert r["p50_ms"] == 20.0
+    assert r["status"] == {"200": 2, "503": 1, "erro": 1}
+
+
+def test_rodar_com_test_client(app):
+    jornadas = {"peso": carga.JORNADAS["peso"]}
+    relatorio = carga.rodar(lambda: carga._ClienteFlask(app), vus=2, duracao=0.3, jornadas=jornadas)
+    assert relatorio["vus"] == 2
+    assert relatorio["total"]["erros"] == 0
+    assert relatorio["rotas"]["POST /register"]["requisicoes"] == 2
+    assert "POST /peso_diario" in relatorio["rotas"]
+    linhas = carga.tabela(relatorio).splitlines()
+    assert linhas[-1].startswith("TOTAL")
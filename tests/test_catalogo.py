@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+import catalogo
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    """Escreve um catálogo em tmp_path; o original volta no fim do teste."""
+    def escrever(dados):
+        caminho = tmp_path / "catalogo.json"
+        caminho.write_text(json.dumps(dados), encoding="utf-8")
+        return str(caminho)
+    yield escrever
+    catalogo.carregar()
+
+
+def _dia(titulo):
+    return {"titulo": titulo, "exercicios": ["a", "b"]}
+
+
+def test_catalogo_do_app():
+    assert {"amador", "semi_pro"} <= set(catalogo.programas("checkin"))
+    assert "amador" not in catalogo.programas("ciclo")
+    t = catalogo.treino("amador", 1)
+    assert (t.programa, t.id) == ("amador", 1)
+    assert isinstance(t.exercicios, tuple)
+    assert catalogo.treino("amador", 0) is None
+    assert catalogo.treino("amador", catalogo.total("amador") + 1) is None
+
+
+def test_carregar_arquivo(arquivo):
+    catalogo.carregar(arquivo({"versao": 1, "programas": [
+        {"nome": "x", "tipo": "checkin", "dias": [_dia("um"), _dia("dois")]},
+        {"nome": "y", "dias": [_dia("só")]},
+    ]}))
+    assert catalogo.programas() == ["x", "y"]
+    assert catalogo.programas("ciclo") == ["y"]
+    assert catalogo.total("x") == 2
+    assert catalogo.treino("x", 2).titulo == "dois"
+    assert catalogo.treino("x", 2).descricao == ""
+
+
+@pytest.mark.parametrize("dados, erro", [
+    ({"versao": 2, "programas": []}, "versão"),
+    ({"versao": 1, "programas": [{"nome": "x", "dias": [_dia("a")]},
+                                 {"nome": "x", "dias": [_dia("b")]}]}, "repetido"),
+    ({"versao": 1, "programas": [{"nome": "x", "dias": []}]}, "sem dias"),
+])
+def test_catalogo_invalido_nao_substitui_o_atual(arquivo, dados, erro):
+    antes = catalogo.programas()
+    with pytest.raises(ValueError, match=erro):
+        catalogo.carregar(arquivo(dados))
+    assert catalogo.programas() == antes
@@ -0,0 +1,47 @@
+import pytest
+
+import checkins
+from tests.conftest import cadastrar, criar_usuario, usuario
+
+
+def test_cursor_ida_e_volta():
+    cursor = checkins.codificar_cursor("2024-05-01 10:00:00", 42)
+    assert "=" not in cursor
+    assert checkins.decodificar_cursor(cursor) == ("2024-05-01 10:00:00", 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "***", "c2VtLWJhcnJh", checkins.codificar_cursor("x", "y")])
+def test_cursor_invalido(cursor):
+    with pytest.raises(ValueError):
+        checkins.decodificar_cursor(cursor)
+
+
+def test_paginas_cobrem_tudo_sem_repetir(conn):
+    user_id = criar_usuario(conn)
+    # Vários no mesmo segundo: o id desempata
+    conn.executemany("INSERT INTO checkins (user_id, treino, plano, created_at) VALUES (?, ?, 'avulso', ?)",
+                     [(user_id, f"t{i}", f"2024-01-{1 + i // 3:02d} 10:00:00") for i in range(11)])
+    conn.commit()
+    vistos, cursor = [], None
+    while True:
+        rows, cursor = checkins.pagina(conn, user_id, cursor, limite=4)
+        vistos += [r["id"] for r in rows]
+        if cursor is None:
+            break
+    esperado = [r[0] for r in conn.execute(
+        "SELECT id FROM checkins ORDER BY created_at DESC, id DESC")]
+    assert vistos == esperado and len(vistos) == 11
+
+
+def test_api_checkins(client, conn):
+    assert client.get("/api/checkins").status_code == 401
+    cadastrar(client)
+    for _ in range(3):
+        conn.execute("INSERT INTO checkins (user_id, treino, plano) VALUES (?, 'livre', 'avulso')",
+                     (usuario(conn),))
+    conn.commit()
+    primeira = client.get("/api/checkins?limite=2").get_json()
+    assert len(primeira["treino"]) == 2 and primeira["proximo"]
+    resto = client.get(f"/api/checkins?limite=2&cursor={primeira['proximo']}").get_json()
+    assert len(resto["treino"]) == 1 and resto["proximo"] is None
+    assert client.get("/api/checkins?cursor=***").status_code == 400
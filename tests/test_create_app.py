@@ -0,0 +1,34 @@
+import os
+
+import db
+import import_budget
+from varzea_trainer_flask import create_app
+
+
+def test_create_app_nao_abre_o_banco(tmp_path):
+    caminho = tmp_path / "lazy.db"
+    app = create_app({"DATABASE": str(caminho)})
+    assert not caminho.exists()
+
+    assert app.test_client().get("/login").status_code == 200
+    assert not caminho.exists()   # página sem banco
+
+    app.test_client().post("/login", data={"email": "x@x.com", "password": "1"})
+    assert caminho.exists()
+    db.close_all()
+
+
+def test_importar_o_modulo_e_leve():
+    # Sem o orçamento em ms (depende da máquina): só os efeitos colaterais
+    _, proibidos, criou_banco = import_budget.medir(rodadas=1)
+    assert proibidos == []
+    assert not criou_banco
+
+
+def test_varios_apps_no_mesmo_processo(tmp_path):
+    a = create_app({"DATABASE": os.fspath(tmp_path / "a.db")})
+    b = create_app({"DATABASE": os.fspath(tmp_path / "b.db")})
+    for app in (a, b):
+        app.test_client().post("/register", data={"name": "J", "email": "j@x.com", "password": "1"})
+    assert (tmp_path / "a.db").exists() and (tmp_path / "b.db").exists()
+    db.close_all()
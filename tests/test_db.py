@@ -0,0 +1,57 @@
+import threading
+
+import db
+
+
+def test_connect_configura_pragmas(tmp_path):
+    conn = db.connect(str(tmp_path / "x.db"))
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == db.BUSY_TIMEOUT_MS
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1   # NORMAL
+        assert conn.execute("SELECT 1 AS um").fetchone()["um"] == 1   # sqlite3.Row
+    finally:
+        conn.close()
+
+
+def test_get_db_reaproveita_conexao_da_thread(app):
+    with app.app_context():
+        primeira = db.get_db()
+    with app.app_context():
+        assert db.get_db() is primeira
+
+    outra = []
+
+    def em_outra_thread():
+        with app.app_context():
+            outra.append(db.get_db())
+            db.close_all()
+
+    t = threading.Thread(target=em_outra_thread)
+    t.start()
+    t.join()
+    assert outra[0] is not primeira
+
+
+def test_teardown_desfaz_transacao_pendente(app, conn):
+    with app.app_context():
+        db.get_db().execute("INSERT INTO users (name, email, password_hash) VALUES ('a', 'a@x', 'h')")
+    # A conexão voltou ao pool sem commit: nada foi gravado
+    assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+    with app.app_context():
+        assert not db.get_db().in_transaction
+
+
+def test_observadores(conn):
+    vistos = []
+
+    def fn(sql, segundos, novo):
+        vistos.append((sql, novo))
+
+    db.observar(fn)
+    try:
+        conn.execute("SELECT 1").fetchall()
+    finally:
+        db.esquecer(fn)
+    conn.execute("SELECT 2")
+    assert vistos == [("SELECT 1", True), ("SELECT 1", False)]
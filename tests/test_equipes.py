@@ -0,0 +1,119 @@
+from datetime import date
+
+import pytest
+
+import equipes
+from tests.conftest import cadastrar, criar_usuario, usuario
+
+
+@pytest.fixture
+def equipe(conn):
+    """(team_id, técnico, jogador já aceito, convidado pendente)."""
+    tecnico = criar_usuario(conn, "tecnico@teste.com", "Técnico")
+    jogador = criar_usuario(conn, "jogador@teste.com", "Jogador")
+    convidado = criar_usuario(conn, "convidado@teste.com", "Convidado")
+    team_id = equipes.criar(conn, "Várzea FC", tecnico)
+    equipes.incluir(conn, team_id, ["jogador@teste.com"])
+    equipes.incluir(conn, team_id, ["convidado@teste.com"], convite=True)
+    return team_id, tecnico, jogador, convidado
+
+
+def test_so_o_tecnico_ve_o_painel(conn, equipe):
+    team_id, tecnico, jogador, convidado = equipe
+    assert [j["nome"] for j in equipes.painel(conn, team_id, tecnico)["jogadores"]] == ["Jogador"]
+    for outro in (jogador, convidado):
+        with pytest.raises(equipes.SemAcesso):
+            equipes.painel(conn, team_id, outro)
+    assert equipes.painel(conn, 999, tecnico) is None
+    assert equipes.papel(conn, team_id, convidado) is None
+    assert equipes.papel(conn, team_id, jogador) == "jogador"
+
+
+def test_convite_aceito_e_recusado(conn, equipe):
+    team_id, tecnico, _, convidado = equipe
+    assert [tuple(r) for r in equipes.do_usuario(conn, convidado)] == [(team_id, "Várzea FC", "jogador", None, 1)]
+    # Plano indicado não chega a quem ainda não aceitou
+    assert equipes.indicar_plano(conn, team_id, "amador") == 1
+
+    assert equipes.responder(conn, team_id, convidado, aceitar=True)
+    assert not equipes.responder(conn, team_id, convidado, aceitar=True)   # já aceito
+    nomes = [j["nome"] for j in equipes.painel(conn, team_id, tecnico)["jogadores"]]
+    assert nomes == ["Convidado", "Jogador"]
+
+    outro = criar_usuario(conn, "outro@teste.com", "Outro")
+    equipes.incluir(conn, team_id, ["outro@teste.com"], convite=True)
+    assert equipes.responder(conn, team_id, outro, aceitar=False)
+    assert equipes.do_usuario(conn, outro) == []
+
+
+def test_rotas_de_convite(client, conn):
+    cadastrar(client, "Técnico", "tecnico@teste.com")
+    client.post("/equipe/nova", data={"nome": "Várzea FC"})
+    cadastrar(client, "Jogador", "jogador@teste.com")
+
+    # Jogador de fora: nem painel nem convite para responder
+    assert client.get("/equipe/1").status_code == 403
+    assert client.get("/equipe/2").status_code == 404
+    assert client.post("/equipe/1/convite", data={"acao": "aceitar"}).status_code == 404
+
+    client.post("/login", data={"email": "tecnico@teste.com", "password": "123"})
+    respostas = []
+    for email in ("jogador@teste.com", "sem@cadastro.com"):
+        client.get("/equipe/1")   # consome os avisos anteriores
+        respostas.append(client.post("/equipe/1/jogadores", data={"emails": email},
+                                     follow_redirects=True).get_data(as_text=True))
+    # A mesma resposta com e sem cadastro
+    assert respostas[0] == respostas[1] and "Convites enviados" in respostas[0]
+
+    client.post("/login", data={"email": "jogador@teste.com", "password": "123"})
+    assert "Aceitar" in client.get("/dashboard").get_data(as_text=True)
+    assert client.post("/equipe/1/convite", data={"acao": "aceitar"}).status_code == 302
+    assert client.get("/equipe/1").status_code == 403   # jogador, não técnico
+
+    client.post("/login", data={"email": "tecnico@teste.com", "password": "123"})
+    dados = client.get("/api/equipe/1").get_json()
+    assert [j["user_id"] for j in dados["jogadores"]] == [usuario(conn, "jogador@teste.com")]
+
+
+def test_ultimo_treino_sobrevive_ao_reinicio(conn, equipe):
+    team_id, tecnico, jogador, _ = equipe
+    conn.execute("INSERT INTO checkin_dias (user_id, dia) VALUES (?, '2024-03-05')", (jogador,))
+    # 02:00 UTC ainda é o dia anterior em São Paulo
+    conn.execute("INSERT INTO program_progress (user_id, program, day, created_at) "
+                 "VALUES (?, 'forca', 1, '2024-03-10 02:00:00')", (jogador,))
+    conn.commit()
+    (j,) = equipes.painel(conn, team_id, tecnico)["jogadores"]
+    assert j["treinou_em"] == "2024-03-09"
+
+    # Reinício do ciclo apaga program_progress e checkins; o painel
+    # remontado continua com o último treino
+    conn.execute("DELETE FROM program_progress WHERE user_id=?", (jogador,))
+    conn.execute("DELETE FROM checkins WHERE user_id=?", (jogador,))
+    conn.execute("DELETE FROM equipe_cache")
+    conn.commit()
+    (j,) = equipes.painel(conn, team_id, tecnico)["jogadores"]
+    assert j["treinou_em"] == "2024-03-09"
+
+
+def test_treino_novo_apaga_o_painel(conn, equipe):
+    team_id, tecnico, jogador, _ = equipe
+    equipes.painel(conn, team_id, tecnico)
+    assert conn.execute("SELECT COUNT(*) FROM equipe_cache").fetchone()[0] == 1
+    conn.execute("INSERT INTO checkin_dias (user_id, dia) VALUES (?, '2024-03-05')", (jogador,))
+    conn.commit()
+    assert conn.execute("SELECT COUNT(*) FROM equipe_cache").fetchone()[0] == 0
+
+
+def test_resumo_conta_dias_sem_treino():
+    progresso = {nome: {"feitos": 0, "total": total, "pct": 50} for nome, total in equipes.planos()}
+    jogadores = [
+        {"treinou_em": "2024-03-09", "progresso": progresso},
+        {"treinou_em": "2024-03-01", "progresso": progresso},
+        {"treinou_em": None, "progresso": progresso},
+        {"treinou_em": "inválido", "progresso": progresso},
+    ]
+    r = equipes.resumo(jogadores, hoje=date(2024, 3, 10))
+    assert [j["dias_sem_treino"] for j in jogadores] == [1, 9, None, None]
+    assert (r["jogadores"], r["ativos"]) == (4, 1)
+    assert set(r["media_pct"].values()) == {50}
+    assert equipes.resumo([], hoje=date(2024, 3, 10))["ativos"] == 0
@@ -0,0 +1,84 @@
+import pytest
+
+import evolucao
+from tests.conftest import cadastrar, criar_usuario, usuario
+
+
+def _medir(conn, user_id, created_at, **medidas):
+    colunas = ", ".join(medidas)
+    conn.execute(f"INSERT INTO body_measures (user_id, created_at, {colunas}) "
+                 f"VALUES (?, ?, {', '.join('?' * len(medidas))})",
+                 [user_id, created_at, *medidas.values()])
+    conn.commit()
+
+
+def _campo(resumo, nome):
+    return next((c for c in resumo["campos"] if c["campo"] == nome), None)
+
+
+def test_por_semana_usa_todas_as_medicoes():
+    col = evolucao._Coluna()
+    # Reta exata: -2 por semana
+    col.t, col.valores = [0, 7, 14, 21], [100.0, 98.0, 96.0, 94.0]
+    assert col.por_semana() == pytest.approx(-2.0)
+    # Meio baixo: a reta usa todas as medições (as pontas dariam -2)
+    col.t, col.valores = [0, 7, 14, 21], [100.0, 90.0, 90.0, 94.0]
+    assert col.por_semana() == pytest.approx(-1.8)
+    # Uma medição só, ou todas no mesmo dia: sem ritmo
+    col.t, col.valores = [3], [80.0]
+    assert col.por_semana() is None
+    col.t, col.valores = [3, 3.5], [80.0, 81.0]
+    assert col.por_semana() is None
+
+
+def test_resumo_ignora_nao_medido(conn):
+    user_id = criar_usuario(conn)
+    _medir(conn, user_id, "2024-01-01 10:00:00", barriga=100, peito="")
+    _medir(conn, user_id, "2024-01-08 10:00:00", barriga=None, peito=105)
+    _medir(conn, user_id, "2024-01-15 10:00:00", barriga="noventa", peito=104)
+    _medir(conn, user_id, "2024-01-22 10:00:00", barriga=94)
+
+    r = evolucao.resumo(conn, user_id)
+    assert r["total"] == 4
+    assert (r["de"], r["ate"]) == ("2024-01-01 10:00:00", "2024-01-22 10:00:00")
+    barriga = _campo(r, "barriga")
+    assert (barriga["n"], barriga["primeira"], barriga["ultima"]) == (2, 100, 94)
+    assert (barriga["diferenca"], barriga["percentual"], barriga["por_semana"]) == (-6, -6.0, -2.0)
+    peito = _campo(r, "peito")
+    assert (peito["n"], peito["primeira_em"], peito["ultima_em"]) == (
+        2, "2024-01-08 10:00:00", "2024-01-15 10:00:00")
+    assert _campo(r, "coxa_dir") is None
+
+
+def test_assimetria_pareia_pela_linha(conn):
+    user_id = criar_usuario(conn)
+    # Mesmo segundo, lados em linhas diferentes: não forma par
+    _medir(conn, user_id, "2024-01-01 10:00:00", braco_dir=36)
+    _medir(conn, user_id, "2024-01-01 10:00:00", braco_esq=30)
+    _medir(conn, user_id, "2024-01-08 10:00:00", braco_dir=36, braco_esq=34)
+    _medir(conn, user_id, "2024-01-15 10:00:00", braco_dir=37, braco_esq=36)
+
+    (braco,) = evolucao.resumo(conn, user_id)["assimetria"]
+    assert braco["par"] == "braco" and braco["n"] == 2
+    assert (braco["inicial"], braco["diferenca"], braco["variacao"]) == (2, 1, -1)
+    assert braco["percentual"] == round(1 / 36.5 * 100, 1)
+
+
+def test_periodo(conn):
+    user_id = criar_usuario(conn)
+    for dia, kg in ((1, 90), (10, 88), (20, 86), (31, 85)):
+        _medir(conn, user_id, f"2024-01-{dia:02d} 10:00:00", peso=kg)
+
+    r = evolucao.resumo(conn, user_id, de="2024-01-10", ate="2024-01-20")
+    assert r["total"] == 2
+    peso = _campo(r, "peso")
+    assert (peso["primeira"], peso["ultima"], peso["unidade"]) == (88, 86, "kg")
+    # Data inválida no filtro é ignorada
+    assert evolucao.resumo(conn, user_id, de="ontem")["total"] == 4
+
+
+def test_api_comparativo(client, conn):
+    assert client.get("/api/comparativo").status_code == 401
+    cadastrar(client)
+    _medir(conn, usuario(conn), "2024-01-01 10:00:00", barriga=100)
+    assert client.get("/api/comparativo?de=2024-01-01").get_json()["total"] == 1
@@ -0,0 +1,77 @@
+import io
+
+import pytest
+
+import exportacao
+from tests.conftest import cadastrar, criar_usuario, usuario
+
+
+def _popular(conn, user_id):
+    conn.execute("INSERT INTO profile (user_id, age, height_m, weight_kg) VALUES (?, 25, 1.75, 80)", (user_id,))
+    conn.executemany("INSERT INTO weight_log (user_id, weight_kg, log_date) VALUES (?, ?, ?)",
+                     [(user_id, 80 - i / 10, f"2024-01-{i + 1:02d} 08:00:00") for i in range(20)])
+    conn.execute("INSERT INTO body_measures (user_id, barriga, braco_dir, created_at) "
+                 "VALUES (?, 90.5, 35, '2024-01-05 09:00:00')", (user_id,))
+    conn.executemany("INSERT INTO checkins (user_id, treino, plano, created_at) VALUES (?, ?, ?, ?)",
+                     [(user_id, "Dia 1", "amador", "2024-01-02 10:00:00"),
+                      (user_id, "livre, com vírgula", "avulso", "2024-01-03 10:00:00")])
+    conn.execute("INSERT INTO program_progress (user_id, program, day, created_at) "
+                 "VALUES (?, 'forca', 1, '2024-01-04 10:00:00')", (user_id,))
+    conn.commit()
+
+
+def _tudo(conn, user_id):
+    return [(t.nome, linha) for t, linha in exportacao.registros(conn, user_id)]
+
+
+@pytest.mark.parametrize("formato", list(exportacao.FORMATOS))
+def test_ida_e_volta(conn, formato):
+    origem, destino = criar_usuario(conn, "a@x.com"), criar_usuario(conn, "b@x.com")
+    _popular(conn, origem)
+    texto = "".join(exportacao.exportar(conn, origem, formato))
+
+    resumo = exportacao.importar(conn, destino, exportacao.ler(io.StringIO(texto)))
+    assert resumo["weight_log"] == {"lidas": 20, "gravadas": 20}
+    assert _tudo(conn, destino) == _tudo(conn, origem)
+    # Derivados acompanham a importação
+    assert conn.execute("SELECT ultimo_kg FROM weight_trend WHERE user_id=?", (destino,)).fetchone()[0] == 78.1
+    assert conn.execute("SELECT ultimo FROM streaks WHERE user_id=?", (destino,)).fetchone() is not None
+
+    # De novo: nada duplica
+    resumo = exportacao.importar(conn, destino, exportacao.ler(io.StringIO(texto)))
+    assert sum(r["gravadas"] for nome, r in resumo.items() if nome != "ignoradas") == 0
+    assert _tudo(conn, destino) == _tudo(conn, origem)
+
+
+def test_linha_invalida_nao_grava_nada(conn):
+    user_id = criar_usuario(conn)
+    texto = ('{"formato":"varzea","versao":1}\n'
+             '{"tabela":"weight_log","weight_kg":80,"log_date":"2024-01-01"}\n'
+             '{"tabela":"weight_log","weight_kg":"muito","log_date":"2024-01-02"}\n')
+    with pytest.raises(ValueError, match="linha 3: weight_kg inválido"):
+        exportacao.importar(conn, user_id, exportacao.ler(io.StringIO(texto)))
+    assert conn.execute("SELECT COUNT(*) FROM weight_log").fetchone()[0] == 0
+
+
+def test_limite_de_registros(conn):
+    user_id = criar_usuario(conn)
+    texto = "tabela,weight_kg,log_date\n" + "".join(
+        f"weight_log,\"80,{i}\",2024-01-0{i + 1}\n" for i in range(3))
+    with pytest.raises(ValueError, match="mais de 2 registros"):
+        exportacao.importar(conn, user_id, exportacao.ler(io.StringIO(texto)), limite=2)
+    resumo = exportacao.importar(conn, user_id, exportacao.ler(io.StringIO(texto)), limite=3)
+    assert resumo["weight_log"]["gravadas"] == 3
+
+
+def test_rotas(client, conn, monkeypatch):
+    cadastrar(client)
+    _popular(conn, usuario(conn))
+    resp = client.get("/exportar?formato=csv")
+    assert resp.mimetype == "text/csv"
+    assert resp.get_data(as_text=True).splitlines()[0] == ",".join(exportacao.COLUNAS_CSV)
+
+    monkeypatch.setattr(exportacao, "WEB_MB", 0.0001)   # ~100 bytes
+    grande = io.BytesIO(resp.get_data())
+    client.post("/importar", data={"arquivo": (grande, "dados.csv")}, follow_redirects=False)
+    with client.session_transaction() as sessao:
+        assert "maior que" in sessao["_flashes"][-1][1]
@@ -0,0 +1,38 @@
+import os
+import runpy
+
+import pytest
+
+CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn.conf.py")
+
+
+@pytest.fixture
+def carregar(monkeypatch, tmp_path):
+    """Lê o gunicorn.conf.py com as variáveis de ambiente dadas."""
+    def ler(**env):
+        for nome in ("GUNICORN_PROFILE", "WEB_CONCURRENCY", "GUNICORN_THREADS", "PORT"):
+            monkeypatch.delenv(nome, raising=False)
+        monkeypatch.setenv("METRICS_DIR", str(tmp_path))
+        for nome, valor in env.items():
+            monkeypatch.setenv(nome, valor)
+        return runpy.run_path(CONF)
+    return ler
+
+
+def test_padrao_gthread(carregar):
+    conf = carregar()
+    assert conf["worker_class"] == "gthread"
+    assert conf["workers"] == conf["CPUS"] + 1 and conf["threads"] == 4
+    assert conf["preload_app"] and conf["bind"] == "0.0.0.0:5000"
+
+
+def test_sync_e_sobrescritas(carregar):
+    conf = carregar(GUNICORN_PROFILE="sync", WEB_CONCURRENCY="3", PORT="8080")
+    assert (conf["worker_class"], conf["workers"], conf["threads"]) == ("sync", 3, 1)
+    assert conf["bind"] == "0.0.0.0:8080"
+    assert conf["max_requests_jitter"] == conf["max_requests"] // 10
+
+
+def test_perfil_invalido(carregar):
+    with pytest.raises(SystemExit, match="GUNICORN_PROFILE inválido"):
+        carregar(GUNICORN_PROFILE="eventlet")
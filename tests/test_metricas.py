@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+import metricas
+
+
+@pytest.fixture(autouse=True)
+def zerar(monkeypatch):
+    monkeypatch.setattr(metricas, "_dados", {})
+    monkeypatch.setattr(metricas, "DIR", None)
+
+
+def test_histograma_acumulado():
+    for valor in (1, 4, 200):
+        metricas.observar("varzea_db_statements_per_request", valor, metricas.BUCKETS_SQL, endpoint="x")
+    linhas = metricas.texto(metricas.coletar()).splitlines()
+    assert '# TYPE varzea_db_statements_per_request histogram' in linhas
+    assert 'varzea_db_statements_per_request_bucket{endpoint="x",le="1"} 1' in linhas
+    assert 'varzea_db_statements_per_request_bucket{endpoint="x",le="5"} 2' in linhas
+    assert 'varzea_db_statements_per_request_bucket{endpoint="x",le="+Inf"} 3' in linhas
+    assert 'varzea_db_statements_per_request_sum{endpoint="x"} 205.000000' in linhas
+    assert 'varzea_db_statements_per_request_count{endpoint="x"} 3' in linhas
+
+
+def test_metrics_por_rota(client):
+    client.get("/login")
+    client.post("/login", data={"email": "x@x.com", "password": "1"})
+    texto = client.get("/metrics").get_data(as_text=True)
+    assert 'varzea_http_requests_total{endpoint="login",method="GET",status="200"} 1' in texto
+    assert 'varzea_http_request_duration_seconds_count{endpoint="login",method="POST"} 1' in texto
+    assert 'varzea_db_statements_per_request_count{endpoint="login"} 2' in texto   # GET + POST
+    assert 'endpoint="metricas"' not in texto   # o próprio scrape não conta
+
+
+def test_token(client, monkeypatch):
+    monkeypatch.setenv("METRICS_TOKEN", "abc")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer abc"}).status_code == 200
+
+
+def test_soma_os_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(metricas, "DIR", str(tmp_path))
+    (tmp_path / "1.json").write_text(json.dumps({'varzea_erros_total|origem="smtp"': 2}))
+    (tmp_path / "2.json").write_text("{meio gravado")   # ignorado até o próximo scrape
+    metricas.erro("smtp")
+    metricas.gravar()
+    assert json.loads((tmp_path / f"{os.getpid()}.json").read_text()) == \
+        {'varzea_erros_total|origem="smtp"': 1}
+    assert metricas.coletar() == {'varzea_erros_total|origem="smtp"': 3}
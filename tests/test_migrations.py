@@ -0,0 +1,47 @@
+import sqlite3
+
+import pytest
+
+import db
+import migrations
+
+
+def test_upgrade_aplica_tudo_uma_vez(tmp_path):
+    caminho = str(tmp_path / "novo.db")
+    aplicadas = migrations.upgrade(caminho, verbose=False)
+    assert aplicadas == [v for v, _, _ in migrations.MIGRATIONS]
+    assert migrations.upgrade(caminho, verbose=False) == []
+
+    conn = db.connect(caminho)
+    try:
+        assert migrations.current_version(conn) == migrations.MIGRATIONS[-1][0]
+    finally:
+        conn.close()
+
+
+def test_migracao_com_erro_nao_grava_versao(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "erro.db")
+    migrations.upgrade(caminho, verbose=False)
+    ultima = migrations.MIGRATIONS[-1][0]
+
+    def quebra(conn):
+        conn.execute("CREATE TABLE meia_migracao (id INTEGER)")
+        raise sqlite3.OperationalError("falhou no meio")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [(ultima + 1, "quebra", quebra)])
+    conn = db.connect(caminho)
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            migrations.migrate(conn, verbose=False)
+        assert migrations.current_version(conn) == ultima
+        assert migrations.columns(conn, "meia_migracao") == []
+    finally:
+        conn.close()
+
+
+def test_rebuild_table_copia_colunas_em_comum(conn):
+    conn.execute("CREATE TABLE t (a INTEGER, b TEXT, velha TEXT)")
+    conn.execute("INSERT INTO t VALUES (1, 'x', 'some')")
+    migrations.rebuild_table(conn, "t", "CREATE TABLE t (a INTEGER PRIMARY KEY, b TEXT, nova TEXT)")
+    assert migrations.columns(conn, "t") == ["a", "b", "nova"]
+    assert tuple(conn.execute("SELECT * FROM t").fetchone()) == (1, "x", None)
@@ -0,0 +1,44 @@
+import pytest
+
+import outbox
+from tests.conftest import criar_usuario
+
+
+@pytest.fixture
+def smtp(app):
+    """SMTP local em processo; o envio só acontece em outbox.drenar()."""
+    # TESTING liga o MAIL_SUPPRESS_SEND do Flask-Mail: aqui o envio é de verdade
+    app.config.update(MAIL_OUTBOX_WORKER="off", MAIL_SUPPRESS_SEND=False)
+    servidor = outbox.usar_smtp_local(app, app.extensions["outbox"])
+    yield servidor
+    servidor.parar()
+
+
+def test_forgot_so_enfileira_e_drenar_envia(app, client, conn, smtp):
+    criar_usuario(conn, "jogador@teste.com")
+    assert client.post("/forgot", data={"email": "jogador@teste.com"}).status_code == 200
+    assert conn.execute("SELECT status FROM outbox").fetchall()[0][0] == "pending"
+    assert smtp.mensagens == []
+
+    outbox.drenar(app, app.extensions["outbox"])
+    assert [m["para"] for m in smtp.mensagens] == [["<jogador@teste.com>"]]
+    assert conn.execute("SELECT status FROM outbox").fetchone()[0] == "sent"
+
+
+def test_falha_reagenda_com_backoff(app, conn, smtp):
+    outbox.enfileirar(conn, "a@x.com", "assunto", "<p>oi</p>")
+    smtp.parar()   # servidor fora do ar
+    mail = app.extensions["outbox"]
+    assert outbox.enviar_lote(app, mail, conn) == 1
+    row = conn.execute("SELECT status, attempts, next_attempt_at, claimed_at FROM outbox").fetchone()
+    assert (row["status"], row["attempts"], row["claimed_at"]) == ("pending", 1, None)
+    # Ainda no backoff: o próximo lote não pega a mensagem
+    assert outbox.enviar_lote(app, mail, conn) == 0
+
+
+def test_ultima_tentativa_vira_failed(app, conn, smtp, monkeypatch):
+    monkeypatch.setattr(outbox, "MAX_TENTATIVAS", 1)
+    outbox.enfileirar(conn, "a@x.com", "assunto", "<p>oi</p>")
+    smtp.parar()
+    outbox.enviar_lote(app, app.extensions["outbox"], conn)
+    assert conn.execute("SELECT status FROM outbox").fetchone()[0] == "failed"
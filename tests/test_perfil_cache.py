@@ -0,0 +1,75 @@
+import json
+
+import perfil_cache
+import tendencia
+from tests.conftest import cadastrar, criar_usuario, usuario
+
+
+def _foto(conn, user_id):
+    row = conn.execute("SELECT dados FROM perfil_cache WHERE user_id=?", (user_id,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def test_get_so_le(client, conn, limite_consultas):
+    cadastrar(client)
+    user_id = usuario(conn)
+    # Perfil gravado por fora (importação): os triggers deixam sem foto
+    conn.execute("INSERT INTO profile (user_id, age, height_m, weight_kg) VALUES (?, 25, 1.75, 90)", (user_id,))
+    conn.commit()
+
+    with limite_consultas("get", "/perfil"):
+        resp = client.get("/perfil")
+    assert resp.status_code == 200
+    assert "Sobrepeso" in resp.get_data(as_text=True)
+    assert _foto(conn, user_id) is None
+
+
+def test_gravacoes_remontam_a_foto(client, conn):
+    cadastrar(client)
+    user_id = usuario(conn)
+
+    client.post("/perfil", data={"idade": "25", "altura": "1,75", "peso": "90"})
+    foto = _foto(conn, user_id)
+    assert foto["prof"] == {"age": 25, "height_m": 1.75, "weight_kg": 90.0}
+    assert (foto["imc"], foto["faixa"]) == (29.4, "Sobrepeso")
+
+    client.post("/peso_diario", data={"peso_diario": "89,5"})
+    foto = _foto(conn, user_id)
+    assert [p["weight_kg"] for p in foto["pesos"]] == [89.5]
+    assert foto["tendencia"]["tendencia"] == 89.5
+
+    client.post("/medidas", data={"barriga": "95", "peito": "100"})
+    foto = _foto(conn, user_id)
+    assert foto["ultima_medida"]["barriga"] == 95.0
+    assert foto["ultima_medida"]["coxa_dir"] is None
+
+    # A foto é a mesma tela que sairia montada do zero
+    conn.execute("DELETE FROM perfil_cache")
+    conn.commit()
+    assert perfil_cache._de_json(json.dumps(foto)) == perfil_cache.ler(conn, user_id)
+
+
+def test_triggers_apagam_a_foto(conn):
+    user_id, outro = criar_usuario(conn), criar_usuario(conn, "outro@teste.com")
+    for uid in (user_id, outro):
+        perfil_cache.atualizar(conn, uid)
+    conn.commit()
+
+    conn.execute("INSERT INTO weight_log (user_id, weight_kg, log_date) VALUES (?, 80, '2024-01-01 08:00:00')",
+                 (user_id,))
+    conn.commit()
+    assert _foto(conn, user_id) is None
+    assert _foto(conn, outro) is not None   # só a foto do dono
+
+
+def test_previsao_volta_como_data(conn):
+    user_id = criar_usuario(conn)
+    conn.execute("INSERT INTO profile (user_id, age, height_m, weight_kg) VALUES (?, 25, 1.75, 90)", (user_id,))
+    conn.executemany("INSERT INTO weight_log (user_id, weight_kg, log_date) VALUES (?, ?, ?)",
+                     [(user_id, 90 - d / 10, f"2024-01-{d + 1:02d} 08:00:00") for d in range(20)])
+    tendencia.recalcular(conn, user_id)
+    dados = perfil_cache.atualizar(conn, user_id)
+    conn.commit()
+
+    assert dados["tendencia"]["previsao"] is not None
+    assert perfil_cache.ler(conn, user_id) == dados
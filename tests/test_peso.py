@@ -0,0 +1,52 @@
+import peso
+from tests.conftest import cadastrar, criar_usuario
+
+
+def test_lttb_mantem_pontas_e_picos():
+    ts = list(range(100))
+    ys = [0.0] * 100
+    ys[37], ys[71] = 10.0, -10.0
+    idx = peso.lttb(ts, ys, 10)
+    assert len(idx) == 10
+    assert idx[0] == 0 and idx[-1] == 99
+    assert idx == sorted(idx)
+    assert 37 in idx and 71 in idx
+
+
+def test_lttb_sem_reducao_e_minimo():
+    assert peso.lttb([1, 2, 3], [1, 2, 3], 5) == [0, 1, 2]
+    assert peso.lttb(list(range(10)), list(range(10)), 2) == [0, 9]
+
+
+def _pesar(conn, user_id, linhas):
+    conn.executemany("INSERT INTO weight_log (user_id, weight_kg, log_date) VALUES (?, ?, ?)",
+                     [(user_id, kg, dia) for dia, kg in linhas])
+    conn.commit()
+
+
+def test_serie_filtra_periodo_e_linhas_ruins(conn):
+    user_id = criar_usuario(conn)
+    _pesar(conn, user_id, [
+        ("2024-01-01 08:00:00", 82.0), ("2024-01-02 08:00:00", 81.5),
+        ("2024-01-03 08:00:00", 81.0), ("2024-02-01 08:00:00", 79.0),
+        (None, 70.0), ("ontem", 70.0), ("2024-01-04 08:00:00", "80,5"),
+    ])
+    s = peso.serie(conn, user_id, "2024-01-02", "2024-01-31")
+    assert s["total"] == 2
+    assert s["kg"] == [81.5, 81.0]
+    assert (s["atual"], s["min"], s["max"]) == (81.0, 81.0, 81.5)
+
+
+def test_serie_reduzida_guarda_extremos(conn):
+    user_id = criar_usuario(conn)
+    _pesar(conn, user_id, [(f"2024-01-01 00:{m:02d}:00", 80 + (m == 30) * 5) for m in range(60)])
+    s = peso.serie(conn, user_id, pontos=10)
+    assert (s["total"], len(s["t"])) == (60, 10)
+    assert s["max"] == 85 and 85 in s["kg"]
+
+
+def test_api_peso(client):
+    cadastrar(client)
+    client.post("/peso_diario", data={"peso_diario": "79,5"})
+    dados = client.get("/api/peso?pontos=50").get_json()
+    assert dados["kg"] == [79.5] and dados["total"] == 1
@@ -0,0 +1,36 @@
+import programas
+from tests.conftest import cadastrar, criar_usuario, usuario
+
+
+def test_ciclo_reinicia_ao_concluir_o_ultimo_dia(conn):
+    user_id = criar_usuario(conn)
+    total = programas.total_dias("forca")
+    for dia in range(1, total):
+        programas.concluir_dia(conn, user_id, "forca", dia)
+    programas.concluir_dia(conn, user_id, "forca", 1)   # repetido: ignorado
+    assert sorted(programas.dias_concluidos(conn, user_id, "forca")) == list(range(1, total))
+    assert programas.progresso_todos(conn, user_id)["forca"]["feitos"] == total - 1
+
+    programas.concluir_dia(conn, user_id, "forca", total)
+    assert programas.dias_concluidos(conn, user_id, "forca") == []
+    assert programas.progresso_todos(conn, user_id)["forca"]["feitos"] == 0
+
+
+def test_programas_sao_independentes(conn):
+    user_id = criar_usuario(conn)
+    programas.concluir_dia(conn, user_id, "velocidade", 1)
+    todos = programas.progresso_todos(conn, user_id)
+    assert todos["velocidade"]["feitos"] == 1
+    assert todos["velocidade"]["progresso"] == int(100 / programas.total_dias("velocidade"))
+    assert todos["forca"]["feitos"] == 0
+
+
+def test_sincronizar_grava_total_de_dias(app, conn):
+    totais = dict(conn.execute("SELECT name, total_days FROM programs").fetchall())
+    assert totais == {nome: len(p.treinos) for nome, p in programas.PROGRAMAS.items()}
+
+
+def test_rota_conclui_dia(client, conn):
+    cadastrar(client)
+    assert client.post("/concluir_treino_forca/1").status_code == 302
+    assert programas.dias_concluidos(conn, usuario(conn), "forca") == [1]
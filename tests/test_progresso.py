@@ -0,0 +1,42 @@
+import progresso
+from tests.conftest import cadastrar, criar_usuario, usuario
+
+
+def _checkin(conn, user_id, plano, treino="t1"):
+    conn.execute("INSERT INTO checkins (user_id, treino, plano) VALUES (?, ?, ?)",
+                 (user_id, treino, plano))
+    conn.commit()
+
+
+def test_triggers_contam_checkins_e_programas(conn):
+    user_id = criar_usuario(conn)
+    _checkin(conn, user_id, "amador")
+    _checkin(conn, user_id, "amador", "t2")
+    _checkin(conn, user_id, "semi_pro")
+    conn.execute("INSERT INTO program_progress (user_id, program, day) VALUES (?, 'forca', 1)", (user_id,))
+    conn.commit()
+    assert progresso.ler(conn, user_id) == {"amador": 2, "semi_pro": 1, "forca": 1}
+
+    conn.execute("DELETE FROM checkins WHERE user_id=? AND plano='amador'", (user_id,))
+    conn.commit()
+    assert progresso.ler(conn, user_id)["amador"] == 0
+    assert progresso.divergencias(conn) == []
+
+
+def test_reconstruir_corrige_divergencia(conn):
+    user_id = criar_usuario(conn)
+    _checkin(conn, user_id, "amador")
+    conn.execute("UPDATE user_progress SET feitos = 7 WHERE user_id=?", (user_id,))
+    conn.commit()
+    assert [tuple(r) for r in progresso.divergencias(conn)] == [(user_id, "amador", 7, 1)]
+
+    progresso.reconstruir(conn)
+    assert progresso.divergencias(conn) == []
+    assert progresso.ler(conn, user_id) == {"amador": 1}
+
+
+def test_dashboard_mostra_contador(client, conn):
+    cadastrar(client)
+    client.post("/treino/1", data={"treino_id": "1"})
+    assert progresso.ler(conn, usuario(conn)) == {"amador": 1}
+    assert client.get("/dashboard").status_code == 200
@@ -0,0 +1,28 @@
+import pytest
+
+import query_plans
+
+
+def test_nenhuma_consulta_faz_scan(app):
+    assert query_plans.verificar(app, verbose=False) == {}
+
+
+@pytest.mark.parametrize("detalhe", [
+    "SCAN sqlite_master",
+    "SCAN CONSTANT ROW",
+    "SCAN (subquery-3)",
+    "SCAN json_each VIRTUAL TABLE INDEX 1:",
+    "SEARCH weight_log USING INDEX idx_weight_log_user_date (user_id=?)",
+])
+def test_planos_permitidos(detalhe):
+    assert query_plans.regressoes({"sql": [detalhe]}) == {}
+
+
+@pytest.mark.parametrize("detalhe", [
+    "SCAN weight_log",
+    "SCAN users USING COVERING INDEX sqlite_autoindex_users_1",
+    "SCAN (subquery-3) weight_log",
+    "SCAN e VIRTUAL TABLE INDEX 1:",
+])
+def test_scan_de_tabela_falha(detalhe):
+    assert query_plans.regressoes({"sql": [detalhe]}) == {"sql": [detalhe]}
@@ -0,0 +1,113 @@
+from datetime import date
+
+import pytest
+
+import ranking
+import regional
+from tests.conftest import criar_usuario
+
+
+@pytest.fixture
+def hoje(monkeypatch):
+    """Relógio do app parado em 2024-03-10 (e expiração ainda não feita)."""
+    dia = {"hoje": date(2024, 3, 10)}
+    monkeypatch.setattr(regional, "hoje", lambda: dia["hoje"])
+    monkeypatch.setattr(ranking, "_expirado", None)
+    return dia
+
+
+def _checkin(conn, user_id, dia):
+    # 15:00 UTC = meio-dia em São Paulo, mesmo dia local
+    created_at = f"{dia} 15:00:00"
+    conn.execute("INSERT INTO checkins (user_id, treino, plano, created_at) VALUES (?, 'livre', 'avulso', ?)",
+                 (user_id, created_at))
+    ranking.registrar(conn, user_id, created_at)
+    conn.commit()
+
+
+def _sequencia(conn, user_id):
+    row = conn.execute("SELECT atual, melhor, ultimo FROM streaks WHERE user_id=?", (user_id,)).fetchone()
+    return tuple(row) if row else None
+
+
+def test_dia_local():
+    assert ranking.dia_local("2024-03-10 02:00:00") == "2024-03-09"
+    assert ranking.dia_local("2024-03-10 15:00:00") == "2024-03-10"
+    assert ranking.dia_local("2024-03-10T02:00:00-03:00") == "2024-03-10"
+
+
+def test_ilhas(conn):
+    user_id = criar_usuario(conn)
+    conn.executemany("INSERT INTO checkin_dias (user_id, dia) VALUES (?, ?)",
+                     [(user_id, f"2024-03-{d:02d}") for d in (1, 2, 3, 5, 6, 9)])
+    conn.commit()
+    row = conn.execute(ranking.SQL_ILHAS, (user_id,)).fetchone()
+    assert (row["melhor"], row["ultimo"], row["ultima_ilha"]) == (3, "2024-03-09", 1)
+    assert conn.execute(ranking.SQL_ILHAS, (None,)).fetchall() == [row]
+
+
+def test_registrar_anda_a_sequencia(conn, hoje):
+    user_id = criar_usuario(conn)
+    for dia in ("2024-03-01", "2024-03-02", "2024-03-03"):
+        _checkin(conn, user_id, dia)
+    assert _sequencia(conn, user_id) == (3, 3, "2024-03-03")
+    _checkin(conn, user_id, "2024-03-03")   # mesmo dia: nada muda
+    assert _sequencia(conn, user_id) == (3, 3, "2024-03-03")
+    _checkin(conn, user_id, "2024-03-08")   # pulou dias: recomeça
+    assert _sequencia(conn, user_id) == (1, 3, "2024-03-08")
+    assert ranking.divergencias(conn, referencia=date(2024, 3, 9)) == []
+
+
+def test_dia_fora_de_ordem_recalcula(conn, hoje):
+    user_id = criar_usuario(conn)
+    for dia in ("2024-03-07", "2024-03-09", "2024-03-10"):
+        _checkin(conn, user_id, dia)
+    assert _sequencia(conn, user_id) == (2, 2, "2024-03-10")
+    _checkin(conn, user_id, "2024-03-08")   # importado depois: fecha o buraco
+    assert _sequencia(conn, user_id) == (4, 4, "2024-03-10")
+    assert ranking.divergencias(conn) == []
+
+
+def test_expirar_zera_so_quem_parou(conn, hoje):
+    parou, seguiu = criar_usuario(conn), criar_usuario(conn, "outro@teste.com", "Outro")
+    for dia in ("2024-03-07", "2024-03-08"):
+        _checkin(conn, parou, dia)
+    for dia in ("2024-03-08", "2024-03-09"):
+        _checkin(conn, seguiu, dia)
+
+    assert ranking.expirar(conn) == 1
+    assert _sequencia(conn, parou) == (0, 2, "2024-03-08")
+    assert _sequencia(conn, seguiu) == (2, 2, "2024-03-09")
+    # Uma vez por dia por processo
+    hoje["hoje"] = date(2024, 3, 11)
+    assert ranking.expirar(conn) == 1
+    assert ranking.expirar(conn) == 0
+
+
+def test_top_e_posicao(conn, hoje):
+    dias = {"A": 3, "B": 2, "C": 2, "D": 1}
+    ids = {}
+    for nome, n in dias.items():
+        ids[nome] = criar_usuario(conn, f"{nome.lower()}@teste.com", nome)
+        for d in range(n):
+            _checkin(conn, ids[nome], f"2024-03-{10 - d:02d}")
+
+    assert [(p, nome) for p, _, nome, *_ in ranking.top(conn)] == [(1, "A"), (2, "B"), (2, "C"), (4, "D")]
+    assert len(ranking.top(conn, n=2)) == 2
+    with pytest.raises(ValueError):
+        ranking.top(conn, tipo="pior")
+
+    assert ranking.posicao(conn, ids["C"]) == {
+        "atual": 2, "melhor": 2, "posicao_atual": 2, "posicao_melhor": 2, "jogadores": 4}
+    assert ranking.posicao(conn, criar_usuario(conn, "novo@teste.com")) is None
+
+
+def test_divergencia_aparece(conn, hoje):
+    user_id = criar_usuario(conn)
+    _checkin(conn, user_id, "2024-03-10")
+    conn.execute("UPDATE streaks SET melhor = 9 WHERE user_id=?", (user_id,))
+    conn.commit()
+    assert ranking.divergencias(conn) == [(user_id, (1, 9, "2024-03-10"), (1, 1, "2024-03-10"))]
+    ranking.recalcular(conn, user_id)
+    conn.commit()
+    assert ranking.divergencias(conn) == []
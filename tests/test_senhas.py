@@ -0,0 +1,78 @@
+import threading
+from concurrent.futures import TimeoutError as Demorou
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+import senhas
+from tests.conftest import criar_usuario
+
+
+def test_hash_e_verificacao():
+    h = senhas.gerar_hash("segredo", "pbkdf2:sha256:1000")
+    assert senhas.verificar(h, "segredo")
+    assert not senhas.verificar(h, "outra")
+    assert not senhas.precisa_rehash(h, "pbkdf2:sha256:1000")
+    assert senhas.precisa_rehash(h, "scrypt:32768:8:1")
+
+
+def test_login_refaz_hash_antigo(client, conn):
+    user_id = criar_usuario(conn)
+    antigo = generate_password_hash("123", "pbkdf2:sha256:2000")
+    conn.execute("UPDATE users SET password_hash=? WHERE id=?", (antigo, user_id))
+    conn.commit()
+
+    client.post("/login", data={"email": "jogador@teste.com", "password": "123"})
+    novo = conn.execute("SELECT password_hash FROM users WHERE id=?", (user_id,)).fetchone()[0]
+    assert novo != antigo and not senhas.precisa_rehash(novo)
+
+
+class _Executor:
+    """Executor falso: submit devolve um futuro que levanta `erro`."""
+
+    def __init__(self, erro):
+        self.erro = erro
+
+    def submit(self, fn, *args):
+        erro = self.erro
+
+        class Futuro:
+            def result(self, timeout=None):
+                raise erro
+
+            def cancel(self):
+                return True
+        return Futuro()
+
+
+def _com_pool(monkeypatch, erro):
+    executor = _Executor(erro)
+    monkeypatch.setattr(senhas, "_executor", lambda: (executor, threading.BoundedSemaphore(1)))
+    monkeypatch.setitem(senhas._pool, "executor", executor)
+    monkeypatch.setitem(senhas._pool, "pid", 123)
+    return executor
+
+
+def test_pool_sem_resposta_vira_ocupado(monkeypatch):
+    _com_pool(monkeypatch, Demorou())
+    with pytest.raises(senhas.Ocupado):
+        senhas.verificar(generate_password_hash("x", "pbkdf2:sha256:1000"), "x")
+
+
+def test_pool_quebrado_resolve_inline_e_recria(monkeypatch):
+    _com_pool(monkeypatch, BrokenProcessPool())
+    assert senhas.verificar(generate_password_hash("x", "pbkdf2:sha256:1000"), "x")
+    assert senhas._pool["pid"] is None   # próximo uso cria um pool novo
+
+
+def test_ocupado_responde_503(client, conn, monkeypatch):
+    criar_usuario(conn)
+
+    def ocupado(*args):
+        raise senhas.Ocupado("fila cheia")
+
+    monkeypatch.setattr(senhas, "verificar", ocupado)
+    resp = client.post("/login", data={"email": "jogador@teste.com", "password": "123"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "5"
@@ -0,0 +1,38 @@
+import pytest
+
+import query_plans
+import sql_trace
+
+
+def test_forma_troca_literais_e_espacos():
+    assert sql_trace.forma("SELECT *  FROM users\n WHERE id = 12 AND email = 'a''b'") == \
+        "SELECT * FROM users WHERE id = ? AND email = ?"
+    assert sql_trace.forma(None) == "?"
+
+
+def test_repetidas_so_conta_dml():
+    formas = {"SELECT 1": 5, "BEGIN": 9, "UPDATE x SET a = ?": 4}
+    assert sql_trace.repetidas(formas, minimo=5) == {"SELECT 1": 5}
+
+
+def test_contar_consultas(conn):
+    with sql_trace.contar_consultas() as c:
+        for _ in range(3):
+            conn.execute("SELECT id FROM users WHERE id = ?", (1,)).fetchall()
+    assert c.total == 3
+    assert c.repetidas(minimo=3) == {"SELECT id FROM users WHERE id = ?": 3}
+
+
+def test_sessao_dentro_dos_limites(client, limite_consultas):
+    for metodo, caminho, dados in query_plans.SESSAO:
+        with limite_consultas(metodo, caminho):
+            resp = getattr(client, metodo)(caminho, data=dados)
+            resp.get_data()
+        assert resp.status_code < 500, f"{metodo.upper()} {caminho}: {resp.status_code}"
+
+
+def test_limite_estourado_falha(conn, limite_consultas):
+    with pytest.raises(AssertionError, match="limite 3"):
+        with limite_consultas("get", "/rota_sem_limite"):
+            for i in range(4):
+                conn.execute(f"SELECT {i}").fetchall()
@@ -0,0 +1,110 @@
+import math
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import tendencia
+from tests.conftest import criar_usuario
+
+INICIO = datetime(2024, 1, 1, 8, 0)
+
+
+def _serie(dias, kg_inicial=82.9, por_dia=-0.1):
+    """[(kg, log_date)] em reta perfeita, um peso por dia."""
+    return [(round(kg_inicial + por_dia * i, 2), (INICIO + timedelta(days=i)).strftime("%Y-%m-%d %H:%M:%S"))
+            for i in range(dias)]
+
+
+def _gravar(conn, user_id, pesos):
+    for kg, log_date in pesos:
+        conn.execute("INSERT INTO weight_log (user_id, weight_kg, log_date) VALUES (?, ?, ?)",
+                     (user_id, kg, log_date))
+        tendencia.registrar(conn, user_id, kg, log_date)
+    conn.commit()
+
+
+def test_ewma_no_tempo():
+    estado = tendencia.Estado(1)
+    sem_janela = lambda de, ate: (0, 0)
+    estado.incluir(80.0, INICIO, sem_janela)
+    estado.incluir(82.0, INICIO + timedelta(days=1), sem_janela)
+    peso = math.exp(-1 / tendencia.TAU)
+    assert estado.ewma == pytest.approx((80 * peso + 82) / (peso + 1))
+    # Meia-vida: um peso de MEIA_VIDA dias atrás vale metade do de hoje
+    assert math.exp(-tendencia.MEIA_VIDA / tendencia.TAU) == pytest.approx(0.5)
+    # Pouco histórico: sem reta, a tendência é a EWMA
+    assert estado.inclinacao is None
+    assert estado.tendencia == estado.ewma
+
+
+def test_reta_de_minimos_quadrados():
+    estado = tendencia.Estado(1)
+    for kg, log_date in _serie(30):
+        estado.incluir(kg, datetime.fromisoformat(log_date), lambda de, ate: (0, 0))
+    # Pontos em cima de uma reta: a ponderação não muda a inclinação
+    assert estado.inclinacao == pytest.approx(-0.1)
+    assert estado.tendencia == pytest.approx(80.0)
+    # A EWMA fica atrás da reta (pesa dias mais pesados do passado)
+    assert estado.ewma > estado.tendencia
+
+
+def test_previsao_e_faixa_ideal():
+    estado = tendencia.Estado(1)
+    for kg, log_date in _serie(30):
+        estado.incluir(kg, datetime.fromisoformat(log_date), lambda de, ate: (0, 0))
+    minimo, maximo = tendencia.faixa_ideal(1.75)
+    assert maximo == pytest.approx(24.9 * 1.75 ** 2)
+    dias = (maximo - 80.0) / -0.1
+    assert estado.previsao(1.75) == (INICIO + timedelta(days=29 + dias)).date()
+    # Já dentro da faixa, ou indo para o lado errado: sem previsão
+    assert estado.previsao(1.85) is None
+    subindo = tendencia.Estado(1)
+    for kg, log_date in _serie(30, kg_inicial=80, por_dia=0.1):
+        subindo.incluir(kg, datetime.fromisoformat(log_date), lambda de, ate: (0, 0))
+    assert subindo.previsao(1.75) is None
+
+
+def test_registrar_bate_com_o_historico(conn):
+    user_id = criar_usuario(conn)
+    pesos = _serie(45)
+    random.Random(7).shuffle(pesos)   # importado fora de ordem
+    _gravar(conn, user_id, pesos)
+
+    salvo = tendencia.ler(conn, user_id)
+    real = tendencia.calcular(conn, user_id)
+    for coluna in tendencia.COLUNAS:
+        assert getattr(salvo, coluna) == pytest.approx(getattr(real, coluna)), coluna
+    assert tendencia.divergencias(conn) == []
+    # Janelas de 7 e 30 dias terminando no peso mais recente
+    assert (salvo.n7, salvo.n30) == (7, 30)
+    assert salvo.media7 == pytest.approx(sum(80.0 - 1.5 + 0.1 * i for i in range(7)) / 7)
+
+
+def test_divergencia_e_recalcular(conn):
+    user_id = criar_usuario(conn)
+    _gravar(conn, user_id, _serie(10))
+    conn.execute("UPDATE weight_trend SET n7 = 99 WHERE user_id=?", (user_id,))
+    assert [(u, c) for u, c, _, _ in tendencia.divergencias(conn)] == [(user_id, "n7")]
+    tendencia.recalcular(conn, user_id)
+    assert tendencia.divergencias(conn) == []
+
+
+def test_ler_sem_pesos_nao_grava(conn):
+    user_id = criar_usuario(conn)
+    estado = tendencia.ler(conn, user_id)
+    assert estado.n == 0 and tendencia.resumo(estado) is None
+    assert conn.execute("SELECT COUNT(*) FROM weight_trend").fetchone()[0] == 0
+
+
+def test_resumo(conn):
+    user_id = criar_usuario(conn)
+    _gravar(conn, user_id, _serie(30))
+    r = tendencia.resumo(tendencia.ler(conn, user_id), 1.75)
+    assert r["tendencia"] == 80.0
+    assert r["kg_semana"] == -0.7
+    assert r["media7"] == 80.3
+    assert r["faixa"] == (56.7, 76.3)
+    assert r["no_ideal"] is False
+    assert isinstance(r["previsao"], date)
+    assert tendencia.resumo(tendencia.ler(conn, user_id))["faixa"] is None